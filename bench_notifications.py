@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark data change handling: per-item callbacks vs whole publish responses.
+
+    python bench_notifications.py --tags 1000 --items 10,100,1000 --publishes 200
+
+Builds publish responses (DataChangeNotifications) in memory and feeds them
+to the logger twice: through asyncua's own Subscription._call_datachange,
+which calls datachange_notification once per monitored item, and through
+the logger's batch handler, which processes the whole response in one pass.
+No server is needed; records go to a temporary JSONL file.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import yaml
+from asyncua import ua
+from asyncua.common.node import Node
+from asyncua.common.subscription import Subscription, SubscriptionItemData
+
+from opcua_logger import OPCUALogger
+
+
+def make_logger(directory: str, tag_count: int, buffer_size: int) -> OPCUALogger:
+    """A logger that only flushes between measurements, so encoding doesn't skew the timings."""
+    config = {
+        'server': {'url': 'opc.tcp://127.0.0.1:4840'},
+        'tags': [{'name': f"Tag{i:05d}", 'node_id': f"ns=2;s=Tag{i:05d}"} for i in range(tag_count)],
+        'logging': {
+            'data_file': os.path.join(directory, 'bench.jsonl'),
+            'timestamp_format': 'unix',
+            'flush_interval_seconds': 3600.0,
+            'flush_max_pending': buffer_size,
+        },
+    }
+    config_path = os.path.join(directory, 'bench.yaml')
+    with open(config_path, 'w') as f:
+        yaml.dump(config, f)
+    return OPCUALogger(config_path)
+
+
+def make_subscription(logger: OPCUALogger, tag_count: int) -> Subscription:
+    """A Subscription with one monitored item (client handle = index) per tag, not connected to a server."""
+    subscription = Subscription(None, ua.CreateSubscriptionParameters(), logger)
+    for i in range(tag_count):
+        item = SubscriptionItemData()
+        item.node = Node(None, ua.NodeId.from_string(f"ns=2;s=Tag{i:05d}"))
+        item.client_handle = i
+        item.server_handle = i
+        subscription._monitored_items[i] = item
+    return subscription
+
+
+def make_publish(tag_count: int, item_count: int, start: int) -> ua.DataChangeNotification:
+    notification = ua.DataChangeNotification()
+    for i in range(item_count):
+        item = ua.MonitoredItemNotification()
+        item.ClientHandle = (start + i) % tag_count
+        item.Value = ua.DataValue(ua.Variant(float(start + i), ua.VariantType.Double))
+        notification.MonitoredItems.append(item)
+    return notification
+
+
+async def run(handler, publishes) -> float:
+    """Microseconds per monitored item."""
+    started = time.perf_counter()
+    for publish in publishes:
+        await handler(publish)
+    elapsed = time.perf_counter() - started
+    return elapsed / sum(len(publish.MonitoredItems) for publish in publishes) * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-item vs batched data change handling")
+    parser.add_argument("--tags", type=int, default=1000, help="Number of monitored items")
+    parser.add_argument("--items", default="1,10,100,1000", help="Comma-separated notifications per publish")
+    parser.add_argument("--publishes", type=int, default=200, help="Publish responses per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        item_counts = [int(value) for value in args.items.split(',')]
+        logger = make_logger(directory, args.tags, max(item_counts) * args.publishes + 1)
+        subscription = make_subscription(logger, args.tags)
+
+        async def per_item(publish):
+            await Subscription._call_datachange(subscription, publish)
+
+        async def batched(publish):
+            await logger._publish_datachange(subscription, publish)
+
+        print(f"{'items/publish':>14} {'per-item us/item':>17} {'batched us/item':>16} {'speedup':>8}")
+        for item_count in item_counts:
+            publishes = [make_publish(args.tags, item_count, n * item_count) for n in range(args.publishes)]
+            # Warm up the handle cache, then measure each path on the same responses
+            await run(batched, publishes[:1])
+            per_item_us = await run(per_item, publishes)
+            logger.flush(timeout=60)
+            batched_us = await run(batched, publishes)
+            print(f"{item_count:>14} {per_item_us:>17.2f} {batched_us:>16.2f} {per_item_us / batched_us:>7.1f}x")
+            logger.flush(timeout=60)
+
+        logger.drain_outputs(60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark the SQLite time-series store: insert throughput and query latency.
+
+    python bench_timeseries.py --rows 100000000 --tags 1000 --db /data/bench.db
+
+Rows are spread evenly over the tags at a fixed sample period, inserted in
+batches like the logger's flushes. Query latencies are the median of
+repeated latest-value, range and downsampled queries on random tags.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+from opcua_timeseries import TimeSeriesStore
+
+
+def timed_median(func, repeat: int) -> float:
+    """Median run time of func in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite time-series store")
+    parser.add_argument("--db", default="bench_timeseries.db", help="Database file (recreated)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of samples to insert")
+    parser.add_argument("--tags", type=int, default=100, help="Number of tags")
+    parser.add_argument("--batch", type=int, default=10_000, help="Samples per write transaction")
+    parser.add_argument("--period-ms", type=float, default=100.0, help="Sample period per tag")
+    parser.add_argument("--repeat", type=int, default=50, help="Repetitions per query type")
+    parser.add_argument("--keep", action="store_true", help="Keep the database file")
+    args = parser.parse_args()
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.db + suffix):
+            os.remove(args.db + suffix)
+
+    store = TimeSeriesStore(args.db)
+    tags = [f"Tag{i:05d}" for i in range(args.tags)]
+    period_ns = int(args.period_ms * 1_000_000)
+    start_ns = time.time_ns() - (args.rows // args.tags) * period_ns
+
+    # Insert: tags sample round-robin, so each batch holds interleaved tags like a flush
+    print(f"Inserting {args.rows:,} samples for {args.tags} tags in batches of {args.batch:,}...")
+    started = time.perf_counter()
+    inserted = 0
+    while inserted < args.rows:
+        count = min(args.batch, args.rows - inserted)
+        batch = []
+        for i in range(inserted, inserted + count):
+            step, tag_index = divmod(i, args.tags)
+            batch.append((tags[tag_index], start_ns + step * period_ns, float(i % 1000)))
+        store.write_samples(batch)
+        inserted += count
+        if inserted % (args.batch * 100) == 0:
+            elapsed = time.perf_counter() - started
+            print(f"  {inserted:,} rows, {inserted / elapsed:,.0f} rows/s")
+    elapsed = time.perf_counter() - started
+    print(f"Insert: {args.rows / elapsed:,.0f} rows/s ({elapsed:.1f} s)")
+    print(f"Database size: {os.path.getsize(args.db) / 1e6:,.1f} MB "
+          f"({os.path.getsize(args.db) / max(args.rows, 1):.1f} bytes/row)")
+
+    end_ns = start_ns + (args.rows // args.tags) * period_ns
+    minute_ns = 60 * 1_000_000_000
+    rng = random.Random(1)
+
+    def random_window(length_ns):
+        window_start = rng.randrange(start_ns, max(start_ns + 1, end_ns - length_ns))
+        return window_start, window_start + length_ns
+
+    def query_range():
+        window = random_window(minute_ns)
+        store.range(rng.choice(tags), *window)
+
+    def query_downsample():
+        window = random_window(60 * minute_ns)
+        store.downsample(rng.choice(tags), window[0], window[1], minute_ns)
+
+    print(f"Latest value, one tag:      {timed_median(lambda: store.latest([rng.choice(tags)]), args.repeat):8.3f} ms")
+    print(f"Latest value, all tags:     {timed_median(lambda: store.latest(tags), max(1, args.repeat // 10)):8.3f} ms")
+    print(f"Range, 1 minute of one tag: {timed_median(query_range, args.repeat):8.3f} ms")
+    print(f"Downsample, 1 h into 1 min: {timed_median(query_downsample, args.repeat):8.3f} ms")
+
+    store.close()
+    if not args.keep:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped random access to JSONL data files.
+
+JsonlReader maps the file and keeps an index of line start offsets, persisted
+next to the file (<file>.idx) and extended incrementally as the logger
+appends, so only new bytes are ever scanned. Lines are decoded lazily, which
+makes tail-N, paging and seek-by-timestamp (binary search over the index)
+instant even on archives of many gigabytes.
+
+    python jsonl_reader.py opcua_data.jsonl --tail 20 --tag Temperature
+    python jsonl_reader.py opcua_data.jsonl --since 1757312000 --until 1757312060
+
+Given the root of a partitioned archive, the CLI reads only the partitions
+that hold the tag and time range asked for (see opcua_partitions.py), and
+only the matching chunks of compacted partitions (opcua_compaction.py).
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from opcua_blobs import open_blob_store
+from opcua_compaction import partition_sources
+from opcua_format import TAG_IDS_KEY, DeltaDecoder, find_tag_ids
+from opcua_integrity import BLOCK_KEY
+from opcua_partitions import PartitionIndex, is_partitioned, record_time
+
+INDEX_MAGIC = b'JLIX'
+INDEX_VERSION = 2
+# magic, version, indexed bytes, line count, SHA-1 of the file's first HEAD_BYTES,
+# length of the tag dictionary (JSON) that follows the header, before the offsets
+INDEX_HEADER = struct.Struct('<4sIQQ20sI')
+HEAD_BYTES = 4096
+SCAN_CHUNK_BYTES = 64 << 20
+
+
+class JsonlReader:
+    """Random access reader for a JSONL file that may still be growing."""
+
+    def __init__(self, path: str, index_path: Optional[str] = None, persist_index: bool = True):
+        """
+        Args:
+            path: JSONL file
+            index_path: Offset index file (default: <path>.idx)
+            persist_index: Use and save the index file, so the next reader only scans new data
+                (False: always scan the whole file and leave the index file alone)
+        """
+        self.path = path
+        self.index_path = index_path or path + '.idx'
+        self.persist_index = persist_index
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._size = 0
+        self._offsets = np.zeros(0, dtype=np.uint64)   # start offset of every complete line
+        self._indexed = 0                               # bytes covered by the index
+        self._digest = b''                              # _head_digest(self._indexed)
+        self._tag_ids: Dict[str, int] = {}              # dictionary-encoded tag ids (opcua_format)
+        self._tag_names: Dict[int, str] = {}
+        self._saved_tag_count = 0                       # dictionary size in the saved index
+        self._loaded = False
+        self.refresh()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _head_digest(self, length: int) -> bytes:
+        """SHA-1 of the first bytes of the file, used to detect a replaced file."""
+        return hashlib.sha1(self._mmap[:min(HEAD_BYTES, length)]).digest()
+
+    def _load_index(self) -> None:
+        """Load the persisted index if it belongs to this file."""
+        try:
+            with open(self.index_path, 'rb') as f:
+                magic, version, indexed, count, digest, dict_length = INDEX_HEADER.unpack(
+                    f.read(INDEX_HEADER.size))
+                if magic != INDEX_MAGIC or version != INDEX_VERSION or indexed > self._size:
+                    return
+                if digest != self._head_digest(indexed):
+                    return
+                tag_ids = json.loads(f.read(dict_length))
+                offsets = np.fromfile(f, dtype='<u8', count=count)
+        except (OSError, struct.error, ValueError):
+            return
+        if len(offsets) == count:
+            self._offsets = offsets.astype(np.uint64)
+            self._indexed = indexed
+            self._add_tag_ids(tag_ids)
+            self._saved_tag_count = len(self._tag_ids)
+
+    def _save_index(self, new_offsets: np.ndarray, rewrite: bool) -> None:
+        """Persist the index, appending only the new offsets when possible."""
+        tag_ids = json.dumps(self._tag_ids).encode('utf-8')
+        header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self._indexed, len(self._offsets),
+                                   self._head_digest(self._indexed), len(tag_ids))
+        try:
+            # The dictionary sits before the offsets, so new tags mean a rewrite
+            if rewrite or len(self._tag_ids) != self._saved_tag_count or not os.path.exists(self.index_path):
+                tmp_path = self.index_path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(header)
+                    f.write(tag_ids)
+                    self._offsets.astype('<u8').tofile(f)
+                os.replace(tmp_path, self.index_path)
+                self._saved_tag_count = len(self._tag_ids)
+            else:
+                with open(self.index_path, 'r+b') as f:
+                    f.seek(0, os.SEEK_END)
+                    new_offsets.astype('<u8').tofile(f)
+                    f.seek(0)
+                    f.write(header)
+        except OSError:
+            # Read-only location: the index just isn't reused next time
+            pass
+
+    def refresh(self) -> int:
+        """
+        Pick up lines appended since the last refresh.
+
+        Only the new bytes are scanned. A file that was truncated or replaced
+        (e.g. by compaction) is indexed again from the start.
+
+        Returns:
+            int: Number of new lines
+        """
+        size = os.path.getsize(self.path)
+        if size == self._size and self._file is not None:
+            return 0
+
+        # The mapping has a fixed length, so map the file again at its new size
+        self.close()
+        self._file = open(self.path, 'rb')
+        self._size = size
+        if size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        rewrite = False
+        if not self._loaded:
+            self._loaded = True
+            if size and self.persist_index:
+                self._load_index()
+            rewrite = self._indexed == 0
+        elif self._indexed > size or (size and self._head_digest(self._indexed) != self._digest):
+            self._offsets = np.zeros(0, dtype=np.uint64)
+            self._indexed = 0
+            self._tag_ids, self._tag_names = {}, {}
+            rewrite = True
+
+        before = len(self._offsets)
+        scan_start = self._indexed
+        new_offsets = self._scan(self._indexed, size) if size else np.zeros(0, dtype=np.uint64)
+        if len(new_offsets):
+            self._add_tag_ids(find_tag_ids(self._mmap, scan_start, self._indexed))
+        if len(new_offsets):
+            self._offsets = np.concatenate([self._offsets, new_offsets])
+        self._digest = self._head_digest(self._indexed) if size else b''
+        if self.persist_index and size and (len(new_offsets) or rewrite):
+            self._save_index(new_offsets, rewrite)
+        return len(self._offsets) - before
+
+    def _add_tag_ids(self, tag_ids: Dict[str, int]) -> None:
+        for name, tag_id in tag_ids.items():
+            self._tag_ids[name] = tag_id
+            self._tag_names[tag_id] = name
+
+    def _scan(self, start: int, end: int) -> np.ndarray:
+        """Find the starts of the complete lines in [start, end) and advance the indexed position."""
+        starts = []
+        line_start = start
+        position = start
+        while position < end:
+            chunk_end = min(position + SCAN_CHUNK_BYTES, end)
+            chunk = np.frombuffer(self._mmap, dtype=np.uint8, count=chunk_end - position, offset=position)
+            newlines = np.flatnonzero(chunk == 10).astype(np.uint64) + np.uint64(position)
+            if len(newlines):
+                # A line starts at line_start and after every newline but the last
+                starts.append(np.concatenate([np.array([line_start], dtype=np.uint64), newlines[:-1] + 1]))
+                line_start = int(newlines[-1]) + 1
+            position = chunk_end
+        # Only complete lines are indexed; a partial last line is picked up once it is finished
+        self._indexed = line_start
+        return np.concatenate(starts) if starts else np.zeros(0, dtype=np.uint64)
+
+    # ------------------------------------------------------------------
+    # Line access
+    # ------------------------------------------------------------------
+
+    def line(self, index: int) -> bytes:
+        """Raw bytes of one line (without the newline)."""
+        if index < 0:
+            index += len(self._offsets)
+        if not 0 <= index < len(self._offsets):
+            raise IndexError(f"line {index} out of range")
+        start = int(self._offsets[index])
+        end = int(self._offsets[index + 1]) - 1 if index + 1 < len(self._offsets) else self._indexed - 1
+        return self._mmap[start:end]
+
+    def _decode(self, index: int) -> Optional[Dict[str, Any]]:
+        """Decode one line, resolving tag ids; None if it is blank or not valid JSON."""
+        try:
+            record = json.loads(self.line(index))
+        except ValueError:
+            return None
+        if not isinstance(record, dict):
+            return None
+        if "id" in record and "tag" not in record:
+            tag_id = record.pop("id")
+            record = dict(tag=self._tag_names.get(tag_id, f"#{tag_id}"), **record)
+        return record
+
+    def record(self, index: int) -> Optional[Dict[str, Any]]:
+        """
+        Decode one line, resolving tag ids and array deltas.
+
+        A delta record gets its full value by scanning back to the tag's last
+        keyframe (at most keyframe_samples records of the tag) and patching it.
+        Its value is None if the keyframe is missing.
+        """
+        record = self._decode(index)
+        if record is None or "delta" not in record:
+            return record
+
+        tag = record["tag"]
+        needles = self._tag_needles(tag)
+        deltas = [record.pop("delta")]
+        position = index - 1
+        while position >= 0:
+            line = self.line(position)
+            if any(needle in line for needle in needles):
+                earlier = self._decode(position)
+                if earlier is not None and earlier.get("tag") == tag:
+                    if "delta" not in earlier:
+                        decoder = DeltaDecoder()
+                        decoder.keyframe(tag, earlier.get("value"))
+                        for delta in reversed(deltas):
+                            value = decoder.apply(tag, delta)
+                        record["value"] = value
+                        return record
+                    deltas.append(earlier["delta"])
+            position -= 1
+        record["value"] = None
+        return record
+
+    __getitem__ = record
+
+    def records(self, start: int = 0, stop: Optional[int] = None, tag: Optional[str] = None
+                ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Decode lines start..stop lazily.
+
+        Args:
+            start: First line
+            stop: End line (exclusive, default: end of file)
+            tag: Only yield data records of this tag
+
+        Yields:
+            tuple: (line number, record)
+        """
+        stop = len(self._offsets) if stop is None else min(stop, len(self._offsets))
+        needles = self._tag_needles(tag)
+        for index in range(max(0, start), stop):
+            if needles and not any(needle in self.line(index) for needle in needles):
+                continue
+            record = self.record(index)
+            if record is None or TAG_IDS_KEY in record or BLOCK_KEY in record or \
+                    (tag is not None and record.get('tag') != tag):
+                continue
+            yield index, record
+
+    def tail(self, count: int, tag: Optional[str] = None, before: Optional[int] = None
+             ) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Get the last records of the file, scanning backwards from the end.
+
+        Args:
+            count: Number of records
+            tag: Only return data records of this tag
+            before: Scan backwards from this line (exclusive) instead of the end
+
+        Returns:
+            list: (line number, record) in file order
+        """
+        needles = self._tag_needles(tag)
+        found = []
+        index = min(len(self._offsets), len(self._offsets) if before is None else before) - 1
+        while index >= 0 and len(found) < count:
+            line = self.line(index)
+            if not needles or any(needle in line for needle in needles):
+                record = self.record(index)
+                if record is not None and TAG_IDS_KEY not in record and BLOCK_KEY not in record and \
+                        (tag is None or record.get('tag') == tag):
+                    found.append((index, record))
+            index -= 1
+        found.reverse()
+        return found
+
+    def _tag_needles(self, tag: Optional[str]) -> List[bytes]:
+        """Byte strings one of which every line of the tag contains, to skip other lines without decoding."""
+        if tag is None:
+            return []
+        needles = [json.dumps(tag, ensure_ascii=False).encode('utf-8')]
+        if tag in self._tag_ids:
+            needles.append(b'{"id": %d,' % self._tag_ids[tag])
+        return needles
+
+    def resolve_blob(self, value: Any) -> Any:
+        """Load the content of a blob reference (bytes or str); other values are returned unchanged."""
+        store = open_blob_store(self.path)
+        return value if store is None else store.resolve(value)
+
+    # ------------------------------------------------------------------
+    # Seeking by time
+    # ------------------------------------------------------------------
+
+    def _time_at(self, index: int, stop: int) -> Tuple[int, Any]:
+        """Timestamp of the first timestamped line at or after index (schema lines have none)."""
+        while index < stop:
+            record = self._decode(index)
+            if record is not None and 'timestamp' in record:
+                return index, _time_key(record['timestamp'])
+            index += 1
+        return stop, None
+
+    def find_time(self, timestamp: Any) -> int:
+        """
+        Binary search for the first line with a timestamp >= the given one.
+
+        Unix timestamps are compared as numbers, formatted timestamps as
+        strings (which sorts correctly for year-first formats such as ISO 8601).
+
+        Args:
+            timestamp: Unix seconds (number or string) or a formatted timestamp
+
+        Returns:
+            int: Line number (len(reader) if every line is earlier)
+        """
+        target = _time_key(timestamp)
+        low, high = 0, len(self._offsets)
+        while low < high:
+            middle = (low + high) // 2
+            index, value = self._time_at(middle, high)
+            if value is None:
+                high = middle
+            elif _time_less(value, target):
+                low = index + 1
+            else:
+                high = middle
+        return low
+
+    def range(self, start: Any = None, end: Any = None, tag: Optional[str] = None, slack: float = 60.0
+              ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yield the records with start <= timestamp < end.
+
+        Records are only ordered per flush batch (events first, then tag by
+        tag), so the scan starts `slack` seconds before the binary search
+        result and stops once timestamps are `slack` seconds past the end.
+
+        Args:
+            start: Earliest timestamp (None: start of file)
+            end: End timestamp, exclusive (None: end of file)
+            tag: Only yield data records of this tag
+            slack: Maximum disorder of timestamps in the file in seconds (unix timestamps only)
+
+        Yields:
+            tuple: (line number, record)
+        """
+        start_key = None if start is None else _time_key(start)
+        end_key = None if end is None else _time_key(end)
+        first = 0
+        if start_key is not None:
+            first = self.find_time(start_key - slack if isinstance(start_key, float) else start_key)
+        stop_key = end_key + slack if isinstance(end_key, float) else end_key
+
+        for index, record in self.records(first, tag=tag):
+            if 'timestamp' not in record:
+                continue
+            value = _time_key(record['timestamp'])
+            if stop_key is not None and not _time_less(value, stop_key):
+                break
+            if start_key is not None and _time_less(value, start_key):
+                continue
+            if end_key is not None and not _time_less(value, end_key):
+                continue
+            yield index, record
+
+
+def _time_key(timestamp: Any) -> Any:
+    """Comparable form of a timestamp: float for unix time, else the string."""
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    try:
+        return float(timestamp)
+    except (TypeError, ValueError):
+        return str(timestamp)
+
+
+def _time_less(a: Any, b: Any) -> bool:
+    """a < b for time keys; numbers and strings are compared as strings if mixed."""
+    if type(a) is type(b):
+        return a < b
+    return str(a) < str(b)
+
+
+def _partition_rows(path: str, args: argparse.Namespace, tail: Optional[int] = None
+                    ) -> List[Tuple[str, Any, Dict[str, Any]]]:
+    """Get the matching (file, line number or "chunk", record) rows of one partition."""
+    tags = [args.tag] if args.tag else None
+    start = record_time(args.since, args.timestamp_format) if args.since else None
+    end = record_time(args.until, args.timestamp_format) if args.until else None
+    compacted, raw_files = partition_sources(path, args.timestamp_format)
+    rows: List[Tuple[str, Any, Dict[str, Any]]] = []
+    if compacted is not None:
+        found = list(compacted.records(tags, start, end))
+        if tail is not None:
+            found.sort(key=lambda record: record_time(record["timestamp"], args.timestamp_format))
+            found = found[-tail:]
+        rows.extend((compacted.data_path, "chunk", record) for record in found)
+    for raw_file in raw_files:
+        with JsonlReader(raw_file, persist_index=not args.no_index) as reader:
+            if tail is not None:
+                found = reader.tail(tail, args.tag)
+            else:
+                found = list(reader.range(args.since, args.until, args.tag))
+        rows.extend((raw_file, index, record) for index, record in found)
+    return rows if tail is None else rows[-tail:]
+
+
+def _query_partitions(root: str, args: argparse.Namespace) -> None:
+    """Print records of the partitions of an archive that match the tag and time range."""
+    tags = [args.tag] if args.tag else None
+    start = record_time(args.since, args.timestamp_format) if args.since else None
+    end = record_time(args.until, args.timestamp_format) if args.until else None
+    paths = PartitionIndex(root).select(tags, start, end)
+    if not (args.tail or args.since or args.until):
+        print(f"{root}: {len(paths):,} partitions")
+        return
+
+    rows: List[Tuple[str, Any, Dict[str, Any]]] = []
+    if args.tail:
+        # Newest partitions first, until enough records are found
+        for path in reversed(paths):
+            rows[:0] = _partition_rows(path, args, args.tail - len(rows))
+            if len(rows) >= args.tail:
+                break
+    else:
+        for path in paths:
+            rows.extend(_partition_rows(path, args))
+    for path, index, record in rows:
+        print(f"{os.path.relpath(path, root)}:{index}\t{json.dumps(record, ensure_ascii=False)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Random access to OPC UA logger JSONL files")
+    parser.add_argument("file", help="JSONL data file or partitioned archive root")
+    parser.add_argument("--tail", type=int, metavar="N", help="Print the last N records")
+    parser.add_argument("--tag", help="Only print records of this tag")
+    parser.add_argument("--since", help="Print records from this timestamp on")
+    parser.add_argument("--until", help="Print records before this timestamp")
+    parser.add_argument("--lines", metavar="START:STOP", help="Print a range of line numbers")
+    parser.add_argument("--no-index", action="store_true", help="Don't read or write the .idx file")
+    parser.add_argument("--timestamp-format", default="unix",
+                        help="The logger's logging.timestamp_format, for --since/--until on archives")
+    args = parser.parse_args()
+
+    if is_partitioned(args.file):
+        if args.lines:
+            parser.error("--lines needs a single data file")
+        _query_partitions(args.file, args)
+        return
+
+    with JsonlReader(args.file, persist_index=not args.no_index) as reader:
+        if args.tail:
+            rows = reader.tail(args.tail, args.tag)
+        elif args.since or args.until:
+            rows = reader.range(args.since, args.until, args.tag)
+        elif args.lines:
+            start, _, stop = args.lines.partition(':')
+            rows = reader.records(int(start or 0), int(stop) if stop else None, args.tag)
+        else:
+            print(f"{args.file}: {len(reader):,} lines")
+            return
+        for index, record in rows:
+            print(f"{index}\t{json.dumps(record, ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,333 @@
 import json
 import csv
+import os
+import threading
 from collections import defaultdict
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from opcua_blobs import BlobStore, open_blob_store
+from opcua_format import TAG_IDS_KEY, DeltaDecoder
+from opcua_compaction import CompactedPartition, partition_sources
+from opcua_integrity import BlockChecker
+from opcua_partitions import BLOB_DIR_NAME, PartitionIndex, is_partitioned, record_time
+
+# Report load progress roughly every this many bytes
+PROGRESS_STEP_BYTES = 1 << 20
+# Format of formatted (non-UNIX) timestamps that aren't ISO 8601 (the logger's default)
+DEFAULT_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
 
 class JSONLToCSVConverter:
     """A class to convert JSONL files to CSV format without running as a script."""
     
-    def __init__(self):
+    def __init__(self, timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT):
+        """
+        Args:
+            timestamp_format: The logger's logging.timestamp_format, to parse formatted timestamps
+        """
+        self.timestamp_format = timestamp_format
         self.data = defaultdict(lambda: {"timestamps": [], "values": []})
+        self.events = defaultdict(lambda: {"fields": [], "timestamps": [], "values": []})
+        self._columns: Dict[str, Dict[str, np.ndarray]] = {}
+        self.blobs: Optional[BlobStore] = None
+        # Damage skipped by the last load (see opcua_integrity.py)
+        self.load_errors: Dict[str, int] = {"invalid_lines": 0, "corrupt_blocks": 0, "dropped_lines": 0}
     
-    def load_jsonl(self, jsonl_file: str) -> bool:
+    def load_jsonl(self, jsonl_file: str,
+                   progress_callback: Optional[Callable[[int, int], None]] = None,
+                   cancel_event: Optional[threading.Event] = None) -> bool:
         """
         Load data from a JSONL file.
         
+        Lines that aren't valid JSON (e.g. a line torn by a crash) and blocks
+        whose checksum doesn't match are skipped and counted in load_errors.
+        
         Args:
-            jsonl_file: Path to the JSONL file
+            jsonl_file: Path to the JSONL file, or the root of a partitioned archive
+                (all partitions are loaded, see load_partitions)
+            progress_callback: Optional callable receiving (bytes_read, total_bytes)
+            cancel_event: Optional event; loading stops when it is set
             
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful, False otherwise (including when cancelled)
         """
+        if is_partitioned(jsonl_file):
+            return self.load_partitions(jsonl_file, progress_callback=progress_callback, cancel_event=cancel_event)
         try:
-            self.data = defaultdict(lambda: {"timestamps": [], "values": []})
+            self._reset()
+            # Large values stay blob references until resolve_blob() is asked for them
+            self.blobs = open_blob_store(jsonl_file)
+            total_bytes = os.path.getsize(jsonl_file)
+            bytes_read = self._read_jsonl(jsonl_file, 0, total_bytes, progress_callback, cancel_event)
+            if bytes_read is None:
+                return False
             
-            with open(jsonl_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
+            if progress_callback:
+                progress_callback(bytes_read, total_bytes)
+            self._report_load_errors()
+            return True
+        except Exception as e:
+            print(f"Error loading JSONL file: {e}")
+            return False
+    
+    def load_partitions(self, root: str, tags: Optional[List[str]] = None,
+                        start: Optional[float] = None, end: Optional[float] = None,
+                        progress_callback: Optional[Callable[[int, int], None]] = None,
+                        cancel_event: Optional[threading.Event] = None) -> bool:
+        """
+        Load data from a partitioned archive, reading only the partitions that can match.
+        
+        Compacted partitions are read chunk by chunk, skipping the chunks of
+        other tags and times.
+        
+        Args:
+            root: Archive root directory (see opcua_partitions.py)
+            tags: Tags to load (default: all tags, and events)
+            start: Unix time of the first sample to load
+            end: Unix time (exclusive) of the end of the range
+            progress_callback: Optional callable receiving (bytes_read, total_bytes)
+            cancel_event: Optional event; loading stops when it is set
+            
+        Returns:
+            bool: True if successful, False otherwise (including when cancelled)
+        """
+        try:
+            self._reset()
+            blob_dir = os.path.join(root, BLOB_DIR_NAME)
+            self.blobs = BlobStore(blob_dir) if os.path.isdir(blob_dir) else None
+            sources = [partition_sources(path, self.timestamp_format) for path in PartitionIndex(root).select(tags, start, end,
+                                                                                        events=tags is None)]
+            total_bytes = sum(os.path.getsize(raw_file) for _, raw_files in sources for raw_file in raw_files)
+            total_bytes += sum(chunk["length"] for compacted, _ in sources if compacted is not None
+                               for chunk in compacted.chunks(tags, start, end))
+            bytes_read = 0
+            wanted = set(tags) if tags is not None else None
+            for compacted, raw_files in sources:
+                if compacted is not None:
+                    if cancel_event is not None and cancel_event.is_set():
+                        print("JSONL loading cancelled")
+                        return False
+                    bytes_read += self._read_compacted(compacted, tags, start, end)
+                    if progress_callback:
+                        progress_callback(bytes_read, total_bytes)
+                for raw_file in raw_files:
+                    bytes_read = self._read_jsonl(raw_file, bytes_read, total_bytes, progress_callback,
+                                                  cancel_event, wanted, start, end)
+                    if bytes_read is None:
+                        return False
+            
+            if progress_callback:
+                progress_callback(bytes_read, total_bytes)
+            self._report_load_errors()
+            return True
+        except Exception as e:
+            print(f"Error loading partitioned archive: {e}")
+            return False
+    
+    def _read_compacted(self, compacted: CompactedPartition, tags: Optional[List[str]],
+                        start: Optional[float], end: Optional[float]) -> int:
+        """
+        Add the matching chunks of a compacted partition to the loaded data.
+        
+        Returns:
+            int: Compressed bytes read
+        """
+        bytes_read = 0
+        for chunk in compacted.chunks(tags, start, end, events=tags is None):
+            bytes_read += chunk["length"]
+            try:
+                records = compacted.read_chunk(chunk)
+            except (OSError, EOFError, ValueError) as e:
+                # gzip checks the chunk's CRC; a damaged chunk is skipped
+                print(f"Skipping corrupt chunk of {compacted.data_path} at {chunk['offset']}: {e}")
+                self.load_errors["corrupt_blocks"] += 1
+                self.load_errors["dropped_lines"] += chunk["count"]
+                continue
+            if "event" in chunk:
+                self.events[chunk["event"]]["fields"] = compacted.schemas.get(chunk["event"], [])
+                for record in records:
+                    self._add_event_record(record)
+                continue
+            tag_data = self.data[chunk["tag"]]
+            for record in records:
+                if start is not None or end is not None:
+                    ts = record_time(record["timestamp"], self.timestamp_format)
+                    if (start is not None and ts < start) or (end is not None and ts >= end):
                         continue
-                    
+                tag_data["timestamps"].append(record["timestamp"])
+                tag_data["values"].append(record["value"])
+        return bytes_read
+    
+    def _reset(self) -> None:
+        self.data = defaultdict(lambda: {"timestamps": [], "values": []})
+        self.events = defaultdict(lambda: {"fields": [], "timestamps": [], "values": []})
+        self._columns = {}
+        self.blobs = None
+        self.load_errors = {"invalid_lines": 0, "corrupt_blocks": 0, "dropped_lines": 0}
+    
+    def _report_load_errors(self) -> None:
+        errors = self.load_errors
+        if errors["invalid_lines"] or errors["corrupt_blocks"]:
+            print(f"Skipped {errors['invalid_lines']} invalid lines and {errors['corrupt_blocks']} corrupt blocks "
+                  f"({errors['dropped_lines']} lines); run opcua_integrity.py to inspect or repair the data")
+    
+    def _read_jsonl(self, jsonl_file: str, bytes_read: int, total_bytes: int,
+                    progress_callback: Optional[Callable[[int, int], None]],
+                    cancel_event: Optional[threading.Event], tags: Optional[set] = None,
+                    start: Optional[float] = None, end: Optional[float] = None) -> Optional[int]:
+        """
+        Add the records of one file to the loaded data.
+        
+        Args:
+            jsonl_file: Path to the JSONL file
+            bytes_read: Bytes read before this file (for progress reports)
+            total_bytes: Bytes to read in total
+            progress_callback: Optional callable receiving (bytes_read, total_bytes)
+            cancel_event: Optional event; reading stops when it is set
+            tags: Only keep samples of these tags, and no events (default: everything)
+            start: Only keep samples from this unix time on
+            end: Only keep samples before this unix time
+            
+        Returns:
+            int: bytes_read including this file, or None if cancelled
+        """
+        tag_names: Dict[int, str] = {}
+        deltas = DeltaDecoder()
+        next_report = bytes_read + PROGRESS_STEP_BYTES
+        in_range: Dict[Any, bool] = {}  # timestamp -> within [start, end)
+        checker = BlockChecker()
+        bad_blocks = 0
+        cancelled = False
+        
+        def checked_lines():
+            """Raw lines that passed their block checks, with progress reports."""
+            nonlocal bytes_read, next_report, cancelled
+            for raw_line in f:
+                bytes_read += len(raw_line)
+                if bytes_read >= next_report:
+                    next_report = bytes_read + PROGRESS_STEP_BYTES
+                    if cancel_event is not None and cancel_event.is_set():
+                        cancelled = True
+                        return
+                    if progress_callback:
+                        progress_callback(bytes_read, total_bytes)
+                yield from checker.feed(raw_line)
+            yield from checker.finish()
+        
+        # Binary mode so the byte position is known without tell()
+        with open(jsonl_file, "rb") as f:
+            for raw_line in checked_lines():
+                line = raw_line.strip()
+                if not line:
+                    continue
+                
+                if checker.bad_blocks != bad_blocks:
+                    # Keyframes may have been in the dropped block
+                    bad_blocks = checker.bad_blocks
+                    deltas = DeltaDecoder()
+                try:
                     record = json.loads(line)
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict):
+                    self.load_errors["invalid_lines"] += 1
+                    continue
+                if "tag" in record:
                     tag = record["tag"]
-                    timestamp = record["timestamp"]
+                elif "id" in record:
+                    # Dictionary-encoded tag id
+                    tag = tag_names.get(record["id"])
+                    if tag is None:
+                        tag = f"#{record['id']}"
+                elif TAG_IDS_KEY in record:
+                    tag_names.update((tag_id, name) for name, tag_id in record[TAG_IDS_KEY].items())
+                    continue
+                else:
+                    if tags is None:
+                        self._add_event_record(record)
+                    continue
+                if tags is not None and tag not in tags:
+                    continue
+                
+                timestamp = record["timestamp"]
+                if "delta" in record:
+                    # Element-level delta of an array tag
+                    value = deltas.apply(tag, record["delta"])
+                    if value is None:
+                        continue
+                else:
                     value = record["value"]
-                    
-                    self.data[tag]["timestamps"].append(timestamp)
-                    self.data[tag]["values"].append(value)
+                    deltas.keyframe(tag, value)
+                
+                if start is not None or end is not None:
+                    keep = in_range.get(timestamp)
+                    if keep is None:
+                        try:
+                            ts = record_time(timestamp, self.timestamp_format)
+                            keep = (start is None or ts >= start) and (end is None or ts < end)
+                        except ValueError:
+                            keep = True  # unknown timestamp format: only pruned by partition
+                        in_range[timestamp] = keep
+                    if not keep:
+                        continue
+                
+                self.data[tag]["timestamps"].append(timestamp)
+                self.data[tag]["values"].append(value)
+        
+        self.load_errors["corrupt_blocks"] += checker.bad_blocks
+        self.load_errors["dropped_lines"] += checker.dropped_lines
+        if cancelled:
+            print("JSONL loading cancelled")
+            return None
+        return bytes_read
+    
+    def _add_event_record(self, record: Dict[str, Any]) -> None:
+        """Collect an event schema line or a compact event line."""
+        if "schema" in record:
+            self.events[record["schema"]]["fields"] = record["fields"]
+        elif "event" in record:
+            source = self.events[record["event"]]
+            source["timestamps"].append(record["timestamp"])
+            source["values"].append(record["fields"])
+    
+    def convert_events_to_csv(self, csv_file: str) -> bool:
+        """
+        Write loaded events to CSV, one block per event source.
+        
+        Each block starts with a header row (event, timestamp and the source's
+        field names) followed by one row per event.
+        
+        Args:
+            csv_file: Path to output CSV file
             
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            with open(csv_file, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                for name, source in self.events.items():
+                    writer.writerow(["event", "timestamp"] + source["fields"])
+                    for timestamp, fields in zip(source["timestamps"], source["values"]):
+                        writer.writerow([name, timestamp] + fields)
             return True
         except Exception as e:
-            print(f"Error loading JSONL file: {e}")
+            print(f"Error writing events CSV file: {e}")
             return False
     
-    def convert_to_csv(self, csv_file: str, format_type: str = "default") -> bool:
+    def convert_to_csv(self, csv_file: str, format_type: str = "default",
+                       cancel_event: Optional[threading.Event] = None) -> bool:
         """
         Convert loaded data to CSV format.
         
         Args:
             csv_file: Path to output CSV file
             format_type: Format type - "default" or "old_format"
+            cancel_event: Optional event; writing stops between tags when it is set
             
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful, False otherwise (including when cancelled)
         """
         try:
             with open(csv_file, "w", newline="", encoding="utf-8") as f:
@@ -59,6 +336,9 @@ class JSONLToCSVConverter:
                 if format_type == "default":
                     # Default format: timestamp and value rows for each tag
                     for tag, tag_data in self.data.items():
+                        if cancel_event is not None and cancel_event.is_set():
+                            print("CSV writing cancelled")
+                            return False
                         # Row 1: timestamps
                         timestamp_row = [f"timestamp_{tag}"] + tag_data["timestamps"]
                         writer.writerow(timestamp_row)
@@ -69,6 +349,9 @@ class JSONLToCSVConverter:
                 else:
                     # Old format: tag_name row followed by timestamp row
                     for tag, tag_data in self.data.items():
+                        if cancel_event is not None and cancel_event.is_set():
+                            print("CSV writing cancelled")
+                            return False
                         if not tag_data["values"]:
                             continue
                         # Value row
@@ -92,10 +375,16 @@ class JSONLToCSVConverter:
             csv_file: Path to output CSV file
             format_type: Format type - "default" or "old_format"
             
+        Events, if the file has any, are written to <csv_file>_events.csv.
+            
         Returns:
             bool: True if successful, False otherwise
         """
         if self.load_jsonl(jsonl_file):
+            if self.events:
+                events_file = os.path.splitext(csv_file)[0] + "_events.csv"
+                if not self.convert_events_to_csv(events_file):
+                    return False
             return self.convert_to_csv(csv_file, format_type)
         return False
     
@@ -109,4 +398,259 @@ class JSONLToCSVConverter:
     
     def get_data_summary(self) -> Dict[str, int]:
         """Get summary of loaded data."""
-        return {tag: len(data["values"]) for tag, data in self.data.items()}
\ No newline at end of file
+        return {tag: len(data["values"]) for tag, data in self.data.items()}
+    
+    def resolve_blob(self, value: Any) -> Any:
+        """
+        Load the content of a blob reference from the file's blob store.
+        
+        Args:
+            value: A loaded value; anything but a blob reference is returned unchanged
+            
+        Returns:
+            bytes or str for blob references, else the value
+        """
+        if self.blobs is None:
+            return value
+        return self.blobs.resolve(value)
+    
+    def get_value(self, tag: str, index: int, resolve_blobs: bool = True) -> Any:
+        """
+        Get one value of a tag.
+        
+        Args:
+            tag: Tag name
+            index: Sample index (negative counts from the end)
+            resolve_blobs: Load blob contents instead of returning the reference
+            
+        Returns:
+            The value
+        """
+        value = self.data[tag]["values"][index]
+        return self.resolve_blob(value) if resolve_blobs else value
+    
+    # ------------------------------------------------------------------
+    # Typed columns and vectorized analysis
+    # ------------------------------------------------------------------
+    
+    def _timestamps_to_seconds(self, timestamps: List[Any]) -> np.ndarray:
+        """Convert logged timestamps (UNIX seconds or formatted local times) to float64 seconds."""
+        try:
+            return np.asarray(timestamps, dtype=np.float64)
+        except (TypeError, ValueError):
+            # Formatted timestamps are local times in timestamp_format (or ISO 8601)
+            return np.fromiter((record_time(ts, self.timestamp_format) for ts in timestamps),
+                               dtype=np.float64, count=len(timestamps))
+    
+    @staticmethod
+    def _values_to_array(values: List[Any]) -> Optional[np.ndarray]:
+        """
+        Build a typed array from a tag's values.
+        
+        NumPy infers the dtype: bool, int64 (uint64 for UInt64 values beyond
+        the int64 range), or float64 for floats, mixed integers and floats, and
+        values with gaps (None becomes NaN). Scalars become a 1-D array, equally
+        shaped numeric arrays of any rank an (points x ...) array, e.g. 3-D for
+        matrices. Returns None for anything else (strings, even numeric ones,
+        structures, bytes, ragged arrays).
+        """
+        if any(isinstance(value, (str, bytes)) for value in values):
+            return None
+        try:
+            array = np.asarray(values)
+        except (TypeError, ValueError):
+            return None  # ragged nesting
+        if array.ndim == 0:
+            return None
+        kind = array.dtype.kind
+        if kind == 'f' and array.ndim == 1 and all(type(value) is int for value in values):
+            # Python ints beyond the int64 range: NumPy falls back to float64
+            try:
+                return np.asarray(values, dtype=np.uint64)
+            except OverflowError:
+                return array
+        if kind == 'O':
+            # None gaps; anything but numbers (nested strings, structures) is rejected
+            flat = array.ravel()
+            if not all(value is None or isinstance(value, (bool, int, float)) for value in flat):
+                return None
+            try:
+                return np.array([np.nan if value is None else value for value in flat],
+                                dtype=np.float64).reshape(array.shape)
+            except OverflowError:
+                return None
+        return array if kind in 'biuf' else None
+    
+    def get_columns(self, tag: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Get a tag's data as typed NumPy columns, sorted by time.
+        
+        Args:
+            tag: Tag name
+            
+        Returns:
+            dict: {"timestamps": float64 seconds, "values": bool, integer or float64
+                array (see _values_to_array)}, or None if the tag is unknown or not numeric
+        """
+        if tag not in self._columns:
+            tag_data = self.data.get(tag)
+            if not tag_data or not tag_data["values"]:
+                return None
+            values = self._values_to_array(tag_data["values"])
+            if values is None:
+                return None
+            try:
+                timestamps = self._timestamps_to_seconds(tag_data["timestamps"])
+            except ValueError as e:
+                print(f"Skipping tag {tag}: timestamps don't match format {self.timestamp_format!r}: {e}")
+                return None
+            order = np.argsort(timestamps, kind="stable")
+            self._columns[tag] = {"timestamps": timestamps[order], "values": values[order]}
+        return self._columns[tag]
+    
+    def get_numeric_tags(self) -> List[str]:
+        """Get the tags that have typed numeric columns."""
+        return [tag for tag in self.data if self.get_columns(tag) is not None]
+    
+    def get_statistics(self, tags: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute summary statistics of numeric tags.
+        
+        Array tags are summarized over all their elements; "shape" tells the
+        element layout.
+        
+        Args:
+            tags: Tags to summarize (default: all numeric tags)
+            
+        Returns:
+            dict: Per tag count, shape, min, max, mean, std, first/last value and time span
+        """
+        stats = {}
+        for tag in tags if tags is not None else self.get_numeric_tags():
+            columns = self.get_columns(tag)
+            if columns is None:
+                continue
+            timestamps, values = columns["timestamps"], columns["values"]
+            stats[tag] = {
+                "count": int(values.shape[0]),
+                "shape": list(values.shape[1:]),
+                "min": float(np.nanmin(values)),
+                "max": float(np.nanmax(values)),
+                "mean": float(np.nanmean(values)),
+                "std": float(np.nanstd(values)),
+                "first": values[0].tolist(),
+                "last": values[-1].tolist(),
+                "start": float(timestamps[0]),
+                "end": float(timestamps[-1]),
+            }
+        return stats
+    
+    def resample(self, tags: Optional[List[str]] = None, interval: float = 1.0, method: str = "last",
+                 start: Optional[float] = None, end: Optional[float] = None
+                 ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Resample numeric tags onto a common time grid.
+        
+        Args:
+            tags: Tags to resample (default: all numeric tags)
+            interval: Grid step in seconds
+            method: "last" (last value at or before each grid point), "mean" (mean of
+                the values in [t, t + interval)) or "interpolate" (linear, scalar tags)
+            start: First grid point (default: earliest timestamp of the tags)
+            end: Grid end, exclusive (default: just after the latest timestamp)
+            
+        Returns:
+            tuple: (grid timestamps, {tag: values on the grid, NaN where there is no data})
+        """
+        columns = {tag: self.get_columns(tag) for tag in (tags if tags is not None else self.get_numeric_tags())}
+        columns = {tag: col for tag, col in columns.items() if col is not None}
+        if not columns:
+            return np.empty(0), {}
+        
+        if start is None:
+            start = min(col["timestamps"][0] for col in columns.values())
+        if end is None:
+            end = max(col["timestamps"][-1] for col in columns.values()) + interval
+        grid = np.arange(start, end, interval)
+        
+        result = {}
+        for tag, col in columns.items():
+            timestamps, values = col["timestamps"], col["values"]
+            if method == "last":
+                index = np.searchsorted(timestamps, grid, side="right") - 1
+                resampled = values[np.clip(index, 0, None)].astype(np.float64)
+                resampled[index < 0] = np.nan
+            elif method == "mean":
+                bucket = np.floor((timestamps - start) / interval).astype(np.int64)
+                inside = (bucket >= 0) & (bucket < len(grid))
+                sums = np.zeros((len(grid),) + values.shape[1:])
+                np.add.at(sums, bucket[inside], values[inside])
+                counts = np.bincount(bucket[inside], minlength=len(grid)).astype(np.float64)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    resampled = sums / counts.reshape((-1,) + (1,) * (values.ndim - 1))
+            elif method == "interpolate":
+                if values.ndim != 1:
+                    raise ValueError(f"Interpolation needs a scalar tag: {tag}")
+                resampled = np.interp(grid, timestamps, values, left=np.nan, right=np.nan)
+            else:
+                raise ValueError(f"Unknown resample method: {method}")
+            result[tag] = resampled
+        return grid, result
+    
+    def join(self, tags: Optional[List[str]] = None, tolerance: Optional[float] = None
+             ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Time-align scalar tags on the union of their timestamps (as-of join).
+        
+        Each tag contributes its last value at or before every timestamp.
+        
+        Args:
+            tags: Scalar tags to join (default: all numeric scalar tags)
+            tolerance: Maximum age in seconds of a joined value; older values become NaN
+            
+        Returns:
+            tuple: (timestamps, {tag: aligned values})
+        """
+        if tags is None:
+            tags = [tag for tag in self.get_numeric_tags() if self.get_columns(tag)["values"].ndim == 1]
+        columns = {tag: self.get_columns(tag) for tag in tags}
+        columns = {tag: col for tag, col in columns.items() if col is not None and col["values"].ndim == 1}
+        if not columns:
+            return np.empty(0), {}
+        
+        timestamps = np.unique(np.concatenate([col["timestamps"] for col in columns.values()]))
+        result = {}
+        for tag, col in columns.items():
+            index = np.searchsorted(col["timestamps"], timestamps, side="right") - 1
+            valid = index >= 0
+            safe_index = np.clip(index, 0, None)
+            if tolerance is not None:
+                valid &= (timestamps - col["timestamps"][safe_index]) <= tolerance
+            result[tag] = np.where(valid, col["values"][safe_index], np.nan)
+        return timestamps, result
+    
+    def convert_resampled_to_csv(self, csv_file: str, interval: float = 1.0, method: str = "last",
+                                 tags: Optional[List[str]] = None) -> bool:
+        """
+        Write numeric scalar tags resampled onto a common grid as a column table.
+        
+        Args:
+            csv_file: Path to output CSV file
+            interval: Grid step in seconds
+            method: "last", "mean" or "interpolate"
+            tags: Tags to include (default: all numeric scalar tags)
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if tags is None:
+                tags = [tag for tag in self.get_numeric_tags() if self.get_columns(tag)["values"].ndim == 1]
+            grid, columns = self.resample(tags, interval, method)
+            table = np.column_stack([grid] + [columns[tag] for tag in columns])
+            header = ",".join(["timestamp"] + list(columns))
+            np.savetxt(csv_file, table, delimiter=",", header=header, comments="", fmt="%.15g")
+            return True
+        except Exception as e:
+            print(f"Error writing resampled CSV file: {e}")
+            return False
@@ -0,0 +1,129 @@
+"""
+Content-addressed storage for large ByteString and String values.
+
+A JSONL output with a blob_threshold writes values larger than the threshold
+to a blob store next to the data file (<data_file>.blobs/) and keeps only a
+reference in the JSONL line:
+
+    {"tag": "Image", "timestamp": "1757312000.1",
+     "value": {"__type__": "blob", "sha256": "9f86d0...", "size": 524288, "kind": "bytes"}}
+
+Blobs are named by the SHA-256 of their content (<store>/9f/9f86d0...), so a
+payload that repeats is stored once. Readers keep references as they are
+and load blob contents only on request (BlobStore.resolve).
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, List, Optional
+
+BLOB_TYPE = "blob"
+
+
+def blob_dir_for(data_file: str) -> str:
+    """Get the blob store directory of a JSONL data file."""
+    return data_file + '.blobs'
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and value.get("__type__") == BLOB_TYPE
+
+
+class BlobStore:
+    """A directory of blobs named by their SHA-256."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._known: set = set()  # hashes known to be stored
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def put(self, data: bytes) -> str:
+        """
+        Store data unless a blob with the same content exists.
+
+        Returns:
+            str: SHA-256 hex digest of the data
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._known:
+            return digest
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write and rename, so a blob is either complete or absent
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        self._known.add(digest)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with open(self._path(digest), 'rb') as f:
+            return f.read()
+
+    def resolve(self, value: Any) -> Any:
+        """
+        Load the content of a blob reference.
+
+        Returns:
+            bytes or str for blob references (per their kind), other values unchanged
+        """
+        if not is_blob_ref(value):
+            return value
+        data = self.get(value["sha256"])
+        return data.decode('utf-8') if value.get("kind") == "text" else data
+
+
+class BlobExtractor:
+    """Moves large values of data records into a BlobStore, replacing them by references."""
+
+    def __init__(self, store: BlobStore, threshold: int):
+        """
+        Args:
+            store: Where blobs go
+            threshold: Values larger than this many bytes (or characters) are stored as blobs
+        """
+        self.store = store
+        self.threshold = threshold
+
+    def _reference(self, data: bytes, kind: str) -> Dict[str, Any]:
+        return {"__type__": BLOB_TYPE, "sha256": self.store.put(data), "size": len(data), "kind": kind}
+
+    def externalize(self, value: Any) -> Any:
+        """Replace large values (also inside arrays and structures) by blob references."""
+        if isinstance(value, str):
+            if len(value) > self.threshold:
+                return self._reference(value.encode('utf-8'), "text")
+            return value
+        if isinstance(value, bytes):
+            # Records carry ByteStrings raw; the ones that stay inline are encoded on output
+            if len(value) > self.threshold:
+                return self._reference(value, "bytes")
+            return value
+        if isinstance(value, dict):
+            return {key: self.externalize(item) for key, item in value.items()}
+        # OPC UA arrays are homogeneous: only arrays of strings, bytes or structures can hold blobs
+        if isinstance(value, list) and value and isinstance(value[0], (str, bytes, dict, list)):
+            return [self.externalize(item) for item in value]
+        return value
+
+    def encode(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rewrite a batch of records."""
+        encoded = []
+        for record in records:
+            if "value" in record:
+                value = self.externalize(record["value"])
+                if value is not record["value"]:
+                    record = dict(record, value=value)
+            encoded.append(record)
+        return encoded
+
+
+def open_blob_store(data_file: str) -> Optional[BlobStore]:
+    """Get the blob store of a data file, or None if it has none."""
+    directory = blob_dir_for(data_file)
+    return BlobStore(directory) if os.path.isdir(directory) else None
+
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Address space browser for OPC UA servers.
+
+Walks the server address space with bounded parallel Browse/Read requests
+(following continuation points) and builds a catalog of variables with
+their NodeId, BrowsePath, DataType and AccessLevel. Catalogs are cached on
+disk, keyed by server URL and namespace array, so a large server only has
+to be browsed again when its namespace layout changes.
+
+Also resolves browse paths ("Objects/Line1/Motor3/Speed") to NodeIds with
+batched TranslateBrowsePathsToNodeIds requests, cached the same way.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from asyncua import ua
+
+DEFAULT_CACHE_DIR = ".opcua_cache"
+
+# First browse path segment -> starting node
+ROOT_NODES = {
+    "Root": ua.ObjectIds.RootFolder,
+    "Objects": ua.ObjectIds.ObjectsFolder,
+    "Types": ua.ObjectIds.TypesFolder,
+    "Views": ua.ObjectIds.ViewsFolder,
+}
+
+
+def format_browse_name(browse_name: ua.QualifiedName) -> str:
+    """Format a browse name as a path segment ("Name" in namespace 0, otherwise "ns:Name")."""
+    if browse_name.NamespaceIndex == 0:
+        return browse_name.Name
+    return f"{browse_name.NamespaceIndex}:{browse_name.Name}"
+
+
+def data_type_name(data_type: Any) -> str:
+    """Get a readable name for a DataType NodeId."""
+    if isinstance(data_type, ua.NodeId) and data_type.NamespaceIndex == 0 \
+            and data_type.Identifier in ua.ObjectIdNames:
+        return ua.ObjectIdNames[data_type.Identifier]
+    return data_type.to_string() if isinstance(data_type, ua.NodeId) else str(data_type)
+
+
+def cache_file_path(cache_dir: str, kind: str, server_url: str) -> str:
+    """Get the cache file for one kind of cached data (catalog, browse paths) of a server."""
+    digest = hashlib.sha1(server_url.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{kind}_{digest}.json")
+
+
+def load_cache(path: str, server_url: str, namespaces: List[str]) -> Optional[Dict[str, Any]]:
+    """Load a cache file if it belongs to this server and namespace array, else None."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('server_url') != server_url or cached.get('namespaces') != list(namespaces):
+        return None
+    return cached
+
+
+def save_cache(path: str, server_url: str, namespaces: List[str], **data) -> None:
+    """Atomically write a cache file stamped with the server URL and namespace array."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    cached = {'server_url': server_url, 'namespaces': list(namespaces), 'created': time.time()}
+    cached.update(data)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cached, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def namespace_index(namespaces: List[str], namespace: Any = None) -> int:
+    """
+    Get the index of a namespace given as index or URI.
+
+    Args:
+        namespaces: Server namespace array
+        namespace: Namespace index or URI; None selects the last (application) namespace
+
+    Returns:
+        int: Namespace index
+    """
+    if namespace is None:
+        return len(namespaces) - 1
+    if isinstance(namespace, int):
+        return namespace
+    try:
+        return namespaces.index(namespace)
+    except ValueError:
+        raise ValueError(f"Namespace not found on server: {namespace}")
+
+
+def parse_browse_path(path: str, default_namespace: int) -> Tuple[ua.NodeId, List[ua.QualifiedName]]:
+    """
+    Split a browse path into its starting node and target names.
+
+    Segments are "Name" or "ns:Name". A leading Root/Objects/Types/Views segment
+    selects the starting node (otherwise the path starts at Objects); other
+    segments without a namespace prefix are looked up in default_namespace.
+
+    Args:
+        path: Browse path, e.g. "Objects/Line1/Motor3/Speed" or "Objects/3:Line1/3:Speed"
+        default_namespace: Namespace index for segments without prefix
+
+    Returns:
+        tuple: (starting NodeId, list of QualifiedName)
+    """
+    segments = [segment for segment in path.strip('/').split('/') if segment]
+    root = ua.ObjectIds.ObjectsFolder
+    if segments and segments[0] in ROOT_NODES:
+        root = ROOT_NODES[segments.pop(0)]
+    if not segments:
+        raise ValueError(f"Browse path has no target: {path}")
+
+    names = []
+    for segment in segments:
+        prefix, sep, name = segment.partition(':')
+        if sep and prefix.isdigit():
+            names.append(ua.QualifiedName(name, int(prefix)))
+        else:
+            names.append(ua.QualifiedName(segment, default_namespace))
+    return ua.NodeId(root), names
+
+
+async def read_operation_limit(client, limit_id: int, default: int) -> int:
+    """Read one of the server's OperationLimits, falling back to default if unset or unreadable."""
+    try:
+        value = await client.get_node(ua.NodeId(limit_id)).read_value()
+        return int(value) or default
+    except Exception:
+        return default
+
+
+def chunked(items: List[Any], size: int) -> Iterable[List[Any]]:
+    """Split a list into chunks of at most size items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class NodeCatalog:
+    """Searchable list of server variables."""
+
+    def __init__(self, nodes: List[Dict[str, Any]]):
+        self.nodes = nodes
+        # Pre-lowered search keys so a search is a plain substring scan
+        self._keys = [f"{node['browse_path']} {node['node_id']} {node['data_type']}".lower()
+                      for node in nodes]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def search(self, query: str, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Find nodes whose browse path, NodeId or DataType contain every word of the query.
+
+        Args:
+            query: Space separated search terms (case insensitive)
+            limit: Maximum number of results
+
+        Returns:
+            list: Matching catalog entries
+        """
+        terms = query.lower().split()
+        results = []
+        for node, key in zip(self.nodes, self._keys):
+            if all(term in key for term in terms):
+                results.append(node)
+                if len(results) >= limit:
+                    break
+        return results
+
+
+class AddressSpaceBrowser:
+    """Concurrent address space walker building a NodeCatalog."""
+
+    def __init__(self, client, max_concurrency: int = 8, nodes_per_request: int = 50,
+                 max_references_per_node: int = 1000):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.nodes_per_request = nodes_per_request
+        self.max_references_per_node = max_references_per_node
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _browse_batch(self, node_ids: List[ua.NodeId]) -> List[List[ua.ReferenceDescription]]:
+        """Browse the hierarchical children of several nodes in one request, following continuation points."""
+        params = ua.BrowseParameters()
+        params.RequestedMaxReferencesPerNode = self.max_references_per_node
+        for node_id in node_ids:
+            desc = ua.BrowseDescription()
+            desc.NodeId = node_id
+            desc.BrowseDirection = ua.BrowseDirection.Forward
+            desc.ReferenceTypeId = ua.NodeId(ua.ObjectIds.HierarchicalReferences)
+            desc.IncludeSubtypes = True
+            desc.NodeClassMask = ua.NodeClass.Object | ua.NodeClass.Variable
+            desc.ResultMask = ua.BrowseResultMask.All
+            params.NodesToBrowse.append(desc)
+
+        async with self._semaphore:
+            results = await self.client.uaclient.browse(params)
+
+        references = [list(result.References) for result in results]
+        pending = {i: result.ContinuationPoint for i, result in enumerate(results) if result.ContinuationPoint}
+        while pending:
+            next_params = ua.BrowseNextParameters()
+            next_params.ReleaseContinuationPoints = False
+            next_params.ContinuationPoints = list(pending.values())
+            async with self._semaphore:
+                next_results = await self.client.uaclient.browse_next(next_params)
+            still_pending = {}
+            for i, result in zip(pending, next_results):
+                references[i].extend(result.References)
+                if result.ContinuationPoint:
+                    still_pending[i] = result.ContinuationPoint
+            pending = still_pending
+        return references
+
+    async def _read_attributes(self, variables: List[Dict[str, Any]]) -> None:
+        """Fill in DataType and AccessLevel of variables with batched Read requests."""
+        async def read_chunk(chunk):
+            params = ua.ReadParameters()
+            for node in chunk:
+                for attribute in (ua.AttributeIds.DataType, ua.AttributeIds.AccessLevel):
+                    rv = ua.ReadValueId()
+                    rv.NodeId = node['_nodeid']
+                    rv.AttributeId = attribute
+                    params.NodesToRead.append(rv)
+            async with self._semaphore:
+                results = await self.client.uaclient.read(params)
+            for node, data_type, access_level in zip(chunk, results[0::2], results[1::2]):
+                node['data_type'] = data_type_name(data_type.Value.Value) if data_type.StatusCode.is_good() else ''
+                node['access_level'] = int(access_level.Value.Value or 0) if access_level.StatusCode.is_good() else 0
+
+        await asyncio.gather(*(read_chunk(chunk) for chunk in chunked(variables, self.nodes_per_request)))
+
+    async def browse(self, root: ua.NodeId = ua.NodeId(ua.ObjectIds.ObjectsFolder),
+                     root_path: str = "Objects") -> NodeCatalog:
+        """
+        Walk the address space below root and build a catalog of all variables.
+
+        Args:
+            root: Node to start from (default: Objects folder)
+            root_path: Browse path of the root node
+
+        Returns:
+            NodeCatalog: Catalog of the variables found
+        """
+        visited = {root.to_string()}
+        variables: List[Dict[str, Any]] = []
+        level = [(root, root_path)]
+
+        # Breadth first, one level at a time, with each level's Browse requests in parallel
+        while level:
+            batches = list(chunked(level, self.nodes_per_request))
+            results = await asyncio.gather(*(self._browse_batch([node_id for node_id, _ in batch])
+                                             for batch in batches))
+            next_level = []
+            for batch, batch_references in zip(batches, results):
+                for (_, parent_path), references in zip(batch, batch_references):
+                    for ref in references:
+                        child = ua.NodeId(ref.NodeId.Identifier, ref.NodeId.NamespaceIndex,
+                                          ref.NodeId.NodeIdType)
+                        node_id = child.to_string()
+                        if node_id in visited:
+                            continue
+                        visited.add(node_id)
+                        path = f"{parent_path}/{format_browse_name(ref.BrowseName)}"
+                        if ref.NodeClass == ua.NodeClass.Variable:
+                            variables.append({'node_id': node_id, 'browse_path': path, '_nodeid': child})
+                        next_level.append((child, path))
+            level = next_level
+
+        await self._read_attributes(variables)
+        for node in variables:
+            del node['_nodeid']
+        variables.sort(key=lambda node: node['browse_path'])
+        return NodeCatalog(variables)
+
+
+async def load_catalog(client, server_url: str, cache_dir: str = DEFAULT_CACHE_DIR,
+                       refresh: bool = False, **browser_options) -> NodeCatalog:
+    """
+    Get the node catalog of a connected server, from cache when it is still valid.
+
+    The cache is only used when it was built for the same server URL and the
+    server still reports the same namespace array.
+
+    Args:
+        client: Connected asyncua Client
+        server_url: Server URL (cache key)
+        cache_dir: Directory for cache files
+        refresh: Browse again even if a valid cache exists
+        **browser_options: Options for AddressSpaceBrowser
+
+    Returns:
+        NodeCatalog: The node catalog
+    """
+    namespaces = await client.get_namespace_array()
+    path = cache_file_path(cache_dir, "catalog", server_url)
+    if not refresh:
+        cached = load_cache(path, server_url, namespaces)
+        if cached is not None:
+            return NodeCatalog(cached['nodes'])
+
+    catalog = await AddressSpaceBrowser(client, **browser_options).browse()
+    save_cache(path, server_url, namespaces, nodes=catalog.nodes)
+    return catalog
+
+
+async def translate_browse_paths(client, paths: List[str], default_namespace: int,
+                                 max_concurrency: int = 8) -> Dict[str, str]:
+    """
+    Resolve browse paths to NodeId strings with batched TranslateBrowsePathsToNodeIds requests.
+
+    Requests are chunked by the server's MaxNodesPerTranslateBrowsePathsToNodeIds
+    limit and up to max_concurrency of them are in flight at once.
+
+    Args:
+        client: Connected asyncua Client
+        paths: Browse paths to resolve
+        default_namespace: Namespace index for segments without prefix
+        max_concurrency: Maximum number of concurrent requests
+
+    Returns:
+        dict: Browse path -> NodeId string, for the paths that could be resolved
+    """
+    limit = await read_operation_limit(
+        client, ua.ObjectIds.Server_ServerCapabilities_OperationLimits_MaxNodesPerTranslateBrowsePathsToNodeIds, 1000)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    resolved: Dict[str, str] = {}
+
+    async def translate_chunk(chunk):
+        browse_paths = []
+        for path in chunk:
+            root, names = parse_browse_path(path, default_namespace)
+            browse_path = ua.BrowsePath()
+            browse_path.StartingNode = root
+            for name in names:
+                element = ua.RelativePathElement()
+                element.ReferenceTypeId = ua.NodeId(ua.ObjectIds.HierarchicalReferences)
+                element.IncludeSubtypes = True
+                element.IsInverse = False
+                element.TargetName = name
+                browse_path.RelativePath.Elements.append(element)
+            browse_paths.append(browse_path)
+
+        async with semaphore:
+            results = await client.uaclient.translate_browsepaths_to_nodeids(browse_paths)
+        for path, result in zip(chunk, results):
+            if result.StatusCode.is_good() and result.Targets:
+                target = result.Targets[0].TargetId
+                resolved[path] = ua.NodeId(target.Identifier, target.NamespaceIndex, target.NodeIdType).to_string()
+
+    await asyncio.gather(*(translate_chunk(chunk) for chunk in chunked(list(paths), limit)))
+    return resolved
+
+
+async def resolve_browse_paths(client, server_url: str, paths: List[str], cache_dir: str = DEFAULT_CACHE_DIR,
+                               default_namespace: Any = None, refresh: bool = False,
+                               max_concurrency: int = 8, stale: Iterable[str] = ()) -> Dict[str, str]:
+    """
+    Resolve browse paths to NodeId strings, using the on-disk cache when it is still valid.
+
+    The cache is only used when it was built for the same server URL, namespace
+    array and default namespace; only paths missing from it are translated.
+    Paths whose cached NodeId the server no longer knows (e.g. after a PLC
+    redeploy) are passed as stale and translated again.
+
+    Args:
+        client: Connected asyncua Client
+        server_url: Server URL (cache key)
+        paths: Browse paths to resolve
+        cache_dir: Directory for cache files
+        default_namespace: Namespace index or URI for segments without prefix (None: last namespace)
+        refresh: Ignore the cache and translate every path again
+        max_concurrency: Maximum number of concurrent requests
+        stale: Paths to translate again even if they are cached
+
+    Returns:
+        dict: Browse path -> NodeId string, for the paths that could be resolved
+    """
+    namespaces = await client.get_namespace_array()
+    default_index = namespace_index(namespaces, default_namespace)
+    path = cache_file_path(cache_dir, "browsepaths", server_url)
+
+    cached_paths: Dict[str, str] = {}
+    if not refresh:
+        cached = load_cache(path, server_url, namespaces)
+        if cached is not None and cached.get('default_namespace') == default_index:
+            cached_paths = cached['paths']
+    for browse_path in stale:
+        cached_paths.pop(browse_path, None)
+
+    missing = [browse_path for browse_path in paths if browse_path not in cached_paths]
+    if not missing:
+        return {browse_path: cached_paths[browse_path] for browse_path in paths}
+
+    cached_paths.update(await translate_browse_paths(client, missing, default_index, max_concurrency))
+    save_cache(path, server_url, namespaces, default_namespace=default_index, paths=cached_paths)
+    return {browse_path: cached_paths[browse_path] for browse_path in paths if browse_path in cached_paths}
+
+
+def browse_options(config: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Get the cache directory and AddressSpaceBrowser options from the 'browse' config section."""
+    browse_config = config.get('browse') or {}
+    options = {
+        'max_concurrency': browse_config.get('max_concurrency', 8),
+        'nodes_per_request': browse_config.get('nodes_per_request', 50),
+    }
+    return browse_config.get('cache_dir', DEFAULT_CACHE_DIR), options
+
+
+async def load_catalog_for_config(config_path: str, refresh: bool = False) -> NodeCatalog:
+    """Connect with the settings of a logger config file and load the server's node catalog."""
+    from opcua_logger import create_client, load_config
+
+    config = load_config(config_path)
+    cache_dir, options = browse_options(config)
+    client = await create_client(config['server'], logging.getLogger(__name__))
+    await client.connect()
+    try:
+        return await load_catalog(client, config['server']['url'], cache_dir, refresh, **options)
+    finally:
+        await client.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Browse an OPC UA server and search its variables")
+    parser.add_argument("--config", default="config.yaml", help="Logger configuration file (server settings)")
+    parser.add_argument("--refresh", action="store_true", help="Browse the server even if a cached catalog is valid")
+    parser.add_argument("--search", default="", help="Only list variables matching these words")
+    parser.add_argument("--limit", type=int, default=100, help="Maximum number of variables to list")
+    args = parser.parse_args()
+
+    try:
+        catalog = asyncio.run(load_catalog_for_config(args.config, args.refresh))
+    except Exception as e:
+        print(f"Error browsing server: {e}")
+        sys.exit(1)
+
+    print(f"Catalog: {len(catalog)} variables")
+    for node in catalog.search(args.search, args.limit):
+        print(f"{node['node_id']:40} {node['data_type']:15} {node['browse_path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Background compaction of closed partitions into sorted, compressed per-tag chunks.
+
+Partitions of a partitioned archive (opcua_partitions.py) are written in
+arrival order with all their tags interleaved. Once a partition's time
+window has been closed for grace_seconds, the compactor rewrites it as
+
+    <partition>.<generation>.chunks   gzip members, one per chunk of one tag
+                                      (or event source), records sorted by time
+    <partition>.chunks.json           index: offset, length, count and time
+                                      range of every chunk, event schemas
+
+so reading one tag of an old partition decompresses only that tag's chunks.
+Records are stored decoded ({"tag", "timestamp", "value"}; tag ids and
+deltas resolved, blob references kept).
+
+Swapping in the compacted form is crash-safe:
+
+1. the partition is renamed to <partition>.compacting, so late writes of
+   the logger start a new partition file instead of racing the compactor;
+2. the previous compacted data (if any) and the .compacting file are
+   merged into a new generation of the data file, which is fsynced;
+3. the index is replaced atomically; it names the data file and the
+   .compacting file it absorbed (size and mtime) - this is the commit point;
+4. the .compacting file and the previous data generation are removed.
+
+After a crash, compact_partition() finishes or redoes whatever step was
+interrupted, and readers (partition_sources) never see a record twice or
+miss one. Run it in the background with the logger (`compaction` on a
+partitioned output) or from the command line:
+
+    python opcua_compaction.py archive --grace 600
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from opcua_format import TAG_IDS_KEY, DeltaDecoder
+from opcua_integrity import QUARANTINE_SUFFIX, BlockChecker, checked_lines
+from opcua_partitions import load_manifest, record_time
+
+INDEX_SUFFIX = ".chunks.json"
+COMPACTING_SUFFIX = ".compacting"
+INDEX_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def read_raw_records(path: str, rejected: Optional[List[bytes]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a raw partition file with tag ids and deltas resolved.
+
+    Schema lines are yielded as they are. Lines of corrupt blocks and lines
+    that aren't valid JSON (e.g. a torn last line) are skipped.
+
+    Args:
+        path: Raw partition file
+        rejected: Optional list that collects the skipped lines
+    """
+    tag_names: Dict[int, str] = {}
+    deltas = DeltaDecoder()
+    checker = BlockChecker(keep_dropped=rejected is not None)
+    bad_blocks = 0
+    with open(path, 'rb') as f:
+        for raw_line in checked_lines(f, checker):
+            if checker.bad_blocks != bad_blocks:
+                # Keyframes may have been in the dropped block
+                bad_blocks = checker.bad_blocks
+                deltas = DeltaDecoder()
+            line = raw_line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                if rejected is not None:
+                    rejected.append(raw_line)
+                continue
+            if TAG_IDS_KEY in record:
+                tag_names.update((tag_id, name) for name, tag_id in record[TAG_IDS_KEY].items())
+                continue
+            if "id" in record:
+                tag = tag_names.get(record["id"], f"#{record['id']}")
+            elif "tag" in record:
+                tag = record["tag"]
+            else:
+                yield record
+                continue
+            if "delta" in record:
+                value = deltas.apply(tag, record["delta"])
+                if value is None:
+                    continue
+            else:
+                value = record["value"]
+                deltas.keyframe(tag, value)
+            yield {"tag": tag, "timestamp": record["timestamp"], "value": value}
+    if rejected is not None:
+        rejected.extend(checker.dropped)
+
+
+class CompactedPartition:
+    """Reads the compacted form of a partition through its chunk index."""
+
+    def __init__(self, path: str, timestamp_format: str = "unix"):
+        """
+        Args:
+            path: Path of the (raw) partition file, e.g. archive/Line1/2026-10-19/13.jsonl
+            timestamp_format: The logger's timestamp_format, for time range filters
+        """
+        self.path = path
+        self.timestamp_format = timestamp_format
+        with open(path + INDEX_SUFFIX, encoding='utf-8') as f:
+            self.index: Dict[str, Any] = json.load(f)
+        self.data_path = os.path.join(os.path.dirname(path), self.index["data"])
+        self.schemas: Dict[str, List[str]] = self.index.get("schemas", {})
+
+    def chunks(self, tags: Optional[List[str]] = None, start: Optional[float] = None,
+               end: Optional[float] = None, events: bool = True) -> List[Dict[str, Any]]:
+        """
+        Get the index entries of the chunks that can hold matching records.
+
+        Args:
+            tags: Tag names (default: all tags)
+            start: Unix time; chunks ending before it are skipped
+            end: Unix time (exclusive); chunks starting at or after it are skipped
+            events: Include event chunks (only without tags)
+        """
+        wanted = set(tags) if tags is not None else None
+        selected = []
+        for chunk in self.index["chunks"]:
+            if "event" in chunk:
+                if wanted is not None or not events:
+                    continue
+            elif wanted is not None and chunk["tag"] not in wanted:
+                continue
+            if start is not None and chunk["end"] < start:
+                continue
+            if end is not None and chunk["start"] >= end:
+                continue
+            selected.append(chunk)
+        return selected
+
+    def read_chunk(self, chunk: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Decompress the records of one chunk."""
+        with open(self.data_path, 'rb') as f:
+            f.seek(chunk["offset"])
+            data = gzip.decompress(f.read(chunk["length"]))
+        return [json.loads(line) for line in data.splitlines()]
+
+    def records(self, tags: Optional[List[str]] = None, start: Optional[float] = None,
+                end: Optional[float] = None, events: bool = True) -> Iterator[Dict[str, Any]]:
+        """Yield the records of the matching chunks, tag by tag, each tag sorted by time."""
+        for chunk in self.chunks(tags, start, end, events):
+            for record in self.read_chunk(chunk):
+                if start is not None or end is not None:
+                    ts = record_time(record["timestamp"], self.timestamp_format)
+                    if (start is not None and ts < start) or (end is not None and ts >= end):
+                        continue
+                yield record
+
+
+def _index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+def _source_stamp(path: str) -> Dict[str, int]:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _load_compacted(path: str, timestamp_format: str = "unix") -> Optional[CompactedPartition]:
+    try:
+        return CompactedPartition(path, timestamp_format)
+    except FileNotFoundError:
+        return None
+
+
+def partition_sources(path: str, timestamp_format: str = "unix") -> Tuple[Optional[CompactedPartition], List[str]]:
+    """
+    Get everything a reader has to read for one partition.
+
+    Args:
+        path: Path of the partition file
+        timestamp_format: The logger's timestamp_format
+
+    Returns:
+        tuple: (compacted form or None, raw files in order: an unmerged .compacting file, the partition file)
+    """
+    compacted = _load_compacted(path, timestamp_format)
+    raw_files = []
+    compacting = path + COMPACTING_SUFFIX
+    if os.path.exists(compacting):
+        merged = compacted.index.get("merged") if compacted is not None else None
+        if merged != _source_stamp(compacting):
+            raw_files.append(compacting)
+    if os.path.exists(path):
+        raw_files.append(path)
+    return compacted, raw_files
+
+
+def _write_chunks(f, records: List[Dict[str, Any]], key: str, name: str, chunk_records: int,
+                  level: int, timestamp_format: str) -> List[Dict[str, Any]]:
+    """Write the time-sorted records of one tag or event source as gzip members."""
+    times = {}
+    for record in records:
+        if record["timestamp"] not in times:
+            times[record["timestamp"]] = record_time(record["timestamp"], timestamp_format)
+    records.sort(key=lambda record: times[record["timestamp"]])
+    chunks = []
+    for i in range(0, len(records), chunk_records):
+        part = records[i:i + chunk_records]
+        data = gzip.compress(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in part).encode('utf-8'),
+                             compresslevel=level)
+        offset = f.tell()
+        f.write(data)
+        chunks.append({key: name, "offset": offset, "length": len(data), "count": len(part),
+                       "start": times[part[0]["timestamp"]], "end": times[part[-1]["timestamp"]]})
+    return chunks
+
+
+def compact_partition(path: str, chunk_records: int = 10000, level: int = 6, timestamp_format: str = "unix") -> bool:
+    """
+    Compact one closed partition (or finish an interrupted compaction of it).
+
+    Args:
+        path: Path of the partition file
+        chunk_records: Maximum records per chunk
+        level: gzip compression level
+        timestamp_format: The logger's timestamp_format (records are sorted by time)
+
+    Returns:
+        bool: True if the partition was compacted, False if there was nothing to do
+    """
+    compacting = path + COMPACTING_SUFFIX
+    compacted = _load_compacted(path, timestamp_format)
+
+    # Step 4 interrupted: the index already holds the .compacting file
+    if os.path.exists(compacting) and compacted is not None and \
+            compacted.index.get("merged") == _source_stamp(compacting):
+        os.remove(compacting)
+        _remove_stale_generations(path, compacted.index["data"])
+        return True
+
+    if not os.path.exists(compacting):
+        if not os.path.exists(path):
+            return False
+        os.replace(path, compacting)  # step 1
+        if os.path.exists(path + '.idx'):
+            os.remove(path + '.idx')  # line index of the renamed file (jsonl_reader.py)
+
+    # Step 2: merge the previous compacted data and the .compacting file
+    by_tag: Dict[str, List[Dict[str, Any]]] = {}
+    by_event: Dict[str, List[Dict[str, Any]]] = {}
+    schemas: Dict[str, List[str]] = {}
+    generation = 1
+    if compacted is not None:
+        generation = compacted.index["generation"] + 1
+        schemas.update(compacted.schemas)
+        for chunk in compacted.chunks():
+            target = by_event.setdefault(chunk["event"], []) if "event" in chunk else \
+                by_tag.setdefault(chunk["tag"], [])
+            target.extend(compacted.read_chunk(chunk))
+    rejected: List[bytes] = []
+    for record in read_raw_records(compacting, rejected):
+        if "tag" in record:
+            by_tag.setdefault(record["tag"], []).append(record)
+        elif "event" in record:
+            by_event.setdefault(record["event"], []).append(record)
+        elif "schema" in record:
+            schemas[record["schema"]] = record["fields"]
+
+    directory, name = os.path.split(path)
+    if rejected:
+        # Damaged lines are kept for inspection (see opcua_integrity.py)
+        os.makedirs(path + QUARANTINE_SUFFIX, exist_ok=True)
+        with open(os.path.join(path + QUARANTINE_SUFFIX, f"compaction-{generation}.lines"), 'wb') as f:
+            f.writelines(line if line.endswith(b'\n') else line + b'\n' for line in rejected)
+        logger.warning(f"Compacting {path}: {len(rejected)} damaged lines moved to {path + QUARANTINE_SUFFIX}")
+    data_name = f"{name}.{generation}.chunks"
+    data_path = os.path.join(directory, data_name)
+    chunks: List[Dict[str, Any]] = []
+    with open(data_path, 'wb') as f:
+        for tag in sorted(by_tag):
+            chunks.extend(_write_chunks(f, by_tag[tag], "tag", tag, chunk_records, level, timestamp_format))
+        for event in sorted(by_event):
+            chunks.extend(_write_chunks(f, by_event[event], "event", event, chunk_records, level,
+                                        timestamp_format))
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Step 3: commit by replacing the index
+    index = {"version": INDEX_VERSION, "generation": generation, "data": data_name,
+             "merged": _source_stamp(compacting), "schemas": schemas, "chunks": chunks}
+    index_path = _index_path(path)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, index_path)
+
+    # Step 4: clean up
+    os.remove(compacting)
+    _remove_stale_generations(path, data_name)
+    return True
+
+
+def _remove_stale_generations(path: str, current: str) -> None:
+    """Remove data generations and temporary files that the index doesn't refer to."""
+    directory, name = os.path.split(path)
+    for entry in os.listdir(directory or '.'):
+        if not entry.startswith(name + '.') or entry == current:
+            continue
+        if entry.endswith('.chunks') or (entry.startswith(name + INDEX_SUFFIX + '.') and entry.endswith('.tmp')):
+            os.remove(os.path.join(directory, entry))
+
+
+def compact_archive(root: str, grace_seconds: float = 600.0, chunk_records: int = 10000, level: int = 6,
+                    timestamp_format: str = "unix", now: Optional[float] = None) -> int:
+    """
+    Compact the partitions of an archive whose time window closed at least grace_seconds ago.
+
+    Partitions without a time window are never closed, so they are not compacted.
+
+    Returns:
+        int: Number of partitions compacted
+    """
+    now = time.time() if now is None else now
+    count = 0
+    for relative_path, entry in load_manifest(root)["partitions"].items():
+        if entry.get("end") is None or entry["end"] + grace_seconds > now:
+            continue
+        path = os.path.join(root, *relative_path.split('/'))
+        if not os.path.exists(path) and not os.path.exists(path + COMPACTING_SUFFIX):
+            continue
+        try:
+            if compact_partition(path, chunk_records, level, timestamp_format):
+                count += 1
+        except Exception as e:
+            logger.warning(f"Compacting {path} failed: {e}")
+    return count
+
+
+def run_compactor(roots: List[Dict[str, Any]], interval_seconds: float = 300.0) -> None:
+    """
+    Compact archives forever at low CPU priority (the body of the background process).
+
+    Args:
+        roots: Per archive: root and optional grace_seconds, chunk_records, level, timestamp_format
+        interval_seconds: Pause between passes
+    """
+    logging.basicConfig(level=logging.WARNING)
+    if hasattr(os, 'nice'):
+        os.nice(10)
+    while True:
+        for settings in roots:
+            count = compact_archive(settings['root'], settings.get('grace_seconds', 600.0),
+                                    settings.get('chunk_records', 10000), settings.get('level', 6),
+                                    settings.get('timestamp_format', 'unix'))
+            if count:
+                logger.info(f"Compacted {count} partitions of {settings['root']}")
+        time.sleep(interval_seconds)
+
+
+def compaction_settings(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Get the partitioned outputs with `compaction` enabled, as run_compactor() settings."""
+    timestamp_format = (config.get('logging') or {}).get('timestamp_format', 'unix')
+    roots = []
+    for output in config.get('outputs') or []:
+        compaction = output.get('compaction')
+        if output.get('type') == 'partitioned' and compaction and compaction.get('enabled', True):
+            roots.append(dict(compaction, root=output['root'], timestamp_format=timestamp_format))
+    return roots
+
+
+def start_compactor(config: Dict[str, Any]) -> Optional[multiprocessing.Process]:
+    """Start the background compaction process, or return None if no output has compaction enabled."""
+    roots = compaction_settings(config)
+    if not roots:
+        return None
+    interval = min(settings.get('interval_seconds', 300.0) for settings in roots)
+    # Spawned, not forked: the logger process runs threads and an event loop
+    process = multiprocessing.get_context('spawn').Process(target=run_compactor, args=(roots, interval),
+                                                             name="compactor", daemon=True)
+    process.start()
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact closed partitions of a partitioned archive")
+    parser.add_argument("root", help="Archive root directory")
+    parser.add_argument("--grace", type=float, default=600.0, help="Seconds after a window closes before compacting")
+    parser.add_argument("--chunk-records", type=int, default=10000, help="Maximum records per chunk")
+    parser.add_argument("--level", type=int, default=6, help="gzip compression level")
+    parser.add_argument("--timestamp-format", default="unix",
+                        help="The logger's logging.timestamp_format (default: unix)")
+    args = parser.parse_args()
+    count = compact_archive(args.root, args.grace, args.chunk_records, args.level, args.timestamp_format)
+    print(f"Compacted {count} partitions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Headless service mode with a local control API for the OPC UA logger.
+
+A tiny JSON-over-HTTP server listening on localhost (or on a Unix socket)
+lets operators start/stop acquisition, add and remove tags at runtime,
+force a flush and query status and current values, e.g.:
+
+    curl http://127.0.0.1:8765/status
+    curl -X POST http://127.0.0.1:8765/flush
+    curl -X POST http://127.0.0.1:8765/reload
+    curl -X POST -d '{"name": "Speed", "node_id": "ns=3;s=Line1.Speed"}' http://127.0.0.1:8765/tags
+    curl -X DELETE http://127.0.0.1:8765/tags/Speed
+    curl --unix-socket /run/opcua-logger/control.sock http://localhost/values
+    curl 'http://127.0.0.1:8765/history?tag=Speed&start=1757312000&end=1757315600&bucket=60'
+"""
+
+import asyncio
+import json
+import logging
+import signal
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, unquote
+
+from opcua_timeseries import TimeSeriesStore
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    500: "Internal Server Error",
+}
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('', '0', 'false', 'no', 'off')
+
+
+def parse_flag(value: Any) -> bool:
+    """Parse a boolean parameter given in the query string ("false", "0", ...) or as a JSON value."""
+    if isinstance(value, str):
+        if value.strip().lower() in TRUE_VALUES:
+            return True
+        if value.strip().lower() in FALSE_VALUES:
+            return False
+        raise ValueError(f"Not a boolean: {value!r}")
+    return bool(value)
+
+
+class ControlServer:
+    """Runs an OPCUALogger as a service and serves the local control API."""
+
+    def __init__(self, opcua_logger):
+        self.opcua_logger = opcua_logger
+        self.logger = logging.getLogger(__name__)
+
+        control_config = opcua_logger.config.get('control') or {}
+        self.host = control_config.get('host', '127.0.0.1')
+        self.port = control_config.get('port', 8765)
+        self.unix_socket = control_config.get('unix_socket')
+        self.autostart = control_config.get('autostart', True)
+
+        self.logger_task: Optional[asyncio.Task] = None
+        self.shutdown_event = asyncio.Event()
+
+        self.routes = {
+            ('GET', '/status'): self.handle_status,
+            ('GET', '/values'): self.handle_values,
+            ('GET', '/tags'): self.handle_list_tags,
+            ('GET', '/history'): self.handle_history,
+            ('POST', '/start'): self.handle_start,
+            ('POST', '/stop'): self.handle_stop,
+            ('POST', '/flush'): self.handle_flush,
+            ('POST', '/reload'): self.handle_reload,
+            ('POST', '/tags'): self.handle_add_tag,
+            ('POST', '/shutdown'): self.handle_shutdown,
+        }
+
+    # ------------------------------------------------------------------
+    # Logger lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self.logger_task is not None and not self.logger_task.done()
+
+    def start_logger(self) -> bool:
+        """Start acquisition. Returns False if it is already running."""
+        if self.running:
+            return False
+        self.logger_task = asyncio.create_task(self.opcua_logger.run())
+        return True
+
+    async def stop_logger(self) -> bool:
+        """Stop acquisition (flushes and disconnects). Returns False if it was not running."""
+        if not self.running:
+            return False
+        self.opcua_logger.stop_event.set()
+        await self.logger_task
+        return True
+
+    async def serve(self) -> None:
+        """Serve the control API until a shutdown request or SIGTERM/SIGINT."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.shutdown_event.set)
+            except (NotImplementedError, AttributeError, RuntimeError):
+                # Not available on this platform; Ctrl+C still raises KeyboardInterrupt
+                pass
+
+        if self.unix_socket:
+            server = await asyncio.start_unix_server(self.handle_client, path=self.unix_socket)
+            self.logger.info(f"Control API listening on unix socket {self.unix_socket}")
+        else:
+            server = await asyncio.start_server(self.handle_client, self.host, self.port)
+            self.logger.info(f"Control API listening on http://{self.host}:{self.port}")
+
+        if self.autostart:
+            self.start_logger()
+
+        try:
+            async with server:
+                await self.shutdown_event.wait()
+        finally:
+            await self.stop_logger()
+            self.logger.info("Service stopped")
+
+    # ------------------------------------------------------------------
+    # HTTP plumbing
+    # ------------------------------------------------------------------
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handle one HTTP request (connection closes after the response)."""
+        try:
+            status, result = await self.handle_request(reader)
+        except Exception as e:
+            self.logger.error(f"Control API error: {e}")
+            status, result = 500, {"error": str(e)}
+
+        body = json.dumps(result, ensure_ascii=False, default=str).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n"
+        ).encode('latin-1')
+        try:
+            writer.write(head + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle_request(self, reader: asyncio.StreamReader) -> Tuple[int, Any]:
+        """Parse a request and dispatch it to a route handler."""
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        parts = request_line.split()
+        if len(parts) < 2:
+            return 400, {"error": "Malformed request line"}
+        method, (path, _, query) = parts[0].upper(), parts[1].partition('?')
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        payload: Dict[str, Any] = dict(parse_qsl(query))
+        length = int(headers.get('content-length') or 0)
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except ValueError as e:
+                return 400, {"error": f"Invalid JSON body: {e}"}
+            if not isinstance(body, dict):
+                return 400, {"error": "JSON body must be an object"}
+            payload.update(body)
+
+        handler = self.routes.get((method, path))
+        if handler:
+            return await handler(payload)
+
+        if path.startswith('/tags/'):
+            if method != 'DELETE':
+                return 405, {"error": f"{method} not allowed on {path}"}
+            return await self.handle_remove_tag(unquote(path[len('/tags/'):]), payload)
+
+        if any(route_path == path for _, route_path in self.routes):
+            return 405, {"error": f"{method} not allowed on {path}"}
+        return 404, {"error": f"Unknown path: {path}"}
+
+    # ------------------------------------------------------------------
+    # Route handlers
+    # ------------------------------------------------------------------
+
+    async def handle_status(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        return 200, {
+            "running": self.running,
+            "connected": self.opcua_logger.connected,
+            "server": self.opcua_logger.config['server']['url'],
+            "tags": len(self.opcua_logger.config['tags']),
+            "subscribed": len(self.opcua_logger.subscriptions),
+            "metrics": self.opcua_logger.get_metrics(),
+        }
+
+    async def handle_values(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        return 200, self.opcua_logger.get_current_data()
+
+    async def handle_list_tags(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        return 200, self.opcua_logger.config['tags']
+
+    async def handle_history(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        """
+        Query the SQLite output: latest values, or one tag's samples or buckets.
+
+        Query parameters: tag, start/end (UNIX seconds, default the last hour),
+        bucket (seconds, downsampled min/max/avg/count) and limit.
+        """
+        paths = [output['path'] for output in self.opcua_logger.config.get('outputs') or []
+                 if output.get('type') == 'sqlite']
+        if not paths:
+            return 404, {"error": "No sqlite output configured"}
+        try:
+            end = float(payload.get('end', time.time()))
+            start = float(payload.get('start', end - 3600))
+            bucket = float(payload.get('bucket', 0))
+            limit = int(payload.get('limit', 10000))
+        except ValueError as e:
+            return 400, {"error": f"Invalid query parameter: {e}"}
+
+        def query():
+            store = TimeSeriesStore(paths[0])
+            try:
+                if 'tag' not in payload:
+                    return {tag: {"ts": ts, "value": value} for tag, (ts, value) in store.latest().items()}
+                start_ns, end_ns = int(start * 1e9), int(end * 1e9)
+                if bucket > 0:
+                    return store.downsample(payload['tag'], start_ns, end_ns, int(bucket * 1e9))
+                return [{"ts": ts, "value": value}
+                        for ts, value in store.range(payload['tag'], start_ns, end_ns, limit)]
+            finally:
+                store.close()
+
+        return 200, await asyncio.to_thread(query)
+
+    async def handle_start(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        if not self.start_logger():
+            return 409, {"error": "Logger is already running"}
+        return 200, {"running": True}
+
+    async def handle_stop(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        if not await self.stop_logger():
+            return 409, {"error": "Logger is not running"}
+        return 200, {"running": False}
+
+    async def handle_flush(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        # Hand pending data to the outputs, then wait for them off the event loop
+        self.opcua_logger.flush(timeout=0)
+        drained = await asyncio.to_thread(self.opcua_logger.drain_outputs, 10.0)
+        return 200, {"flushed": drained}
+
+    async def handle_reload(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        return 200, await self.opcua_logger.reload_config()
+
+    async def handle_add_tag(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        name, node_id = payload.get('name'), payload.get('node_id')
+        if not name or not node_id:
+            return 400, {"error": "Both 'name' and 'node_id' are required"}
+        try:
+            persist = parse_flag(payload.get('persist', False))
+        except ValueError as e:
+            return 400, {"error": f"Invalid query parameter: {e}"}
+        try:
+            await self.opcua_logger.add_tag(name, node_id)
+        except ValueError as e:
+            return 409, {"error": str(e)}
+        if persist:
+            self.opcua_logger.save_config()
+        return 200, {"added": name}
+
+    async def handle_remove_tag(self, name: str, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        try:
+            persist = parse_flag(payload.get('persist', False))
+        except ValueError as e:
+            return 400, {"error": f"Invalid query parameter: {e}"}
+        try:
+            await self.opcua_logger.remove_tag(name)
+        except KeyError as e:
+            return 404, {"error": str(e)}
+        if persist:
+            self.opcua_logger.save_config()
+        return 200, {"removed": name}
+
+    async def handle_shutdown(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        self.shutdown_event.set()
+        return 200, {"shutdown": True}
@@ -0,0 +1,215 @@
+"""
+Writer-side encoding of buffered samples.
+
+The data change callback only stores raw (tag, time, value) entries in a
+preallocated SampleBuffer. At flush time the buffer is handed over as one
+RawBatch, and an EncodingSink (on its own SinkWorker thread, optionally with
+a pool of worker processes) converts the whole batch to JSON-safe records
+before passing them on to the output sinks (ByteStrings stay bytes until an
+output serializes them, see opcua_format.json_default). The cost of encoding large or
+nested values therefore never lands on the event loop that services the
+OPC UA session.
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
+
+from asyncua import ua
+
+from opcua_format import encode_bytes
+from opcua_sinks import LANE_BULK, Record, Sink, SinkFanout
+
+# Parallel lists of tag names, unix times and raw values
+Samples = Tuple[List[str], List[float], List[Any]]
+
+
+def json_safe(v: Any, raw_bytes: bool = False) -> Any:
+    """
+    Convert values to JSON-serializable types.
+
+    Args:
+        v: Value to convert
+        raw_bytes: Keep ByteStrings as bytes, for records that outputs serialize with json_default
+    """
+    if isinstance(v, (str, int, float, bool)) or v is None:
+        return v
+
+    # OPC UA ByteString -> base64 (or bytes)
+    if isinstance(v, (bytes, bytearray, memoryview)):
+        return bytes(v) if raw_bytes else encode_bytes(bytes(v))
+
+    # OPC UA structures seen in event fields
+    if isinstance(v, ua.LocalizedText):
+        return v.Text
+    if isinstance(v, (ua.NodeId, ua.QualifiedName)):
+        return v.to_string()
+
+    # datetime/date -> ISO string
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+
+    # lists/tuples -> recursively convert
+    if isinstance(v, (list, tuple)):
+        return [json_safe(x, raw_bytes) for x in v]
+
+    # dict -> recursively convert
+    if isinstance(v, dict):
+        return {str(k): json_safe(val, raw_bytes) for k, val in v.items()}
+
+    # Fallback: string representation (covers ua.Variant-like oddities)
+    return str(v)
+
+
+def format_timestamp(ts: float, timestamp_format: str) -> str:
+    """Format a unix time in the configured timestamp format."""
+    if timestamp_format == 'unix':
+        return str(ts)
+    return datetime.fromtimestamp(ts).strftime(timestamp_format)
+
+
+class SampleBuffer:
+    """Fixed-capacity parallel lists of raw samples, reused across flushes."""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self.tags: List[Optional[str]] = [None] * self.capacity
+        self.times: List[float] = [0.0] * self.capacity
+        self.values: List[Any] = [None] * self.capacity
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, tag: str, ts: float, value: Any) -> bool:
+        """
+        Store one sample.
+
+        Returns:
+            bool: True when the buffer is full and must be taken before the next append
+        """
+        i = self.count
+        self.tags[i] = tag
+        self.times[i] = ts
+        self.values[i] = value
+        self.count = i + 1
+        return self.count >= self.capacity
+
+    def resize(self, capacity: int) -> None:
+        """Change the capacity, keeping the buffered samples (which must fit)."""
+        capacity = max(1, int(capacity))
+        if capacity <= self.count:
+            raise ValueError(f"{self.count} buffered samples don't fit a capacity of {capacity}")
+        if capacity > self.capacity:
+            extra = capacity - self.capacity
+            self.tags.extend([None] * extra)
+            self.times.extend([0.0] * extra)
+            self.values.extend([None] * extra)
+        else:
+            del self.tags[capacity:], self.times[capacity:], self.values[capacity:]
+        self.capacity = capacity
+
+    def take(self) -> Samples:
+        """Take the buffered samples and start over."""
+        n, self.count = self.count, 0
+        return self.tags[:n], self.times[:n], self.values[:n]
+
+
+class RawBatch:
+    """One flush worth of unencoded records."""
+
+    def __init__(self, schemas: List[Record], events: List[tuple], samples: Samples, lane: str = LANE_BULK):
+        """
+        Args:
+            schemas: Event schema records (already JSON-safe), written first
+            events: (source name, unix time, field values) tuples
+            samples: Parallel tag, time and value lists
+            lane: Output lane (LANE_BULK or LANE_CRITICAL)
+        """
+        self.schemas = schemas
+        self.events = events
+        self.samples = samples
+        self.lane = lane
+
+    @property
+    def received(self) -> Optional[float]:
+        """Receive time of the oldest event or sample, None if the batch has neither."""
+        times = [self.events[0][1]] if self.events else []
+        if self.samples[1]:
+            times.append(self.samples[1][0])
+        return min(times, default=None)
+
+    def __len__(self) -> int:
+        return len(self.schemas) + len(self.events) + len(self.samples[0])
+
+
+def encode_events(events: List[tuple], timestamp_format: str) -> List[Record]:
+    """Encode (source name, unix time, field values) tuples as event records."""
+    return [{"event": name, "timestamp": format_timestamp(ts, timestamp_format), "fields": json_safe(fields, True)}
+            for name, ts, fields in events]
+
+
+def encode_samples(tags: List[str], times: List[float], values: List[Any], timestamp_format: str) -> List[Record]:
+    """Encode parallel sample lists as data records."""
+    if timestamp_format == 'unix':
+        timestamps = map(str, times)
+    else:
+        timestamps = (datetime.fromtimestamp(ts).strftime(timestamp_format) for ts in times)
+    return [{"tag": tag, "timestamp": timestamp, "value": json_safe(value, True)}
+            for tag, timestamp, value in zip(tags, timestamps, values)]
+
+
+class EncodingSink(Sink):
+    """
+    Encodes RawBatches and hands the records to the output sinks.
+
+    With workers > 0, batches are split across a pool of worker processes;
+    batches whose values can't be sent to a process are encoded locally.
+    """
+
+    # Batches smaller than this are not worth the round trip to the pool
+    MIN_PARALLEL_SAMPLES = 2000
+
+    def __init__(self, outputs: SinkFanout, timestamp_format: str = "unix", workers: int = 0):
+        super().__init__("encoder")
+        self.outputs = outputs
+        self.timestamp_format = timestamp_format
+        self.workers = workers
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.logger = logging.getLogger(__name__)
+
+    def open(self) -> None:
+        if self.workers > 0 and self.pool is None:
+            # Spawned, not forked: the logger process runs threads and an event loop
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def _encode_samples(self, samples: Samples) -> List[Record]:
+        tags, times, values = samples
+        if self.pool is None or len(tags) < self.MIN_PARALLEL_SAMPLES:
+            return encode_samples(tags, times, values, self.timestamp_format)
+
+        size = -(-len(tags) // self.workers)
+        chunks = [(tags[i:i + size], times[i:i + size], values[i:i + size], self.timestamp_format)
+                  for i in range(0, len(tags), size)]
+        try:
+            futures = [self.pool.submit(encode_samples, *chunk) for chunk in chunks]
+            records = []
+            for future in futures:
+                records.extend(future.result())
+            return records
+        except Exception as e:
+            self.logger.warning(f"Encoding in worker processes failed, encoding locally: {e}")
+            return encode_samples(tags, times, values, self.timestamp_format)
+
+    def write_batch(self, records: RawBatch) -> None:
+        encoded = list(records.schemas)
+        encoded.extend(encode_events(records.events, self.timestamp_format))
+        encoded.extend(self._encode_samples(records.samples))
+        self.outputs.submit(encoded, records.lane, records.received)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
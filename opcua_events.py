@@ -0,0 +1,160 @@
+"""
+Event and alarm filters for the OPC UA logger.
+
+Each entry of the `events` config section subscribes one source node with an
+EventFilter built from its select fields and where clause (event types, a
+minimum severity and optional general conditions, see parse_condition()).
+Events are logged compactly: a schema line listing the
+field names once per source, then one line per event with the field values
+in schema order.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from asyncua import ua
+
+DEFAULT_EVENT_FIELDS = ["EventType", "SourceName", "Time", "Severity", "Message"]
+
+
+def _attribute_operand(field: str) -> ua.SimpleAttributeOperand:
+    """Select an event field by its browse path below BaseEventType ("Severity", "2:Limits/2:High")."""
+    operand = ua.SimpleAttributeOperand()
+    operand.TypeDefinitionId = ua.NodeId(ua.ObjectIds.BaseEventType)
+    operand.AttributeId = ua.AttributeIds.Value
+    for segment in field.split('/'):
+        prefix, sep, name = segment.partition(':')
+        if sep and prefix.isdigit():
+            operand.BrowsePath.append(ua.QualifiedName(name, int(prefix)))
+        else:
+            operand.BrowsePath.append(ua.QualifiedName(segment, 0))
+    return operand
+
+
+def _literal(value: Any, variant_type: ua.VariantType = None) -> ua.LiteralOperand:
+    operand = ua.LiteralOperand()
+    operand.Value = ua.Variant(value, variant_type)
+    return operand
+
+
+def _combine(operator: ua.FilterOperator, conditions: List[tuple]) -> tuple:
+    """Combine conditions pairwise with a binary And/Or operator."""
+    combined = conditions[-1]
+    for condition in reversed(conditions[:-1]):
+        combined = (operator, [condition, combined])
+    return combined
+
+
+def _flatten(condition: tuple, elements: List[ua.ContentFilterElement]) -> int:
+    """Append a condition tree to a where clause element list (root first) and return its index."""
+    operator, operands = condition
+    index = len(elements)
+    elements.append(None)
+    element = ua.ContentFilterElement()
+    element.FilterOperator = operator
+    for operand in operands:
+        if isinstance(operand, tuple):
+            child = ua.ElementOperand()
+            child.Index = _flatten(operand, elements)
+            operand = child
+        element.FilterOperands.append(operand)
+    elements[index] = element
+    return index
+
+
+def _parse_operand(operand: Any, operator: ua.FilterOperator) -> Any:
+    """Convert a configured operand to a FilterOperand, or a condition tuple for nested conditions."""
+    if isinstance(operand, dict):
+        if 'field' in operand:
+            return _attribute_operand(str(operand['field']))
+        if 'node_id' in operand:
+            return _literal(ua.NodeId.from_string(operand['node_id']))
+        if 'value' in operand:
+            variant_type = operand.get('type')
+            try:
+                return _literal(operand['value'], getattr(ua.VariantType, variant_type) if variant_type else None)
+            except AttributeError:
+                raise ValueError(f"Unknown literal type: {variant_type}")
+        return parse_condition(operand)
+    if operator in (ua.FilterOperator.OfType, ua.FilterOperator.InView) and isinstance(operand, str):
+        # Type and view operands are NodeIds
+        return _literal(ua.NodeId.from_string(operand))
+    return _literal(operand)
+
+
+def parse_condition(condition: Dict[str, Any]) -> tuple:
+    """
+    Convert a configured where condition to a condition tree for _flatten().
+
+    A condition is a single-key mapping of a FilterOperator name to its
+    operand list, e.g. {"Like": [{"field": "SourceName"}, "Line1%"]}. Operands
+    are {"field": browse path}, {"node_id": NodeId string},
+    {"value": literal, "type": VariantType name}, nested conditions, or plain
+    literals (strings are NodeIds for OfType and InView).
+
+    Raises:
+        ValueError: If the condition is malformed or names an unknown operator
+    """
+    if not isinstance(condition, dict) or len(condition) != 1:
+        raise ValueError(f"Where condition must map one operator to its operands: {condition!r}")
+    name, operands = next(iter(condition.items()))
+    try:
+        operator = ua.FilterOperator[name]
+    except KeyError:
+        raise ValueError(f"Unknown filter operator: {name}")
+    if not isinstance(operands, list):
+        operands = [operands]
+    return operator, [_parse_operand(operand, operator) for operand in operands]
+
+
+def build_event_filter(fields: List[str], event_types: List[str], min_severity: int = 0,
+                       where: Optional[Dict[str, Any]] = None) -> ua.EventFilter:
+    """
+    Build an EventFilter with select clauses and a where clause.
+
+    Args:
+        fields: Event fields to select, as browse paths below BaseEventType
+        event_types: Only pass events of these types (NodeId strings, subtypes included)
+        min_severity: Only pass events with at least this Severity (0 = no limit)
+        where: Further condition ANDed with the others, see parse_condition()
+
+    Returns:
+        ua.EventFilter: The event filter
+    """
+    event_filter = ua.EventFilter()
+    event_filter.SelectClauses = [_attribute_operand(field) for field in fields]
+
+    conditions = []
+    if event_types:
+        conditions.append(_combine(ua.FilterOperator.Or, [
+            (ua.FilterOperator.OfType, [_literal(ua.NodeId.from_string(event_type))])
+            for event_type in event_types]))
+    if min_severity:
+        conditions.append((ua.FilterOperator.GreaterThanOrEqual,
+                           [_attribute_operand("Severity"), _literal(min_severity, ua.VariantType.UInt16)]))
+    if where:
+        conditions.append(parse_condition(where))
+    if conditions:
+        _flatten(_combine(ua.FilterOperator.And, conditions), event_filter.WhereClause.Elements)
+    return event_filter
+
+
+def event_sources(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Get the configured event sources with defaults filled in.
+
+    Returns:
+        list: Dicts with name, source, fields, event_types, min_severity, where, queue_size and priority
+    """
+    sources = []
+    for index, entry in enumerate(config.get('events') or []):
+        sources.append({
+            'name': entry.get('name', f"events{index + 1}"),
+            'source': entry.get('source', ua.NodeId(ua.ObjectIds.Server).to_string()),
+            'fields': list(entry.get('fields') or DEFAULT_EVENT_FIELDS),
+            'event_types': list(entry.get('event_types') or []),
+            'min_severity': int(entry.get('min_severity', 0)),
+            'where': entry.get('where'),
+            'queue_size': int(entry.get('queue_size', 0)),
+            'priority': entry.get('priority', 'bulk'),
+        })
+    return sources
@@ -0,0 +1,112 @@
+"""
+Adaptive flush tuning.
+
+With `logging.adaptive_flush` enabled, FlushController replaces the static
+flush_interval_seconds / flush_max_pending. Once a second it looks at the
+incoming sample rate and at how busy the encoder and outputs are, then:
+
+- lengthens the flush interval while the busiest writer spends more than
+  target_utilization of its time writing (or batches queue up), so bursts
+  are written as fewer, larger and cheaper batches;
+- shortens it again, down to min_interval_seconds, while writers are idle,
+  so quiet periods still flush promptly;
+- never lets data wait longer than max_delay_seconds (the durability limit);
+- sizes the batch (buffer capacity) to about twice what arrives per interval,
+  capped so one batch takes at most max_write_latency_seconds to write.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+class FlushController:
+    """Chooses flush interval and batch size from measured rate and write cost."""
+
+    # Weight of the newest measurement in the moving averages
+    SMOOTHING = 0.3
+
+    def __init__(self, max_delay_seconds: float = 5.0, min_interval_seconds: float = 0.1,
+                 min_batch: int = 100, max_batch: int = 100_000, target_utilization: float = 0.5,
+                 max_write_latency_seconds: float = 1.0):
+        """
+        Args:
+            max_delay_seconds: Longest time a sample may wait in the buffer (durability limit)
+            min_interval_seconds: Shortest flush interval
+            min_batch: Smallest buffer capacity
+            max_batch: Largest buffer capacity
+            target_utilization: Fraction of time the busiest writer may spend writing
+            max_write_latency_seconds: Longest time one batch may take to write (latency limit)
+        """
+        self.max_delay = max_delay_seconds
+        self.min_interval = min(min_interval_seconds, max_delay_seconds)
+        self.min_batch = min_batch
+        self.max_batch = max(max_batch, min_batch)
+        self.target_utilization = target_utilization
+        self.max_write_latency = max_write_latency_seconds
+
+        self.interval = self.min_interval
+        self.batch_size = min_batch
+        self.rate = 0.0
+        self.utilization = 0.0
+        self._busy: Dict[str, float] = {}  # writer name -> busy seconds at the last update
+
+    @classmethod
+    def from_config(cls, logging_config: Dict[str, Any]) -> Optional['FlushController']:
+        """Create a controller from logging.adaptive_flush, or None if it is not enabled."""
+        settings = logging_config.get('adaptive_flush')
+        if not settings or not settings.get('enabled', True):
+            return None
+        return cls(settings.get('max_delay_seconds', 5.0), settings.get('min_interval_seconds', 0.1),
+                   settings.get('min_batch', 100), settings.get('max_batch', 100_000),
+                   settings.get('target_utilization', 0.5), settings.get('max_write_latency_seconds', 1.0))
+
+    def _quantize(self, batch_size: float) -> int:
+        """Round up to a power of two, so the buffer isn't reallocated for small changes."""
+        size = 1
+        while size < batch_size:
+            size *= 2
+        return max(self.min_batch, min(self.max_batch, size))
+
+    def update(self, samples: int, elapsed: float, writers: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Adjust interval and batch size.
+
+        Args:
+            samples: Samples received since the last update
+            elapsed: Seconds since the last update
+            writers: SinkWorker metrics of the encoder and outputs, by name
+        """
+        elapsed = max(elapsed, 1e-3)
+        self.rate += self.SMOOTHING * (samples / elapsed - self.rate)
+
+        utilization = 0.0
+        backlog = 0
+        per_record: List[float] = []
+        for name, metrics in writers.items():
+            busy = metrics.get("busy_seconds", 0.0)
+            utilization = max(utilization, (busy - self._busy.get(name, busy)) / elapsed)
+            self._busy[name] = busy
+            backlog = max(backlog, metrics.get("queued", 0))
+            if metrics.get("batch_records"):
+                per_record.append(metrics.get("batch_seconds", 0.0) / metrics["batch_records"])
+        self.utilization += self.SMOOTHING * (utilization - self.utilization)
+
+        if self.utilization > self.target_utilization or backlog > 1:
+            self.interval = min(self.max_delay, self.interval * 1.5)
+        elif self.utilization < self.target_utilization / 2:
+            self.interval = max(self.min_interval, self.interval / 1.25)
+
+        # Twice the expected batch: the interval normally triggers the flush,
+        # bursts fill the buffer early and are written as one large batch
+        batch_size = self.rate * self.interval * 2
+        if per_record and max(per_record) > 0:
+            batch_size = min(batch_size, self.max_write_latency / max(per_record))
+        self.batch_size = self._quantize(batch_size)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "mode": "adaptive",
+            "interval_seconds": round(self.interval, 3),
+            "batch_size": self.batch_size,
+            "rate": round(self.rate, 1),
+            "utilization": round(self.utilization, 3),
+        }
@@ -0,0 +1,230 @@
+"""
+Compact JSONL data file formats: dictionary-encoded tag ids and array deltas.
+
+With tag ids enabled, a data record names its tag by a small integer instead
+of the full tag name:
+
+    {"tag_ids": {"Line1_Motor3_Speed": 0, "Line1_Motor3_Current": 1}}
+    {"id": 0, "timestamp": "1757312000.1", "value": 1480.5}
+    {"id": 1, "timestamp": "1757312000.1", "value": 12.75}
+
+A dictionary line is written before the first record of each new tag in a
+file, so every file (and every segment of one) is self-describing and can
+be appended to across restarts. Files may mix both record forms; ids never
+change within a file. JSONLToCSVConverter and JsonlReader resolve ids, so
+their users see the usual {"tag": ...} records.
+
+Array and matrix tags configured with `encoding: delta` are written as a
+full keyframe every keyframe_samples samples or keyframe_seconds seconds,
+and as element-level deltas in between. A delta lists the changed positions
+of the flattened array and their new values:
+
+    {"tag": "Spectrum", "timestamp": "1757312000.1", "value": [0.5, 0.25, 0.0, 1.0]}
+    {"tag": "Spectrum", "timestamp": "1757312000.6", "delta": [[1, 3], [0.3, 0.9]]}
+
+Every file starts each delta tag with a keyframe. Readers rebuild full
+values by patching a NumPy copy of the last value (DeltaDecoder).
+
+ByteString values are written as base64:
+
+    {"tag": "Frame", "timestamp": "1757312000.1",
+     "value": {"__type__": "bytes", "encoding": "base64", "value": "AAEC"}}
+
+Records keep them as bytes until an output serializes them (json_default),
+so outputs that store them elsewhere (blob stores) never encode them.
+"""
+
+import base64
+import json
+import mmap
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+TAG_IDS_KEY = "tag_ids"
+# Dictionary lines start with these bytes (json.dumps with default separators)
+TAG_IDS_PREFIX = b'{"tag_ids": '
+
+
+def encode_bytes(data: bytes) -> Dict[str, str]:
+    """Get the JSON form of a ByteString."""
+    return {"__type__": "bytes", "encoding": "base64", "value": base64.b64encode(data).decode("ascii")}
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps default for records: encodes ByteStrings left as bytes."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return encode_bytes(bytes(value))
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class TagIdEncoder:
+    """Assigns tag ids for one file and rewrites data records to use them."""
+
+    def __init__(self, tag_ids: Optional[Dict[str, int]] = None):
+        self.tag_ids: Dict[str, int] = dict(tag_ids or {})
+        self._next_id = max(self.tag_ids.values(), default=-1) + 1
+
+    def encode(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Rewrite a batch of records.
+
+        Returns:
+            list: A dictionary record for tags new to the file (if any), then the records
+        """
+        new_tags: Dict[str, int] = {}
+        encoded = []
+        for record in records:
+            tag = record.get("tag")
+            if tag is None:
+                encoded.append(record)
+                continue
+            tag_id = self.tag_ids.get(tag)
+            if tag_id is None:
+                tag_id = self.tag_ids[tag] = self._next_id
+                self._next_id += 1
+                new_tags[tag] = tag_id
+            encoded_record = {"id": tag_id, "timestamp": record["timestamp"]}
+            if "delta" in record:
+                encoded_record["delta"] = record["delta"]
+            else:
+                encoded_record["value"] = record["value"]
+            encoded.append(encoded_record)
+        if new_tags:
+            encoded.insert(0, {TAG_IDS_KEY: new_tags})
+        return encoded
+
+
+def delta_settings(config: Dict[str, Any]) -> Dict[str, Tuple[int, float]]:
+    """
+    Get the tags configured with `encoding: delta`.
+
+    Returns:
+        dict: Tag name -> (keyframe_samples, keyframe_seconds)
+    """
+    return {tag['name']: (int(tag.get('keyframe_samples', 100)), float(tag.get('keyframe_seconds', 60.0)))
+            for tag in config.get('tags') or [] if tag.get('encoding') == 'delta'}
+
+
+class DeltaEncoder:
+    """Replaces array values of delta tags by element-level deltas between keyframes (one file)."""
+
+    def __init__(self, settings: Dict[str, Tuple[int, float]]):
+        """
+        Args:
+            settings: Tag name -> (keyframe_samples, keyframe_seconds), see delta_settings()
+        """
+        self.settings = settings
+        # tag -> [flat previous value, shape, dtype, samples since keyframe, keyframe monotonic time]
+        self._state: Dict[str, list] = {}
+
+    def encode(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rewrite a batch of records; records of other tags pass through unchanged."""
+        settings = self.settings
+        now = time.monotonic()
+        encoded = []
+        for record in records:
+            setting = settings.get(record.get("tag"))
+            if setting is not None and "value" in record:
+                record = self._encode_record(record, setting, now)
+            encoded.append(record)
+        return encoded
+
+    def _encode_record(self, record: Dict[str, Any], setting: Tuple[int, float], now: float) -> Dict[str, Any]:
+        tag = record["tag"]
+        try:
+            array = np.asarray(record["value"])
+        except ValueError:
+            array = None  # ragged nesting
+        if array is None or array.ndim == 0 or array.dtype.kind not in 'biuf':
+            # Scalars and non-numeric values are always written in full
+            self._state.pop(tag, None)
+            return record
+
+        flat = array.reshape(-1)
+        state = self._state.get(tag)
+        if state is not None:
+            previous, shape, dtype, count, keyframe_time = state
+            keyframe_samples, keyframe_seconds = setting
+            if shape == array.shape and dtype == array.dtype and count + 1 < keyframe_samples \
+                    and now - keyframe_time < keyframe_seconds:
+                changed = np.flatnonzero(previous != flat)
+                # A delta must be smaller than the full value to be worth it
+                if len(changed) * 2 <= len(flat):
+                    state[0] = flat
+                    state[3] = count + 1
+                    return {"tag": tag, "timestamp": record["timestamp"],
+                            "delta": [changed.tolist(), flat[changed].tolist()]}
+
+        self._state[tag] = [flat, array.shape, array.dtype, 0, now]
+        return record
+
+
+class DeltaDecoder:
+    """Rebuilds full values from keyframes and deltas while reading a file in order."""
+
+    def __init__(self):
+        # tag -> last full value, converted to a NumPy array on its first delta
+        self._base: Dict[str, Any] = {}
+
+    def keyframe(self, tag: str, value: Any) -> None:
+        """Remember a full value of a tag."""
+        self._base[tag] = value
+
+    def apply(self, tag: str, delta: List[list]) -> Optional[list]:
+        """
+        Patch the tag's last value with a delta.
+
+        Returns:
+            list: Full value, or None if the tag has had no keyframe yet
+        """
+        base = self._base.get(tag)
+        if base is None:
+            return None
+        if not isinstance(base, np.ndarray):
+            base = self._base[tag] = np.array(base)
+        indices, values = delta
+        base.reshape(-1)[indices] = values
+        return base.tolist()
+
+
+def find_tag_ids(buffer, start: int = 0, end: Optional[int] = None) -> Dict[str, int]:
+    """
+    Collect the dictionary lines in buffer[start:end] without decoding other lines.
+
+    Args:
+        buffer: bytes or mmap of a data file
+        start: Offset of a line start
+        end: End offset (default: end of buffer)
+
+    Returns:
+        dict: Tag name -> id
+    """
+    end = len(buffer) if end is None else end
+    tag_ids: Dict[str, int] = {}
+    position = buffer.find(TAG_IDS_PREFIX, start, end)
+    while position != -1:
+        line_end = buffer.find(b'\n', position, end)
+        if line_end == -1:
+            break  # partial last line
+        if position == 0 or buffer[position - 1:position] == b'\n':
+            try:
+                tag_ids.update(json.loads(buffer[position:line_end])[TAG_IDS_KEY])
+            except (ValueError, KeyError, TypeError):
+                pass
+        position = buffer.find(TAG_IDS_PREFIX, line_end, end)
+    return tag_ids
+
+
+def read_tag_ids(path: str) -> Dict[str, int]:
+    """Get the tag dictionary of an existing data file (empty if missing)."""
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return {}
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return find_tag_ids(buffer)
+    except FileNotFoundError:
+        return {}
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Block checksums for JSONL data files, and a parallel verify/repair tool.
+
+A JSONL output with `checksums: true` follows every batch it writes with a
+block line covering the batch's lines:
+
+    {"tag": "Temperature", "timestamp": "1757312000.1", "value": 21.5}
+    {"tag": "Pressure", "timestamp": "1757312000.1", "value": 1.013}
+    {"block": {"lines": 2, "bytes": 134, "crc32": 2864146927}}
+
+A crash mid-write leaves a batch without its block line (and possibly a
+partial last line). Loaders check blocks while reading (BlockChecker):
+lines of a block whose CRC doesn't match are skipped, lines that are not
+valid JSON are skipped, everything else is loaded. Files written without
+checksums are read as before.
+
+The tool verifies files or whole archives with one process per CPU, each
+checking 64 MB ranges of memory-mapped files (CRC32 runs at memory speed;
+JSON is only parsed where no block covers the data). With --repair it
+moves torn tails (bytes after the last verified block or complete line)
+to <file>.quarantine/ and truncates the file; corrupt blocks in the
+middle of a file are copied there for inspection and skipped by loaders.
+Partitions being compacted (*.jsonl.compacting) are verified but never
+repaired: the compactor is still reading them.
+
+    python opcua_integrity.py archive
+    python opcua_integrity.py opcua_data.jsonl --repair
+"""
+
+import argparse
+import gzip
+import json
+import mmap
+import os
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+BLOCK_KEY = "block"
+# Block lines start with these bytes (json.dumps with default separators)
+BLOCK_PREFIX = b'{"block": '
+QUARANTINE_SUFFIX = ".quarantine"
+RANGE_BYTES = 64 << 20
+# Lines held back waiting for their block line; batches are never larger
+MAX_PENDING_LINES = 1_000_000
+
+_EMPTY: Tuple[bytes, ...] = ()
+
+
+def block_line(payload: bytes, lines: int) -> bytes:
+    """Get the block line that checks a batch's encoded lines."""
+    block = {"lines": lines, "bytes": len(payload), "crc32": zlib.crc32(payload)}
+    return json.dumps({BLOCK_KEY: block}).encode('utf-8') + b'\n'
+
+
+class BlockChecker:
+    """
+    Checks lines of a data file against their block lines while the file is read in order.
+
+    feed() holds lines back until their block line arrives and returns the
+    lines that may be processed: those of blocks with a matching CRC and
+    those no block covers. Callers reset per-file decoding state (array
+    deltas) when bad_blocks increases.
+    """
+
+    def __init__(self, max_pending: int = MAX_PENDING_LINES, keep_dropped: bool = False):
+        """
+        Args:
+            max_pending: Lines held back at most; older lines are returned unchecked
+            keep_dropped: Collect the lines of corrupt blocks in `dropped`
+        """
+        self.max_pending = max_pending
+        self._pending: deque = deque()
+        self.blocks = 0
+        self.bad_blocks = 0
+        self.dropped_lines = 0
+        self.dropped: Optional[List[bytes]] = [] if keep_dropped else None
+
+    def feed(self, line: bytes) -> Tuple[bytes, ...]:
+        """
+        Add one raw line (with its newline).
+
+        Returns:
+            tuple: Lines that can be processed now, in file order
+        """
+        if line.startswith(BLOCK_PREFIX):
+            return self._close_block(line)
+        self._pending.append(line)
+        if len(self._pending) > self.max_pending:
+            return (self._pending.popleft(),)
+        return _EMPTY
+
+    def finish(self) -> Tuple[bytes, ...]:
+        """Get the lines after the last block line (a batch that may be torn; invalid lines fail to parse)."""
+        lines, self._pending = tuple(self._pending), deque()
+        return lines
+
+    def _close_block(self, line: bytes) -> Tuple[bytes, ...]:
+        pending = self._pending
+        try:
+            block = json.loads(line)[BLOCK_KEY]
+            count, crc = int(block["lines"]), int(block["crc32"])
+        except (ValueError, KeyError, TypeError):
+            count = None  # damaged block line: its lines can't be checked
+        if count is None or count > len(pending):
+            return self.finish()
+
+        unchecked = [pending.popleft() for _ in range(len(pending) - count)]
+        block_lines = tuple(pending)
+        pending.clear()
+        self.blocks += 1
+        if zlib.crc32(b''.join(block_lines)) == crc:
+            return tuple(unchecked) + block_lines
+        self.bad_blocks += 1
+        self.dropped_lines += count
+        if self.dropped is not None:
+            self.dropped.extend(block_lines)
+            self.dropped.append(line)
+        return tuple(unchecked)
+
+
+def checked_lines(f, checker: BlockChecker) -> Iterator[bytes]:
+    """Yield the raw lines of a binary file that pass checker, in file order."""
+    for line in f:
+        yield from checker.feed(line)
+    yield from checker.finish()
+
+
+# ----------------------------------------------------------------------
+# Verification
+# ----------------------------------------------------------------------
+
+def _line_start(mm, position: int) -> int:
+    """Get the start of the first line at or after position."""
+    if position == 0:
+        return 0
+    found = mm.find(b'\n', position - 1)
+    return len(mm) if found == -1 else found + 1
+
+
+def _scan_blocks(path: str, start: int, end: int) -> List[Tuple[int, int, int, bool]]:
+    """
+    Check the block lines that start in [start, end) of a file (worker task).
+
+    Returns:
+        list: (data start, block line start, block line end, CRC and layout ok)
+    """
+    needle = b'\n' + BLOCK_PREFIX
+    blocks = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        limit = min(len(mm), end + len(needle))
+        if start == 0 and mm[:len(BLOCK_PREFIX)] == BLOCK_PREFIX:
+            line_start = 0
+        else:
+            found = mm.find(needle, max(0, start - 1), limit)
+            line_start = -1 if found == -1 else found + 1
+        while line_start != -1 and line_start < end:
+            line_end = mm.find(b'\n', line_start)
+            if line_end == -1:
+                break  # torn block line
+            line_end += 1
+            try:
+                block = json.loads(mm[line_start:line_end])[BLOCK_KEY]
+                data_start = line_start - int(block["bytes"])
+                ok = data_start >= 0 and (data_start == 0 or mm[data_start - 1:data_start] == b'\n') and \
+                    zlib.crc32(mm[data_start:line_start]) == int(block["crc32"])
+            except (ValueError, KeyError, TypeError):
+                data_start, ok = line_start, False
+            blocks.append((max(0, data_start), line_start, line_end, ok))
+            found = mm.find(needle, line_end - 1, limit)
+            line_start = -1 if found == -1 else found + 1
+    return blocks
+
+
+def _check_lines(path: str, start: int, end: int) -> List[Tuple[int, int]]:
+    """
+    Parse the lines that start in [start, end) of a file (worker task).
+
+    Returns:
+        list: Byte ranges of invalid lines (including a partial last line)
+    """
+    invalid = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        position = start
+        while position < end:
+            line_end = mm.find(b'\n', position, len(mm))
+            if line_end == -1:
+                invalid.append((position, len(mm)))
+                break
+            line_end += 1
+            line = mm[position:line_end].strip()
+            if line:
+                try:
+                    json.loads(line)
+                except ValueError:
+                    invalid.append((position, line_end))
+            position = line_end
+    return invalid
+
+
+def _check_chunks(data_path: str, chunks: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+    """Decompress compacted chunks (gzip checks its own CRC) and return the ranges of bad ones (worker task)."""
+    bad = []
+    with open(data_path, 'rb') as f:
+        for chunk in chunks:
+            f.seek(chunk["offset"])
+            try:
+                for line in gzip.decompress(f.read(chunk["length"])).splitlines():
+                    json.loads(line)
+            except (OSError, EOFError, ValueError, zlib.error):
+                bad.append((chunk["offset"], chunk["offset"] + chunk["length"]))
+    return bad
+
+
+def _ranges(start: int, end: int, mm) -> List[Tuple[int, int]]:
+    """Split [start, end) into RANGE_BYTES ranges starting at line starts."""
+    ranges = []
+    while start < end:
+        stop = end if end - start <= RANGE_BYTES else min(end, _line_start(mm, start + RANGE_BYTES))
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def data_files(path: str) -> Tuple[List[str], List[str]]:
+    """
+    Find the files to verify.
+
+    Returns:
+        tuple: (JSONL data files, compacted partition paths with a chunk index)
+    """
+    if os.path.isfile(path):
+        return [path], []
+    files, compacted = [], []
+    for directory, _, names in os.walk(path):
+        for name in names:
+            full_path = os.path.join(directory, name)
+            if name.endswith('.jsonl') or name.endswith('.jsonl.compacting'):
+                files.append(full_path)
+            elif name.endswith('.chunks.json'):
+                compacted.append(full_path[:-len('.chunks.json')])
+    return sorted(files), sorted(compacted)
+
+
+def verify(path: str, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Verify a data file or every data file of a directory (archive) in parallel.
+
+    Args:
+        path: JSONL file or directory
+        workers: Worker processes (default: one per CPU)
+
+    Returns:
+        list: One report per file with size, blocks, bad_blocks and invalid_lines
+            (byte ranges), unchecked_bytes (data no block covers) and torn_tail
+            (byte offset of the torn tail, or None)
+    """
+    files, compacted = data_files(path)
+    reports = []
+    with ProcessPoolExecutor(workers) as pool:
+        # Pass 1: block lines and CRCs of all files
+        sizes, block_futures = {}, {}
+        for file_path in files:
+            size = sizes[file_path] = os.path.getsize(file_path)
+            if size == 0:
+                block_futures[file_path] = []
+                continue
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                ranges = _ranges(0, size, mm)
+            block_futures[file_path] = [pool.submit(_scan_blocks, file_path, start, end) for start, end in ranges]
+        chunk_futures = {}
+        for partition in compacted:
+            with open(partition + '.chunks.json', encoding='utf-8') as f:
+                index = json.load(f)
+            data_path = os.path.join(os.path.dirname(partition), index["data"])
+            chunk_futures[data_path] = pool.submit(_check_chunks, data_path, index["chunks"])
+
+        # Pass 2: parse the lines no block covers
+        gap_futures = {}
+        for file_path in files:
+            blocks = [block for future in block_futures[file_path] for block in future.result()]
+            block_futures[file_path] = blocks
+            gaps, position = [], 0
+            for data_start, line_start, line_end, ok in blocks:
+                if data_start > position:
+                    gaps.append((position, data_start))
+                position = max(position, line_end)
+            if position < sizes[file_path]:
+                gaps.append((position, sizes[file_path]))
+            futures = []
+            if gaps:
+                with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for gap_start, gap_end in gaps:
+                        futures.extend(pool.submit(_check_lines, file_path, start, end)
+                                       for start, end in _ranges(gap_start, gap_end, mm))
+            gap_futures[file_path] = (gaps, futures)
+
+        for file_path in files:
+            size = sizes[file_path]
+            blocks = block_futures[file_path]
+            gaps, futures = gap_futures[file_path]
+            invalid = [line for future in futures for line in future.result()]
+            bad_blocks = [(block[0], block[2]) for block in blocks if not block[3]]
+            good_ends = [block[2] for block in blocks if block[3]]
+            # A torn tail is damage that reaches the end of the file: roll back to the
+            # last verified block or, without checksums, to the last valid line
+            damage = [start for start, end in invalid + bad_blocks if end >= size]
+            tail = None
+            if damage:
+                tail = max([end for end in good_ends if end <= min(damage)] or [0]) if good_ends else min(damage)
+            reports.append({
+                "path": file_path, "size": size, "blocks": len(good_ends), "bad_blocks": bad_blocks,
+                "invalid_lines": invalid,
+                "unchecked_bytes": sum(end - start for start, end in gaps) - sum(end - start for start, end in invalid),
+                "torn_tail": tail,
+            })
+        for data_path, future in chunk_futures.items():
+            bad = future.result()
+            reports.append({"path": data_path, "size": os.path.getsize(data_path), "blocks": None,
+                            "bad_blocks": bad, "invalid_lines": [], "unchecked_bytes": 0, "torn_tail": None})
+    return reports
+
+
+def quarantine(path: str, start: int, end: int, kind: str) -> str:
+    """Copy bytes [start, end) of a file to <file>.quarantine/<start>-<end>.<kind>."""
+    directory = path + QUARANTINE_SUFFIX
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, f"{start}-{end}.{kind}")
+    with open(path, 'rb') as source, open(target, 'wb') as f:
+        source.seek(start)
+        f.write(source.read(end - start))
+    return target
+
+
+def repair(report: Dict[str, Any], min_age: float = 60.0) -> List[str]:
+    """
+    Quarantine the damage found by verify() and truncate a torn tail.
+
+    Files changed within the last min_age seconds are left alone (the logger
+    may still be writing their last batch), and so are the sources of running
+    or interrupted compactions (*.compacting), whatever their age.
+
+    Returns:
+        list: Descriptions of the actions taken
+    """
+    path = report["path"]
+    actions = []
+    if path.endswith('.compacting'):
+        return [f"{path}: skipped, source of a compaction (repair after it finishes)"]
+    if time.time() - os.path.getmtime(path) < min_age:
+        return [f"{path}: skipped, modified less than {min_age:.0f}s ago"]
+    tail = report["torn_tail"]
+    for start, end in report["bad_blocks"]:
+        if tail is None or end <= tail:
+            actions.append(f"{path}: corrupt block copied to {quarantine(path, start, end, 'block')}")
+    for start, end in report["invalid_lines"]:
+        if tail is None or end <= tail:
+            actions.append(f"{path}: invalid line copied to {quarantine(path, start, end, 'line')}")
+    if tail is not None:
+        target = quarantine(path, tail, report["size"], 'tail')
+        with open(path, 'r+b') as f:
+            f.truncate(tail)
+        actions.append(f"{path}: torn tail of {report['size'] - tail} bytes moved to {target}")
+    return actions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify and repair OPC UA logger data files")
+    parser.add_argument("path", help="JSONL data file or archive directory")
+    parser.add_argument("--repair", action="store_true", help="Quarantine damage and truncate torn tails")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--min-age", type=float, default=60.0,
+                        help="Don't repair files modified within this many seconds")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    reports = verify(args.path, args.workers)
+    elapsed = time.perf_counter() - started
+    total = sum(report["size"] for report in reports)
+    damaged = [report for report in reports
+               if report["bad_blocks"] or report["invalid_lines"] or report["torn_tail"] is not None]
+    for report in damaged:
+        tail = report["torn_tail"]
+        print(f"{report['path']}: {len(report['bad_blocks'])} corrupt blocks, "
+              f"{len(report['invalid_lines'])} invalid lines"
+              + (f", torn tail of {report['size'] - tail} bytes at {tail}" if tail is not None else ""))
+    print(f"Verified {len(reports)} files, {total / 1e6:.1f} MB in {elapsed:.1f}s "
+          f"({total / 1e6 / max(elapsed, 1e-9):.0f} MB/s): {len(damaged)} damaged")
+    if args.repair:
+        for report in damaged:
+            for action in repair(report, args.min_age):
+                print(action)
+    raise SystemExit(1 if damaged and not args.repair else 0)
+
+
+if __name__ == "__main__":
+    main()
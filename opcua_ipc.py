@@ -0,0 +1,163 @@
+"""
+Framed IPC between the GUI and a logger child process.
+
+The child writes frames to its stdout and reads frames from its stdin.
+Each frame is a 5-byte header (payload length as big-endian uint32 and a
+one byte frame type) followed by a compact UTF-8 JSON payload.
+"""
+
+import asyncio
+import json
+import logging
+import struct
+import sys
+import threading
+from typing import Any, BinaryIO, Callable, Optional, Tuple
+
+FRAME_HEADER = struct.Struct('!IB')
+
+# Frame types
+FRAME_LOG = 1       # child -> GUI: formatted log message (str)
+FRAME_METRICS = 2   # child -> GUI: logger metrics (dict)
+FRAME_LIVE = 3      # child -> GUI: changed live value rows ({tag: row})
+FRAME_ERROR = 4     # child -> GUI: fatal error ({"type": ..., "message": ...})
+FRAME_STOP = 5      # GUI -> child: stop logging and exit (null)
+
+
+def encode_frame(frame_type: int, payload: Any) -> bytes:
+    """Encode one frame."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    return FRAME_HEADER.pack(len(body), frame_type) + body
+
+
+def _read_exact(stream: BinaryIO, size: int) -> Optional[bytes]:
+    """Read exactly size bytes, or return None on end of stream."""
+    chunks = []
+    while size > 0:
+        chunk = stream.read(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_frame(stream: BinaryIO) -> Optional[Tuple[int, Any]]:
+    """
+    Read one frame from a binary stream (blocking).
+
+    Returns:
+        tuple: (frame type, payload), or None when the stream is closed
+    """
+    header = _read_exact(stream, FRAME_HEADER.size)
+    if header is None:
+        return None
+    length, frame_type = FRAME_HEADER.unpack(header)
+    body = _read_exact(stream, length)
+    if body is None:
+        return None
+    return frame_type, json.loads(body)
+
+
+class FrameWriter:
+    """Thread-safe frame writer for a binary stream."""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def send(self, frame_type: int, payload: Any) -> bool:
+        """Write one frame. Returns False if the other side has gone away."""
+        frame = encode_frame(frame_type, payload)
+        with self.lock:
+            try:
+                self.stream.write(frame)
+                self.stream.flush()
+                return True
+            except (BrokenPipeError, OSError, ValueError):
+                return False
+
+
+class IPCLogHandler(logging.Handler):
+    """Logging handler that sends formatted messages as log frames."""
+
+    def __init__(self, writer: FrameWriter):
+        super().__init__()
+        self.writer = writer
+
+    def emit(self, record):
+        try:
+            self.writer.send(FRAME_LOG, self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+class LoggerChild:
+    """Runs an OPCUALogger and streams its logs, metrics and live values to the GUI."""
+
+    def __init__(self, logger, writer: FrameWriter, stdin: BinaryIO):
+        self.logger = logger
+        self.writer = writer
+        self.stdin = stdin
+
+    def _watch_stdin(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Stop the logger on a stop frame or when the GUI closes the pipe (thread)."""
+        while True:
+            frame = read_frame(self.stdin)
+            if frame is None or frame[0] == FRAME_STOP:
+                break
+        try:
+            loop.call_soon_threadsafe(self.logger.stop_event.set)
+        except RuntimeError:
+            # The logger already finished and its loop is closed
+            pass
+
+    async def _publish_task(self) -> None:
+        """Send changed live rows and metrics at the logger's snapshot rate."""
+        seq = 0
+        while True:
+            await asyncio.sleep(self.logger.snapshot_interval)
+            seq, rows, _ = self.logger.get_live_snapshot(seq)
+            if rows:
+                self.writer.send(FRAME_LIVE, rows)
+            self.writer.send(FRAME_METRICS, self.logger.get_metrics())
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        threading.Thread(target=self._watch_stdin, args=(loop,), daemon=True).start()
+        publisher = asyncio.create_task(self._publish_task())
+        try:
+            await self.logger.run()
+        finally:
+            publisher.cancel()
+
+
+def run_logger_child(logger_factory: Callable[[], Any]) -> int:
+    """
+    Entry point of the logger child process started by the GUI.
+
+    Args:
+        logger_factory: Callable creating the OPCUALogger to run
+
+    Returns:
+        int: Process exit code
+    """
+    writer = FrameWriter(sys.stdout.buffer)
+    # Keep stray prints out of the frame stream
+    sys.stdout = sys.stderr
+
+    try:
+        logger = logger_factory()
+
+        handler = IPCLogHandler(writer)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger.logger.addHandler(handler)
+        logger.logger.setLevel(logging.INFO)
+        # Log records go to the GUI only, not to the inherited stderr as well
+        logger.logger.propagate = False
+
+        asyncio.run(LoggerChild(logger, writer, sys.stdin.buffer).run())
+        return 0
+    except Exception as e:
+        writer.send(FRAME_ERROR, {"type": type(e).__name__, "message": str(e)})
+        return 1
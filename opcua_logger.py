@@ -1,289 +1,846 @@
-﻿import asyncio
-import json
+﻿import argparse
+import asyncio
+import functools
 import logging
 import yaml
 import time
-from datetime import datetime, date
-from typing import Dict, List, Any, Optional
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
 from asyncua import Client, ua
+from asyncua.common.subscription import DataChangeNotif
 import os
-import base64
+import signal
+import sys
+from collections import deque
+from opcua_browser import browse_options, resolve_browse_paths
+from opcua_polling import PollingSubscription
+from opcua_events import build_event_filter, event_sources
+from opcua_sinks import LANE_BULK, LANE_CRITICAL, SinkFanout, SinkWorker, build_sinks
+from opcua_encoding import EncodingSink, RawBatch, SampleBuffer, format_timestamp, json_safe
+from opcua_flush import FlushController
+from opcua_compaction import start_compactor
+from opcua_rollups import RollupAggregator, RollupSink, rollup_store_path
+
+
+async def _setup_security(client: Client, server_config: Dict[str, Any], logger: logging.Logger) -> None:
+    """Setup security for the OPC UA client."""
+    security_policy = server_config['security_policy']
+    message_security_mode = server_config['message_security_mode']
+    
+    # All possible combinations of security policy and message mode
+    security_combinations = {
+        # No Security
+        ("None", "None"): (ua.SecurityPolicyType.NoSecurity, None),
+        
+        # Basic128Rsa15
+        ("Basic128Rsa15", "Sign"): (ua.SecurityPolicyType.Basic128Rsa15_Sign, None),
+        ("Basic128Rsa15", "SignAndEncrypt"): (ua.SecurityPolicyType.Basic128Rsa15_SignAndEncrypt, None),
+        
+        # Basic256
+        ("Basic256", "Sign"): (ua.SecurityPolicyType.Basic256_Sign, None),
+        ("Basic256", "SignAndEncrypt"): (ua.SecurityPolicyType.Basic256_SignAndEncrypt, None),
+        
+        # Basic256Sha256
+        ("Basic256Sha256", "Sign"): (ua.SecurityPolicyType.Basic256Sha256_Sign, None),
+        ("Basic256Sha256", "SignAndEncrypt"): (ua.SecurityPolicyType.Basic256Sha256_SignAndEncrypt, None),
+        
+        # Aes128Sha256RsaOaep
+        ("Aes128Sha256RsaOaep", "Sign"): (ua.SecurityPolicyType.Aes128Sha256RsaOaep_Sign, None),
+        ("Aes128Sha256RsaOaep", "SignAndEncrypt"): (ua.SecurityPolicyType.Aes128Sha256RsaOaep_SignAndEncrypt, None),
+    }
+    
+    combination_key = (security_policy, message_security_mode)
+    
+    if combination_key not in security_combinations:
+        error_msg = f"Unknown security combination: {security_policy} + {message_security_mode}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    
+    policy, _ = security_combinations[combination_key]
+    
+    if policy == ua.SecurityPolicyType.NoSecurity:
+        # No security - simple setup
+        logger.info(f"Using no security - Policy: {security_policy}, Mode: {message_security_mode}")
+        return
+    else:
+        # For encrypted connections, we need certificates
+        cert_path = server_config['certificate_path']
+        key_path = server_config['private_key_path']
+        
+        if not cert_path or not key_path:
+            error_msg = f"Certificate and private key paths required for security policy: {security_policy}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        if not os.path.exists(cert_path):
+            error_msg = f"Certificate file not found: {cert_path}"
+            logger.error(error_msg)
+            raise FileNotFoundError(error_msg)
+            
+        if not os.path.exists(key_path):
+            error_msg = f"Private key file not found: {key_path}"
+            logger.error(error_msg)
+            raise FileNotFoundError(error_msg)
+        
+        # Set security with certificates
+        await client.set_security(policy, cert_path, key_path)
+        logger.info(f"Security configured - Policy: {security_policy}, Mode: {message_security_mode}")
+        logger.info(f"Using certificate: {cert_path}")
+        logger.info(f"Using private key: {key_path}")
+
+def _setup_authentication(client: Client, server_config: Dict[str, Any], logger: logging.Logger) -> None:
+    """Setup authentication for the OPC UA client."""
+    username = server_config['username']
+    password = server_config['password']
+    
+    if username and password:
+        client.set_user(username)
+        client.set_password(password)
+        logger.info(f"Using username/password authentication for user: {username}")
+
+
+async def create_client(server_config: Dict[str, Any], logger: logging.Logger) -> Client:
+    """
+    Create an OPC UA client with the configured security and authentication (not connected yet).
+
+    Args:
+        server_config: The 'server' section of a logger config
+        logger: Logger for setup messages
+
+    Returns:
+        Client: asyncua client for server_config['url']
+    """
+    client = Client(url=server_config['url'])
+    await _setup_security(client, server_config, logger)
+    _setup_authentication(client, server_config, logger)
+    return client
+
+
+def load_config(config_path: str) -> Dict[str, Any]:
+    """Load configuration from YAML file."""
+    try:
+        with open(config_path, 'r') as file:
+            return yaml.safe_load(file)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Configuration file {config_path} not found")
+    except yaml.YAMLError as e:
+        raise ValueError(f"Error parsing configuration file: {e}")
+
 
 class OPCUALogger:
     def __init__(self, config_path: str = "config.yaml"):
+        self.config_path = config_path
         self.config = self._load_config(config_path)
         self.client: Optional[Client] = None
+        self.subscription = None
         self.subscriptions: Dict[str, Any] = {}
-        self.tag_data: Dict[str, List[Dict]] = {}           # still in-memory history (optional)
-        self.pending_data: Dict[str, List[Dict]] = {}       # ← NEW: only unsaved points
-        self.last_flush_time = time.time()                  # ← NEW
+        self.connected = False
+        self._node_to_tag: Dict[str, str] = {}              # node id string -> tag name
+        self._handle_to_tag: Dict[int, str] = {}            # client handle -> tag name (resolved lazily)
+        self.last_flush_time = time.time()
+        self.pending_events: List[tuple] = []               # (source name, unix time, field values)
+        self.event_subscription = None
+        self._event_sources: Dict[int, Dict[str, Any]] = {}  # server handle -> event source config
+        self._event_schema_written: set = set()
         self.flush_interval = self.config['logging'].get('flush_interval_seconds', 10.0)
         self.flush_max_pending = self.config['logging'].get('flush_max_pending', 100)
+        self.config_watch_interval = self.config['logging'].get('config_watch_interval_seconds', 2.0)
+        self._config_mtime = self._get_config_mtime()
+        self.sinks = SinkFanout(build_sinks(self.config), self.config['logging'].get('output_queue_batches', 1000))
+
+        # With logging.adaptive_flush, interval and batch size follow the measured load
+        self.flush_controller = FlushController.from_config(self.config['logging'])
+        if self.flush_controller is not None:
+            self.flush_interval = self.flush_controller.interval
+            self.flush_max_pending = self.flush_controller.batch_size
+
+        # Raw samples until the next flush; encoding happens on the encoder's thread (or processes)
+        self.pending = SampleBuffer(self.flush_max_pending)
+        # Tags with `priority: critical` skip the buffer and are written right away
+        self._critical_tags = self._priority_tags(self.config)
+        self.encoder = SinkWorker(EncodingSink(self.sinks, self.config['logging']['timestamp_format'],
+                                               self.config['logging'].get('encoder_workers', 0)),
+                                  self.config['logging'].get('output_queue_batches', 1000))
+
+        # Optional rollup aggregates (min/max/avg/last/count per tag and window)
+        self.rollups: Optional[RollupAggregator] = None
+        self.rollup_worker: Optional[SinkWorker] = None
+        if self.config.get('rollups'):
+            self.rollups = RollupAggregator(self.config['rollups'].get('windows'))
+            self.rollup_worker = SinkWorker(RollupSink(rollup_store_path(self.config)))
 
         # Setup logging
         logging.basicConfig(level=logging.WARNING)
         self.logger = logging.getLogger(__name__)
 
         self.packet_count = 0
+        self.event_count = 0
         self.last_counter_reset = datetime.now()
+        self.metrics: Dict[str, Any] = {"packets_per_sec": 0, "events_per_sec": 0, "pending": 0}
+
+        # Live value snapshots: the callback only marks tags dirty, a periodic
+        # task publishes changed rows that other threads can read without locks
+        self.snapshot_interval = self.config['logging'].get('snapshot_interval_seconds', 1.0)
+        self.snapshot_history_length = self.config['logging'].get('snapshot_history_length', 30)
+        self._live_latest: Dict[str, tuple] = {}
+        self._live_counts: Dict[str, int] = {}
+        self._live_dirty: set = set()
+        self._live_active: set = set()
+        self._live_history: Dict[str, deque] = {}
+        self._live_rows: Dict[str, Dict[str, Any]] = {}
+        self._snapshot_log: deque = deque(maxlen=64)
+        self._snapshot_seq = 0
+        self._last_snapshot_time = time.time()
 
         # Initialize structures
         for tag in self.config['tags']:
-            self.tag_data[tag['name']] = []
-            self.pending_data[tag['name']] = []
+            self._init_tag(tag)
 
         self.stop_event = asyncio.Event()
 
 
-    def _load_config(self, config_path: str) -> Dict[str, Any]:
-        """Load configuration from YAML file."""
-        try:
-            with open(config_path, 'r') as file:
-                return yaml.safe_load(file)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Configuration file {config_path} not found")
-        except yaml.YAMLError as e:
-            raise ValueError(f"Error parsing configuration file: {e}")
-
-    async def _setup_security(self) -> None:
-        """Setup security for the OPC UA client."""
-        security_policy = self.config['server']['security_policy']
-        message_security_mode = self.config['server']['message_security_mode']
-        
-        # All possible combinations of security policy and message mode
-        security_combinations = {
-            # No Security
-            ("None", "None"): (ua.SecurityPolicyType.NoSecurity, None),
-            
-            # Basic128Rsa15
-            ("Basic128Rsa15", "Sign"): (ua.SecurityPolicyType.Basic128Rsa15_Sign, None),
-            ("Basic128Rsa15", "SignAndEncrypt"): (ua.SecurityPolicyType.Basic128Rsa15_SignAndEncrypt, None),
-            
-            # Basic256
-            ("Basic256", "Sign"): (ua.SecurityPolicyType.Basic256_Sign, None),
-            ("Basic256", "SignAndEncrypt"): (ua.SecurityPolicyType.Basic256_SignAndEncrypt, None),
-            
-            # Basic256Sha256
-            ("Basic256Sha256", "Sign"): (ua.SecurityPolicyType.Basic256Sha256_Sign, None),
-            ("Basic256Sha256", "SignAndEncrypt"): (ua.SecurityPolicyType.Basic256Sha256_SignAndEncrypt, None),
-            
-            # Aes128Sha256RsaOaep
-            ("Aes128Sha256RsaOaep", "Sign"): (ua.SecurityPolicyType.Aes128Sha256RsaOaep_Sign, None),
-            ("Aes128Sha256RsaOaep", "SignAndEncrypt"): (ua.SecurityPolicyType.Aes128Sha256RsaOaep_SignAndEncrypt, None),
-        }
-        
-        combination_key = (security_policy, message_security_mode)
-        
-        if combination_key not in security_combinations:
-            error_msg = f"Unknown security combination: {security_policy} + {message_security_mode}"
-            self.logger.error(error_msg)
-            raise ValueError(error_msg)
-        
-        policy, _ = security_combinations[combination_key]
-        
-        if policy == ua.SecurityPolicyType.NoSecurity:
-            # No security - simple setup
-            self.logger.info(f"Using no security - Policy: {security_policy}, Mode: {message_security_mode}")
+    def _init_tag(self, tag: Dict[str, Any]) -> None:
+        """Create the per-tag buffers and lookup entries for a configured tag."""
+        name = tag['name']
+        if tag.get('node_id'):
+            self._node_to_tag[tag['node_id']] = name
+        self._live_counts[name] = 0
+        self._live_history[name] = deque(maxlen=self.snapshot_history_length)
+
+    def _forget_tag(self, name: str) -> None:
+        """Drop the per-tag buffers and lookup entries of a removed tag."""
+        for node_id, tag_name in list(self._node_to_tag.items()):
+            if tag_name == name:
+                del self._node_to_tag[node_id]
+        for handle, tag_name in list(self._handle_to_tag.items()):
+            if tag_name == name:
+                del self._handle_to_tag[handle]
+        for store in (self._live_counts, self._live_history, self._live_latest, self._live_rows):
+            store.pop(name, None)
+        self._live_dirty.discard(name)
+        self._live_active.discard(name)
+        if self.rollups is not None:
+            self.rollups.forget(name)
+
+    @staticmethod
+    def _tag_address(tag: Dict[str, Any]) -> str:
+        """Get what a tag is configured by: its browse path if it has one, else its NodeId."""
+        return tag.get('browse_path') or tag['node_id']
+
+    async def _resolve_browse_paths(self, tags: List[Dict[str, Any]], stale: bool = False) -> None:
+        """
+        Fill in the node_id of tags configured by browse_path.
+
+        All paths are resolved with batched TranslateBrowsePathsToNodeIds
+        requests; results are cached on disk and reused until the server's
+        namespace array changes or a cached NodeId turns out to be unknown.
+
+        Args:
+            tags: Tags to resolve (tags without browse_path are left alone)
+            stale: Translate the paths again instead of using their cached NodeIds
+        """
+        path_tags = [tag for tag in tags if tag.get('browse_path')]
+        if not path_tags:
             return
-        else:
-            # For encrypted connections, we need certificates
-            cert_path = self.config['server']['certificate_path']
-            key_path = self.config['server']['private_key_path']
-            
-            if not cert_path or not key_path:
-                error_msg = f"Certificate and private key paths required for security policy: {security_policy}"
-                self.logger.error(error_msg)
-                raise ValueError(error_msg)
-            
-            if not os.path.exists(cert_path):
-                error_msg = f"Certificate file not found: {cert_path}"
-                self.logger.error(error_msg)
-                raise FileNotFoundError(error_msg)
-                
-            if not os.path.exists(key_path):
-                error_msg = f"Private key file not found: {key_path}"
-                self.logger.error(error_msg)
-                raise FileNotFoundError(error_msg)
-            
-            # Set security with certificates
-            self.client.set_security(policy, cert_path, key_path)
-            self.logger.info(f"Security configured - Policy: {security_policy}, Mode: {message_security_mode}")
-            self.logger.info(f"Using certificate: {cert_path}")
-            self.logger.info(f"Using private key: {key_path}")
-
-    async def _setup_authentication(self) -> None:
-        """Setup authentication for the OPC UA client."""
-        username = self.config['server']['username']
-        password = self.config['server']['password']
-        
-        if username and password:
-            self.client.set_user(username)
-            self.client.set_password(password)
-            self.logger.info(f"Using username/password authentication for user: {username}")
-
-    def _append_line_to_jsonl(self, tag_name: str, data_point: dict):
-        """Append ONE data point to the .jsonl file"""
-        json_path = self.config['logging']['data_file']
+
+        cache_dir, options = browse_options(self.config)
+        browse_config = self.config.get('browse') or {}
         try:
-            os.makedirs(os.path.dirname(json_path) or '.', exist_ok=True)
-            
-            record = {
-                "tag": tag_name,
-                "timestamp": data_point["timestamp"],
-                "value": data_point["value"]
-            }
-            
-            with open(json_path, 'a', encoding='utf-8') as f:
-                json.dump(record, f, ensure_ascii=False)
-                f.write('\n')
-                
+            resolved = await resolve_browse_paths(
+                self.client, self.config['server']['url'], [tag['browse_path'] for tag in path_tags],
+                cache_dir, browse_config.get('default_namespace'),
+                max_concurrency=options['max_concurrency'],
+                stale=[tag['browse_path'] for tag in path_tags] if stale else ())
         except Exception as e:
-            self.logger.error(f"Failed to append to {json_path}: {e}")
+            self.logger.error(f"Error resolving browse paths: {e}")
+            resolved = {}
 
-    def _flush_pending_to_disk(self):
-        """Write all currently pending data points to disk (append only)"""
-        if not any(self.pending_data.values()):
-            return
-
-        flushed_count = 0
-        for tag_name, points in self.pending_data.items():
-            if not points:
+        for tag in path_tags:
+            node_id = resolved.get(tag['browse_path'])
+            old_node_id = tag.get('node_id')
+            if old_node_id and old_node_id != node_id:
+                self._node_to_tag.pop(old_node_id, None)
+            if node_id is None:
+                tag.pop('node_id', None)
+                self.logger.warning(f"Could not resolve browse path of tag {tag['name']}: {tag['browse_path']}")
                 continue
-            for point in points:
-                self._append_line_to_jsonl(tag_name, point)
-                flushed_count += 1
-            # Optional: also add to full in-memory history if you keep it
-            # self.tag_data[tag_name].extend(points)
-            # if len(self.tag_data[tag_name]) > 2000:  # example limit
-            #     self.tag_data[tag_name] = self.tag_data[tag_name][-2000:]
-
-        self.pending_data = {k: [] for k in self.pending_data}  # clear pending
-        self.last_flush_time = time.time()
-        
-        if flushed_count > 0:
-            self.logger.debug(f"Flushed {flushed_count} new data points to disk")
-
-
-    def _json_safe(self, v: Any) -> Any:
-        """Convert values to JSON-serializable types."""
-        if isinstance(v, (str, int, float, bool)) or v is None:
-            return v
-
-        # OPC UA ByteString -> bytes
-        if isinstance(v, (bytes, bytearray, memoryview)):
-            b = bytes(v)
-            return {
-                "__type__": "bytes",
-                "encoding": "base64",
-                "value": base64.b64encode(b).decode("ascii"),
-            }
+            tag['node_id'] = node_id
+            self._node_to_tag[node_id] = tag['name']
+        self.logger.info(f"Resolved {len(resolved)} of {len(path_tags)} browse paths")
+
+    def _get_config_mtime(self) -> Optional[float]:
+        """Get the modification time of the config file, or None if it is missing."""
+        try:
+            return os.stat(self.config_path).st_mtime
+        except OSError:
+            return None
 
-        # datetime/date -> ISO string
-        if isinstance(v, (datetime, date)):
-            return v.isoformat()
+    def _load_config(self, config_path: str) -> Dict[str, Any]:
+        """Load configuration from YAML file."""
+        return load_config(config_path)
 
-        # lists/tuples -> recursively convert
-        if isinstance(v, (list, tuple)):
-            return [self._json_safe(x) for x in v]
+    def _event_schemas(self, events: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Get the schema records the buffered events need.
 
-        # dict -> recursively convert
-        if isinstance(v, dict):
-            return {str(k): self._json_safe(val) for k, val in v.items()}
+        The first event of each source is preceded by a schema record naming
+        its fields; event records then carry the field values positionally.
+        """
+        sources = {source['name']: source for source in event_sources(self.config)}
+        records = []
+        for name, _, _ in events:
+            if name not in self._event_schema_written and name in sources:
+                records.append({"schema": name, "fields": sources[name]['fields']})
+                self._event_schema_written.add(name)
+        return records
 
-        # Fallback: string representation (covers ua.Variant-like oddities)
-        return str(v)
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        Write all pending data points now and wait for the outputs to store them.
 
-    def datachange_notification(self, node, val, data) -> None:
-        try:
-            tag_name = None
-            for tag in self.config['tags']:
-                if node.nodeid.to_string() == tag['node_id']:
-                    tag_name = tag['name']
-                    break
+        Args:
+            timeout: Maximum seconds to wait for the outputs (None waits forever)
 
-            if not tag_name:
-                self.logger.warning(f"Received data change for unknown node: {node.nodeid.to_string()}")
-                return
+        Returns:
+            bool: False if some output has not caught up within the timeout
+        """
+        self._flush_pending_to_disk()
+        return self.drain_outputs(timeout)
+
+    def drain_outputs(self, timeout: Optional[float] = 10.0) -> bool:
+        """Wait until every output has stored its queued batches. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = self.encoder.drain(timeout)
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done = self.sinks.drain(remaining) and done
+        if self.rollup_worker is not None:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done = self.rollup_worker.drain(remaining) and done
+        return done
+
+    def close_outputs(self, timeout: Optional[float] = 10.0) -> bool:
+        """Stop the output threads and close the sinks (they reopen on the next batch). Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # The encoder first: it feeds the sinks, and closing it shuts down its worker processes
+        done = self.encoder.close(timeout)
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done = self.sinks.close(remaining) and done
+        if self.rollup_worker is not None:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done = self.rollup_worker.close(remaining) and done
+        return done
+
+    @staticmethod
+    def _priority_tags(config: Dict[str, Any]) -> set:
+        """Get the names of the tags configured with `priority: critical`."""
+        return {tag['name'] for tag in config.get('tags') or [] if tag.get('priority') == LANE_CRITICAL}
+
+    def _flush_critical(self, schemas: List[Dict[str, Any]], events: List[tuple], samples) -> None:
+        """Hand critical samples or events to the encoder at once, ahead of queued bulk batches."""
+        batch = RawBatch(schemas, events, samples, LANE_CRITICAL)
+        self.encoder.submit(batch, LANE_CRITICAL, batch.received)
+        if self.rollups is not None:
+            # Aggregated with the bulk samples; rows are written by the next regular flush
+            for tag_name, ts, value in zip(*samples):
+                self.rollups.add(tag_name, int(ts * 1_000_000_000), value)
 
-            # Handle timestamp format
-            timestamp_format = self.config['logging']['timestamp_format']
-            if timestamp_format == 'unix':
-                timestamp = str(time.time())
+    def _flush_pending_to_disk(self, final: bool = False):
+        """
+        Hand all currently pending data points and events to the outputs as one batch.
+
+        Args:
+            final: Also write the rollup buckets that are still open (shutdown)
+        """
+        events, self.pending_events = self.pending_events, []
+        batch = RawBatch(self._event_schemas(events), events, self.pending.take())
+        self.last_flush_time = time.time()
+
+        if len(batch):
+            # Non-blocking: the encoder thread encodes the batch and passes it to the outputs
+            self.encoder.submit(batch, LANE_BULK, batch.received)
+            self.logger.debug(f"Flushed {len(batch)} records to the encoder")
+
+        if self.rollups is not None:
+            for tag_name, ts, value in zip(*batch.samples):
+                self.rollups.add(tag_name, int(ts * 1_000_000_000), value)
+            if final:
+                self.rollups.finish_all()
             else:
-                timestamp = datetime.now().strftime(timestamp_format)
+                self.rollups.close_expired(time.time_ns())
+            rows = self.rollups.collect()
+            if rows:
+                self.rollup_worker.submit(rows)
 
-            data_point = {
-                "timestamp": timestamp,
-                "value": self._json_safe(val),   # <-- key change
-            }
+    def datachange_notification(self, node, val, data) -> None:
+        """Handle a single data change (see datachange_notifications)."""
+        self.datachange_notifications([(node, val, data)])
 
-            # Keep in memory (optional - remove if not needed)
-            self.tag_data[tag_name].append(data_point)
+    def datachange_notifications(self, items: List[Tuple[Any, Any, Any]]) -> None:
+        """
+        Handle a batch of data changes, e.g. one polling cycle.
 
-            # Add to pending buffer (this is what gets flushed)
-            self.pending_data[tag_name].append(data_point)
+        Args:
+            items: (node, value, data change notification) tuples
+        """
+        tagged = []
+        for node, val, data in items:
+            tag_name = self._node_to_tag.get(node.nodeid.to_string())
+            if not tag_name:
+                self.logger.warning(f"Received data change for unknown node: {node.nodeid.to_string()}")
+                continue
+            tagged.append((tag_name, val, data))
+        self._buffer_samples(tagged)
+
+    async def _publish_datachange(self, subscription, datachange: ua.DataChangeNotification) -> None:
+        """
+        Handle all data changes of a publish response at once.
+
+        Installed in place of the subscription's _call_datachange, which
+        would call datachange_notification once per monitored item. Tags are
+        looked up by client handle, resolving each handle's NodeId only once.
+        """
+        monitored_items = subscription._monitored_items
+        handle_to_tag = self._handle_to_tag
+        tagged = []
+        for item in datachange.MonitoredItems:
+            handle = item.ClientHandle
+            item_data = monitored_items.get(handle)
+            if item_data is None:
+                self.logger.warning(f"Received data change for unknown handle: {handle}")
+                continue
+            tag_name = handle_to_tag.get(handle)
+            if tag_name is None:
+                tag_name = self._node_to_tag.get(item_data.node.nodeid.to_string())
+                if tag_name is None:
+                    self.logger.warning(f"Received data change for unknown node: {item_data.node.nodeid.to_string()}")
+                    continue
+                handle_to_tag[handle] = tag_name
+            tagged.append((tag_name, item.Value.Value.Value, DataChangeNotif(item_data, item)))
+        self._buffer_samples(tagged)
 
-            self.packet_count += 1
-            # self.logger.info(f"Data change: {tag_name} = {val} @ {timestamp}")
+    def _buffer_samples(self, tagged: List[Tuple[str, Any, Any]]) -> None:
+        """
+        Buffer a batch of (tag name, value, data) samples in one pass.
 
-            # Check if we should flush now
+        Only the raw samples are buffered, all with the batch's receive time;
+        values and timestamps are encoded per flush by the encoder. Samples
+        of critical tags are handed to the encoder at the end of the batch.
+        """
+        try:
             now = time.time()
-            total_pending = sum(len(lst) for lst in self.pending_data.values())
+            pending = self.pending
+            latest = self._live_latest
+            counts = self._live_counts
+            critical_tags = self._critical_tags
+            critical: List[Tuple[str, Any]] = []
+            for tag_name, val, data in tagged:
+                if critical_tags and tag_name in critical_tags:
+                    critical.append((tag_name, val))
+                elif pending.append(tag_name, now, val):
+                    self._flush_pending_to_disk()
+                    pending = self.pending
+                # Remember the latest value for the next live snapshot
+                latest[tag_name] = (val, now, data)
+                counts[tag_name] += 1
+            self._live_dirty.update(tag_name for tag_name, _, _ in tagged)
+            self.packet_count += len(tagged)
 
-            if (now - self.last_flush_time >= self.flush_interval) or \
-               (total_pending >= self.flush_max_pending):
-               self._flush_pending_to_disk()
+            if critical:
+                self._flush_critical([], [], ([tag_name for tag_name, _ in critical], [now] * len(critical),
+                                              [val for _, val in critical]))
+            if now - self.last_flush_time >= self.flush_interval:
+                self._flush_pending_to_disk()
 
         except Exception as e:
             self.logger.warning(f"Error handling data change: {e}")
 
+    def event_notification(self, event) -> None:
+        """Buffer an event; it is encoded and written with the next flush."""
+        try:
+            source = self._event_sources.get(event.server_handle)
+            if source is None:
+                self.logger.warning(f"Received event for unknown monitored item: {event.server_handle}")
+                return
+
+            entry = (source['name'], time.time(), [field.Value for field in event.event_fields])
+            self.event_count += 1
+            if source.get('priority') == LANE_CRITICAL:
+                self._flush_critical(self._event_schemas([entry]), [entry], ([], [], []))
+                return
+            self.pending_events.append(entry)
+
+            if time.time() - self.last_flush_time >= self.flush_interval or \
+               len(self.pending_events) >= self.flush_max_pending:
+                self._flush_pending_to_disk()
+
+        except Exception as e:
+            self.logger.warning(f"Error handling event: {e}")
+
+    async def _setup_event_subscriptions(self) -> None:
+        """Subscribe the configured event sources on a subscription of their own."""
+        sources = event_sources(self.config)
+        if not sources:
+            return
+
+        # Separate subscription so alarm floods don't delay data change publishing
+        self.event_subscription = await self.client.create_subscription(500, self)
+        for source in sources:
+            try:
+                event_filter = build_event_filter(source['fields'], source['event_types'], source['min_severity'],
+                                                  source['where'])
+                # The returned handle is the server's MonitoredItemId, which events carry
+                handle = await self.event_subscription.subscribe_events(
+                    self.client.get_node(source['source']), evfilter=event_filter, queuesize=source['queue_size'])
+                self._event_sources[handle] = source
+                self.logger.info(f"Subscribed to events: {source['name']} ({source['source']})")
+            except Exception as e:
+                self.logger.warning(f"Error subscribing to events {source['name']}: {e}")
+
     async def _setup_subscriptions(self) -> None:
-        """Setup subscriptions for all configured tags."""
+        """Setup subscriptions (or polling) for all configured tags."""
         try:
+            acquisition = self.config.get('acquisition') or {}
+            if acquisition.get('mode', 'subscription') == 'polling':
+                # Batched Reads on a fixed schedule, delivered like data changes
+                self.subscription = PollingSubscription(
+                    self.client, self,
+                    interval_ms=acquisition.get('poll_interval_ms', 1000),
+                    max_concurrency=acquisition.get('max_concurrent_reads', 4),
+                    max_nodes_per_read=acquisition.get('max_nodes_per_read'))
+                await self._subscribe_tags(self.config['tags'])
+                self.subscription.start()
+                self.logger.info(f"Polling {len(self.subscriptions)} tags every "
+                                 f"{acquisition.get('poll_interval_ms', 1000)} ms")
+                return
+
             # Create subscription
-            subscription = await self.client.create_subscription(500, self)  # 500ms publishing interval
+            self.subscription = await self.client.create_subscription(500, self)  # 500ms publishing interval
+            # Handle each publish response's data changes as one batch instead of item by item
+            self._handle_to_tag = {}
+            self.subscription._call_datachange = functools.partial(self._publish_datachange, self.subscription)
             
-            for tag in self.config['tags']:
-                try:
-                    # Get the node
-                    node = self.client.get_node(tag['node_id'])
-                    
-                    # Subscribe to data changes using the subscription
-                    handle = await subscription.subscribe_data_change([node])
-                    
-                    self.subscriptions[tag['name']] = {
-                        'node': node,
-                        'handle': handle,
-                        'subscription': subscription
-                    }
-                    
-                    self.logger.info(f"Subscribed to tag: {tag['name']} ({tag['node_id']})")
-                    
-                except Exception as e:
-                    self.logger.warning(f"Error subscribing to tag {tag['name']}: {e}")
+            await self._subscribe_tags(self.config['tags'])
             
         except Exception as e:
             self.logger.warning(f"Error setting up subscriptions: {e}")
             raise
 
+    @staticmethod
+    def _tag_settings(tag: Dict[str, Any]) -> Tuple[float, int]:
+        """Get the (sampling interval ms, queue size) monitoring settings of a tag."""
+        return float(tag.get('sampling_interval', 0.0)), int(tag.get('queue_size', 0))
+
+    async def _subscribe_tags(self, tags: List[Dict[str, Any]], retry_stale: bool = True) -> None:
+        """
+        Subscribe tags with one CreateMonitoredItems request per distinct monitoring setting.
+
+        Tags configured by browse path whose NodeId the server doesn't know
+        (the cached NodeId is stale) are resolved again and subscribed once more.
+        """
+        stale = []
+        groups: Dict[Tuple[float, int], List[Tuple[Dict[str, Any], Any]]] = {}
+        for tag in tags:
+            if not tag.get('node_id'):
+                self.logger.warning(f"Not subscribing to tag {tag['name']}: browse path not resolved")
+                continue
+            try:
+                # Get the node
+                node = self.client.get_node(tag['node_id'])
+            except Exception as e:
+                self.logger.warning(f"Error subscribing to tag {tag['name']}: {e}")
+                continue
+            groups.setdefault(self._tag_settings(tag), []).append((tag, node))
+
+        for (sampling_interval, queue_size), group in groups.items():
+            try:
+                # Subscribe to data changes using the subscription
+                handles = await self.subscription.subscribe_data_change(
+                    [node for _, node in group], queuesize=queue_size, sampling_interval=sampling_interval)
+            except Exception as e:
+                for tag, _ in group:
+                    self.logger.warning(f"Error subscribing to tag {tag['name']}: {e}")
+                continue
+
+            for (tag, node), handle in zip(group, handles):
+                if isinstance(handle, ua.StatusCode):
+                    if retry_stale and tag.get('browse_path') and handle.value == ua.StatusCodes.BadNodeIdUnknown:
+                        stale.append(tag)
+                        continue
+                    self.logger.warning(f"Error subscribing to tag {tag['name']}: {handle.name}")
+                    continue
+
+                self.subscriptions[tag['name']] = {
+                    'node': node,
+                    'handle': handle,
+                    'subscription': self.subscription
+                }
+                
+                self.logger.info(f"Subscribed to tag: {tag['name']} ({tag['node_id']})")
+
+        if stale:
+            self.logger.warning(f"{len(stale)} tags have unknown cached NodeIds, resolving their browse paths again")
+            await self._resolve_browse_paths(stale, stale=True)
+            await self._subscribe_tags(stale, retry_stale=False)
+
+    async def add_tag(self, name: str, node_id: str) -> None:
+        """
+        Add a tag at runtime.
+
+        When connected, only the new tag is subscribed; existing subscriptions
+        are left untouched.
+
+        Args:
+            name: Tag name used in the output
+            node_id: OPC UA NodeId string
+        """
+        if any(tag['name'] == name for tag in self.config['tags']):
+            raise ValueError(f"Tag already exists: {name}")
+        if node_id in self._node_to_tag:
+            raise ValueError(f"Node already logged as tag {self._node_to_tag[node_id]}: {node_id}")
+
+        tag = {'name': name, 'node_id': node_id}
+        self._init_tag(tag)
+        if self.connected and self.subscription:
+            await self._subscribe_tags([tag])
+            if name not in self.subscriptions:
+                self._forget_tag(name)
+                raise ValueError(f"Could not subscribe to {node_id}")
+        self.config['tags'].append(tag)
+
+    async def remove_tag(self, name: str) -> None:
+        """
+        Remove a tag at runtime, writing its pending data first.
+
+        Args:
+            name: Tag name to remove
+        """
+        if not any(tag['name'] == name for tag in self.config['tags']):
+            raise KeyError(f"Unknown tag: {name}")
+
+        entry = self.subscriptions.pop(name, None)
+        if entry and self.connected:
+            await entry['subscription'].unsubscribe(entry['handle'])
+            self.logger.info(f"Unsubscribed from tag: {name}")
+
+        self._flush_pending_to_disk()
+        self._forget_tag(name)
+        self.config['tags'] = [tag for tag in self.config['tags'] if tag['name'] != name]
+
+    async def reload_config(self) -> Dict[str, List[str]]:
+        """
+        Reload the config file and apply tag changes incrementally.
+
+        Only added or removed tags are subscribed or unsubscribed, and tags whose
+        sampling_interval/queue_size changed are modified in place. When the
+        event sources change, the event subscription is created again. The
+        session, the other monitored items and all buffers are kept. Server
+        settings only take effect after a restart.
+
+        Returns:
+            dict: Names of the added, removed and modified tags, of the tags whose
+            modification the server rejected, and of the changed event sources
+        """
+        self._config_mtime = self._get_config_mtime()
+        try:
+            new_config = self._load_config(self.config_path)
+        except (FileNotFoundError, ValueError) as e:
+            self.logger.error(f"Config reload failed, keeping current configuration: {e}")
+            return {}
+
+        old_tags = {tag['name']: tag for tag in self.config['tags']}
+        new_tags = {tag['name']: tag for tag in new_config.get('tags') or []}
+
+        address = self._tag_address
+        removed = [name for name, tag in old_tags.items()
+                   if name not in new_tags or address(new_tags[name]) != address(tag)]
+        added = [tag for name, tag in new_tags.items()
+                 if name not in old_tags or address(old_tags[name]) != address(tag)]
+        modified = [tag for name, tag in new_tags.items()
+                    if name in old_tags and address(old_tags[name]) == address(tag)
+                    and self._tag_settings(tag) != self._tag_settings(old_tags[name])]
+
+        # Unchanged browse path tags keep their resolved NodeId
+        for name, tag in new_tags.items():
+            if tag.get('browse_path') and name in old_tags and address(old_tags[name]) == address(tag) \
+                    and old_tags[name].get('node_id'):
+                tag['node_id'] = old_tags[name]['node_id']
+
+        if new_config.get('server') != self.config.get('server'):
+            self.logger.warning("Server settings changed; they take effect after a restart")
+            new_config['server'] = self.config['server']
+
+        # Removed tags: one DeleteMonitoredItems request, then drop their buffers
+        if removed:
+            handles = [self.subscriptions[name]['handle'] for name in removed if name in self.subscriptions]
+            if handles and self.connected:
+                try:
+                    await self.subscription.unsubscribe(handles)
+                except Exception as e:
+                    self.logger.warning(f"Error unsubscribing removed tags: {e}")
+            self._flush_pending_to_disk()
+            for name in removed:
+                self.subscriptions.pop(name, None)
+                self._forget_tag(name)
+
+        old_config, self.config = self.config, new_config
+
+        # Added tags: batched TranslateBrowsePathsToNodeIds, then CreateMonitoredItems
+        if added and self.connected:
+            await self._resolve_browse_paths(added)
+        for tag in added:
+            self._init_tag(tag)
+        if added and self.connected:
+            await self._subscribe_tags(added)
+
+        # Changed monitoring settings: ModifyMonitoredItems on the existing items
+        rejected: List[str] = []
+        if modified and self.connected:
+            modified, rejected = await self._modify_tags(modified)
+
+        # Changed event sources: new event subscription with the new filters
+        changed_sources = self._changed_event_sources(old_config, self.config)
+        if changed_sources:
+            self._flush_pending_to_disk()
+            self._event_schema_written.difference_update(changed_sources)
+            if self.connected:
+                await self._delete_event_subscription()
+                await self._setup_event_subscriptions()
+
+        self.sinks.reload(self.config)
+        self._critical_tags = self._priority_tags(self.config)
+
+        logging_config = self.config['logging']
+        self.flush_controller = FlushController.from_config(logging_config)
+        if self.flush_controller is not None:
+            self._apply_flush_settings(self.flush_controller.interval, self.flush_controller.batch_size)
+        else:
+            self._apply_flush_settings(logging_config.get('flush_interval_seconds', 10.0),
+                                       logging_config.get('flush_max_pending', 100))
+        self.config_watch_interval = logging_config.get('config_watch_interval_seconds', 2.0)
+
+        changes = {
+            "added": [tag['name'] for tag in added],
+            "removed": removed,
+            "modified": [tag['name'] for tag in modified],
+            "rejected": rejected,
+            "event_sources": changed_sources,
+        }
+        self.logger.info(f"Configuration reloaded: {len(added)} added, {len(removed)} removed, "
+                         f"{len(modified)} modified, {len(rejected)} rejected, "
+                         f"{len(changed_sources)} event sources changed")
+        return changes
+
+    async def _modify_tags(self, tags: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Apply changed sampling_interval/queue_size with one ModifyMonitoredItems request per subscription.
+
+        Returns:
+            tuple: The tags the server accepted, and the names of those it rejected
+        """
+        groups: Dict[int, Tuple[Any, List[Tuple[Dict[str, Any], int]]]] = {}
+        for tag in tags:
+            entry = self.subscriptions.get(tag['name'])
+            if entry:
+                subscription = entry['subscription']
+                groups.setdefault(id(subscription), (subscription, []))[1].append((tag, entry['handle']))
+
+        modified, rejected = [], []
+        for subscription, items in groups.values():
+            if isinstance(subscription, PollingSubscription):
+                # Every polled node is read each cycle; there is nothing to modify
+                modified.extend(tag for tag, _ in items)
+                continue
+
+            monitored = {item.server_handle: item for item in subscription._monitored_items.values()}
+            params = ua.ModifyMonitoredItemsParameters()
+            params.SubscriptionId = subscription.subscription_id
+            for tag, handle in items:
+                sampling_interval, queue_size = self._tag_settings(tag)
+                request = ua.MonitoredItemModifyRequest()
+                request.MonitoredItemId = handle
+                request.RequestedParameters = ua.MonitoringParameters(
+                    ClientHandle=monitored[handle].client_handle, SamplingInterval=sampling_interval,
+                    Filter=monitored[handle].mfilter, QueueSize=queue_size, DiscardOldest=True)
+                params.ItemsToModify.append(request)
+            try:
+                results = await subscription.server.modify_monitored_items(params)
+            except Exception as e:
+                self.logger.warning(f"Error modifying tags {', '.join(tag['name'] for tag, _ in items)}: {e}")
+                rejected.extend(tag['name'] for tag, _ in items)
+                continue
+
+            for (tag, _), result in zip(items, results):
+                if result.StatusCode.is_good():
+                    modified.append(tag)
+                    self.logger.info(f"Modified tag {tag['name']}: sampling interval "
+                                     f"{result.RevisedSamplingInterval} ms, queue size {result.RevisedQueueSize}")
+                else:
+                    rejected.append(tag['name'])
+                    self.logger.warning(f"Server rejected the new settings of tag {tag['name']}: "
+                                        f"{result.StatusCode.name}")
+        return modified, rejected
+
+    @staticmethod
+    def _changed_event_sources(old_config: Dict[str, Any], new_config: Dict[str, Any]) -> List[str]:
+        """Get the names of event sources that were added, removed or changed."""
+        old_sources = {source['name']: source for source in event_sources(old_config)}
+        new_sources = {source['name']: source for source in event_sources(new_config)}
+        return sorted(name for name in old_sources.keys() | new_sources.keys()
+                      if old_sources.get(name) != new_sources.get(name))
+
+    async def _delete_event_subscription(self) -> None:
+        """Delete the event subscription (its pending events must have been flushed)."""
+        if self.event_subscription is not None:
+            try:
+                await self.event_subscription.delete()
+            except Exception as e:
+                self.logger.warning(f"Error deleting event subscription: {e}")
+        self.event_subscription = None
+        self._event_sources = {}
+
+    async def _config_watch_task(self):
+        """Reload the configuration whenever the config file changes."""
+        while self.config_watch_interval > 0:
+            await asyncio.sleep(self.config_watch_interval)
+            mtime = self._get_config_mtime()
+            if mtime is not None and mtime != self._config_mtime:
+                await self.reload_config()
+
+    def save_config(self) -> None:
+        """Write the current configuration (including runtime tag changes) back to the YAML file."""
+        config = dict(self.config)
+        # Tags configured by browse path are re-resolved on startup; don't pin their NodeId
+        config['tags'] = [{key: value for key, value in tag.items()
+                           if not (key == 'node_id' and tag.get('browse_path'))}
+                          for tag in self.config['tags']]
+        with open(self.config_path, 'w') as file:
+            yaml.dump(config, file, default_flow_style=False)
+        # Our own write is not a change to reload
+        self._config_mtime = self._get_config_mtime()
+
+    async def open_session(self) -> None:
+        """Connect to the OPC UA server with the configured security and authentication."""
+        server_url = self.config['server']['url']
+        self.logger.info(f"Connecting to OPC UA server: {server_url}")
+        
+        self.client = await create_client(self.config['server'], self.logger)
+        
+        # Connect to server
+        await self.client.connect()
+        self.connected = True
+        self.logger.info("Connected to OPC UA server")
+
     async def connect(self) -> None:
         """Connect to OPC UA server and setup subscriptions."""
         try:
-            server_url = self.config['server']['url']
-            self.logger.info(f"Connecting to OPC UA server: {server_url}")
+            await self.open_session()
             
-            self.client = Client(url=server_url)
-            
-            # Setup security and authentication
-            await self._setup_security()
-            await self._setup_authentication()
-            
-            # Connect to server
-            await self.client.connect()
-            self.logger.info("Connected to OPC UA server")
+            # Resolve tags configured by browse path
+            await self._resolve_browse_paths(self.config['tags'])
             
             # Setup subscriptions
             await self._setup_subscriptions()
+            await self._setup_event_subscriptions()
             
         except ValueError as e:
             # Configuration errors (missing certs, invalid policy, etc.)
@@ -306,20 +863,161 @@ class OPCUALogger:
                 self.logger.error(f"Connection error: {e}")
             raise
 
+    def _apply_flush_settings(self, interval: float, max_pending: int) -> None:
+        """Set the flush interval and buffer capacity, flushing first if the buffer would overflow."""
+        self.flush_interval = interval
+        self.flush_max_pending = max_pending
+        if max_pending != self.pending.capacity:
+            if len(self.pending) >= max_pending:
+                self._flush_pending_to_disk()
+            self.pending.resize(max_pending)
+
+    async def _flush_timer_task(self):
+        """Flush buffered data once it is flush_interval old, also when no new data arrives."""
+        while True:
+            await asyncio.sleep(min(0.25, self.flush_interval))
+            if (len(self.pending) or self.pending_events) and \
+                    time.time() - self.last_flush_time >= self.flush_interval:
+                self._flush_pending_to_disk()
+
     async def _packet_counter_task(self):
+        last_update = time.monotonic()
         while True:
             await asyncio.sleep(1)
 
             count = self.packet_count
             self.packet_count = 0
+            now = time.monotonic()
+            elapsed, last_update = now - last_update, now
+
+            if self.flush_controller is not None:
+                writers = {self.encoder.sink.name: self.encoder.metrics, **self.sinks.get_metrics()}
+                self.flush_controller.update(count, elapsed, writers)
+                self._apply_flush_settings(self.flush_controller.interval, self.flush_controller.batch_size)
+                self.metrics["flush"] = self.flush_controller.get_metrics()
+            else:
+                self.metrics["flush"] = {"mode": "static", "interval_seconds": self.flush_interval,
+                                         "batch_size": self.flush_max_pending}
 
+            self.metrics["packets_per_sec"] = count
+            self.metrics["events_per_sec"], self.event_count = self.event_count, 0
+            self.metrics["pending"] = len(self.pending)
+            self.metrics["encoder"] = self.encoder.get_metrics()
+            self.metrics["outputs"] = self.sinks.get_metrics()
+            # Receive-to-written latency per lane, of the slowest output
+            self.metrics["lanes"] = {
+                lane: {key: max((output["lanes"][lane][key] for output in self.metrics["outputs"].values()),
+                                default=0.0)
+                       for key in ("latency_last", "latency_avg", "latency_max")}
+                for lane in (LANE_CRITICAL, LANE_BULK)}
+            if self.rollup_worker is not None:
+                self.metrics["outputs"][self.rollup_worker.sink.name] = self.rollup_worker.get_metrics()
+            if isinstance(self.subscription, PollingSubscription):
+                self.metrics.update(self.subscription.metrics)
             self.logger.info(f"Packets/sec: {count}")
 
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get a copy of the current logger metrics."""
+        return dict(self.metrics)
+
+    @staticmethod
+    def _status_name(data) -> str:
+        """Get the status code name of a data change notification."""
+        try:
+            return data.monitored_item.Value.StatusCode.name
+        except AttributeError:
+            return "Good"
+
+    def _publish_snapshot(self) -> None:
+        """Publish rows for tags that changed (or stopped changing) since the last snapshot."""
+        now = time.time()
+        elapsed = max(now - self._last_snapshot_time, 1e-6)
+        self._last_snapshot_time = now
+
+        dirty, self._live_dirty = self._live_dirty, set()
+        changed: Dict[str, Dict[str, Any]] = {}
+
+        timestamp_format = self.config['logging']['timestamp_format']
+        for tag_name in dirty:
+            raw_value, ts, data = self._live_latest[tag_name]
+            value = json_safe(raw_value)
+            history = self._live_history[tag_name]
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                history.append(value)
+            changed[tag_name] = {
+                "value": value,
+                "timestamp": format_timestamp(ts, timestamp_format),
+                "status": self._status_name(data),
+                "rate": self._live_counts[tag_name] / elapsed,
+                "history": tuple(history),
+            }
+            self._live_counts[tag_name] = 0
+
+        # Tags that were updating last time but are quiet now drop to rate 0
+        for tag_name in self._live_active - dirty:
+            row = self._live_rows.get(tag_name)
+            if row is not None:
+                changed[tag_name] = dict(row, rate=0.0)
+        self._live_active = dirty
+
+        if not changed:
+            return
+
+        # Readers only ever see complete rows: update the rows, log the
+        # delta and bump the sequence number last
+        seq = self._snapshot_seq + 1
+        self._live_rows.update(changed)
+        self._snapshot_log.append((seq, changed))
+        self._snapshot_seq = seq
+
+    async def _snapshot_task(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            self._publish_snapshot()
+
+    def get_live_snapshot(self, since_seq: int = 0) -> Tuple[int, Dict[str, Dict[str, Any]], bool]:
+        """
+        Get live tag rows changed since a previous snapshot sequence number.
+
+        Safe to call from any thread. Returns only the rows that changed after
+        ``since_seq`` while it is still covered by the recent snapshot log,
+        otherwise every row.
+
+        Args:
+            since_seq: Sequence number returned by the previous call (0 for all rows)
+
+        Returns:
+            tuple: (sequence number, {tag: row}, True if the rows are a full snapshot)
+        """
+        seq = self._snapshot_seq
+        if since_seq == seq:
+            return seq, {}, False
+
+        log = list(self._snapshot_log)
+        if since_seq and log and log[0][0] <= since_seq + 1:
+            rows: Dict[str, Dict[str, Any]] = {}
+            for entry_seq, changed in log:
+                if since_seq < entry_seq <= seq:
+                    rows.update(changed)
+            return seq, rows, False
+
+        return seq, self._live_rows.copy(), True
+
     async def run(self) -> None:
         """Main run loop - keep the connection alive and allow stopping from GUI."""
+        self.stop_event.clear()
+        self._event_schema_written = set()
+        tasks = []
+        compactor = None
         try:
+            # Compaction of closed partitions runs in its own low-priority process
+            compactor = start_compactor(self.config)
             await self.connect()
-            asyncio.create_task(self._packet_counter_task())
+            tasks.append(asyncio.create_task(self._packet_counter_task()))
+            tasks.append(asyncio.create_task(self._flush_timer_task()))
+            tasks.append(asyncio.create_task(self._snapshot_task()))
+            tasks.append(asyncio.create_task(self._config_watch_task()))
+            self._add_reload_signal_handler()
             self.logger.info("OPC UA Logger is running. Press Ctrl+C to stop.")
             
             # Main loop now checks stop_event
@@ -331,14 +1029,52 @@ class OPCUALogger:
         except Exception as e:
             self.logger.error(f"Error in main loop: {e}")
         finally:
-            self._flush_pending_to_disk()
+            for task in tasks:
+                task.cancel()
+            self._remove_reload_signal_handler()
+            self._flush_pending_to_disk(final=True)
             await self.disconnect()
+            # Give the outputs a chance to store the last batches
+            if not await asyncio.to_thread(self.drain_outputs, 10.0):
+                self.logger.warning("Some outputs did not finish writing before shutdown")
+            if not await asyncio.to_thread(self.close_outputs, 5.0):
+                self.logger.warning("Some outputs were closed with unwritten batches")
+            if compactor is not None:
+                # Safe at any point: an interrupted compaction is finished by the next run
+                compactor.terminate()
+                await asyncio.to_thread(compactor.join, 5.0)
             self.logger.info("Logger stopped gracefully.")
 
+    def _add_reload_signal_handler(self) -> None:
+        """Reload the configuration on SIGHUP (POSIX, main thread only)."""
+        if not hasattr(signal, 'SIGHUP'):
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(self.reload_config()))
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass
+
+    def _remove_reload_signal_handler(self) -> None:
+        if not hasattr(signal, 'SIGHUP'):
+            return
+        try:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass
+
     async def disconnect(self) -> None:
         """Disconnect from OPC UA server and cleanup."""
         try:
-            if self.client:
+            if self.client and self.connected:
+                self.connected = False
+                if isinstance(self.subscription, PollingSubscription):
+                    await self.subscription.delete()
+                self.subscriptions = {}
+                self.subscription = None
+                self._handle_to_tag = {}
+                self.event_subscription = None
+                self._event_sources = {}
                 await self.client.disconnect()
                 self.logger.info("Disconnected from OPC UA server")
                 
@@ -350,22 +1086,52 @@ class OPCUALogger:
         current_data = {}
         for tag in self.config['tags']:
             tag_name = tag['name']
-            if self.tag_data[tag_name]:
-                current_data[tag_name] = self.tag_data[tag_name][-1]
+            latest = self._live_latest.get(tag_name)
+            if latest:
+                value, ts, _ = latest
+                current_data[tag_name] = {
+                    "timestamp": format_timestamp(ts, self.config['logging']['timestamp_format']),
+                    "value": json_safe(value),
+                }
             else:
                 current_data[tag_name] = None
         return current_data
 
 
-async def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="OPC UA data change logger")
+    parser.add_argument("--config", default="config.yaml", help="Path to the YAML configuration file")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Run as a headless service controlled through the local control API")
+    parser.add_argument("--ipc", action="store_true",
+                        help="Run as a GUI child process: stream logs, metrics and live values "
+                             "as framed messages on stdout and stop on a stop frame from stdin")
+    return parser.parse_args(argv)
+
+
+async def main(args: Optional[argparse.Namespace] = None):
     """Main entry point."""
-    logger = OPCUALogger()
-    await logger.run()
+    args = args or parse_args()
+    logger = OPCUALogger(args.config)
+    if args.daemon:
+        from opcua_control import ControlServer
+        # Service logs (to stderr / journald) include connection and tag changes
+        logger.logger.setLevel(logging.INFO)
+        logging.getLogger("opcua_control").setLevel(logging.INFO)
+        await ControlServer(logger).serve()
+    else:
+        await logger.run()
 
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.ipc:
+        from opcua_ipc import run_logger_child
+        sys.exit(run_logger_child(lambda: OPCUALogger(args.config)))
+
     try:
-        asyncio.run(main())
+        asyncio.run(main(args))
     except KeyboardInterrupt:
         print("\nProgram terminated by user")
     except Exception as e:
@@ -4,26 +4,41 @@ import yaml
 import json
 import csv
 import os
+import sys
 import subprocess
 import threading
 import queue
 import time
+from collections import deque
+from itertools import islice
 from typing import Dict, List, Any, Optional
 import pandas as pd
-import logging
-from opcua_logger import OPCUALogger
+from asyncua import ua
 from jsonl_to_csv import JSONLToCSVConverter
+from jsonl_reader import JsonlReader
 from generate_cert import CertificateGenerator
+from opcua_ipc import (FRAME_ERROR, FRAME_LIVE, FRAME_LOG, FRAME_METRICS, FRAME_STOP,
+                       encode_frame, read_frame)
 
-class QueueHandler(logging.Handler):
-    """Logging handler that puts messages into a queue."""
-    def __init__(self, log_queue):
-        super().__init__()
-        self.log_queue = log_queue
+# Logger script started as a child process
+LOGGER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opcua_logger.py')
 
-    def emit(self, record):
-        msg = self.format(record)
-        self.log_queue.put(msg)
+# Seconds to wait for a clean logger shutdown before terminating it
+LOGGER_STOP_TIMEOUT = 10.0
+
+# Log filter radio button -> pre-classified log level
+LOG_FILTER_LEVELS = {
+    "Info": 'INFO',
+    "Warning": 'WARNING',
+    "Error": 'ERROR',
+    "Other": 'OTHER',
+}
+
+# Records per page in the data file viewer
+VIEWER_PAGE_SIZE = 200
+
+# Characters used to draw sparklines in the Live Values tab
+SPARKLINE_CHARS = "▁▂▃▄▅▆▇█"
 
 class OPCUALoggerGUI:
     def __init__(self, root):
@@ -38,6 +53,14 @@ class OPCUALoggerGUI:
         # Logger process
         self.logger_process = None
         self.log_queue = queue.Queue()
+        self.live_queue = queue.Queue()
+        self.logger_metrics: Dict[str, Any] = {}
+        
+        # Log view limits (bounded history, capped visible window)
+        gui_config = self.config.get('gui') or {}
+        self.log_buffer_size = gui_config.get('log_buffer_size', 10000)
+        self.log_visible_lines = gui_config.get('log_visible_lines', 2000)
+        self.live_refresh_ms = gui_config.get('live_refresh_ms', 500)
         
         # Create main frames
         self.create_frames()
@@ -45,9 +68,11 @@ class OPCUALoggerGUI:
         self.create_tags_section()
         self.create_actions_section()
         self.create_log_section()
+        self.create_live_values_section()
         
         # Start log monitor
         self.root.after(100, self.monitor_log_queue)
+        self.root.after(self.live_refresh_ms, self.refresh_live_values)
         
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML file."""
@@ -71,6 +96,11 @@ class OPCUALoggerGUI:
             'flush_interval_seconds': 10.0,
             'flush_max_pending': 100
             },
+            'gui': {
+                'log_buffer_size': 10000,
+                'log_visible_lines': 2000,
+                'live_refresh_ms': 500
+            },
             'server': {
                 'url': 'opc.tcp://localhost:4840',
                 'certificate_path': '',
@@ -118,6 +148,10 @@ class OPCUALoggerGUI:
         # Log tab
         self.log_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.log_frame, text="Logs")
+        
+        # Live values tab
+        self.live_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.live_frame, text="Live Values")
     
     def create_config_section(self):
         """Create configuration section."""
@@ -200,7 +234,7 @@ class OPCUALoggerGUI:
         tags_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # Create Treeview for tags
-        columns = ('Name', 'Node ID')
+        columns = ('Name', 'Node ID / Browse Path')
         self.tags_tree = ttk.Treeview(tags_frame, columns=columns, show='headings', height=15)
         
         for col in columns:
@@ -231,6 +265,33 @@ class OPCUALoggerGUI:
         ttk.Button(button_frame, text="Import CSV", command=self.import_tags_csv).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Export CSV", command=self.export_tags_csv).pack(side=tk.LEFT, padx=5)
         
+        # Server catalog (browsed address space, cached on disk)
+        catalog_frame = ttk.LabelFrame(self.tags_frame, text="Server Catalog", padding=10)
+        catalog_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        search_frame = ttk.Frame(catalog_frame)
+        search_frame.pack(fill=tk.X)
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT, padx=(0, 5))
+        self.catalog_search_var = tk.StringVar()
+        self.catalog_search_var.trace_add('write', lambda *_: self.search_catalog())
+        ttk.Entry(search_frame, textvariable=self.catalog_search_var, width=40).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(search_frame, text="Load Catalog", command=self.load_catalog).pack(side=tk.LEFT, padx=5)
+        ttk.Button(search_frame, text="Refresh Catalog", command=lambda: self.load_catalog(refresh=True)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(search_frame, text="Add Selected", command=self.add_catalog_tags).pack(side=tk.LEFT, padx=5)
+        
+        self.catalog_status_var = tk.StringVar(value="No catalog loaded")
+        ttk.Label(catalog_frame, textvariable=self.catalog_status_var).pack(anchor=tk.W, pady=2)
+        
+        columns = ('Browse Path', 'Node ID', 'Data Type')
+        self.catalog_tree = ttk.Treeview(catalog_frame, columns=columns, show='headings', height=8)
+        for col in columns:
+            self.catalog_tree.heading(col, text=col)
+            self.catalog_tree.column(col, width=250)
+        self.catalog_tree.pack(fill=tk.BOTH, expand=True)
+        
+        self.catalog = None
+        self.catalog_result = queue.Queue()
+        
         # Load existing tags
         self.load_tags()
     
@@ -281,9 +342,34 @@ class OPCUALoggerGUI:
         ttk.Entry(csv_frame, textvariable=self.csv_file_var, width=25).pack(side=tk.LEFT, fill=tk.X, expand=True)
         ttk.Button(csv_frame, text="Browse", command=self.browse_csv_file).pack(side=tk.RIGHT, padx=(5, 0))
         
-        ttk.Button(conversion_frame, text="Convert JSONL to CSV", command=self.convert_json_to_csv).grid(row=2, column=0, columnspan=2, pady=10)
+        convert_buttons = ttk.Frame(conversion_frame)
+        convert_buttons.grid(row=2, column=0, columnspan=2, pady=10)
+        ttk.Button(convert_buttons, text="Convert JSONL to CSV", command=self.convert_json_to_csv).pack(side=tk.LEFT, padx=5)
+        ttk.Button(convert_buttons, text="Inspect File", command=self.inspect_json_file).pack(side=tk.LEFT, padx=5)
+        
+        # Conversion job queue
+        columns = ('Input', 'Output', 'Status')
+        self.conversion_tree = ttk.Treeview(conversion_frame, columns=columns, show='headings', height=4)
+        for col in columns:
+            self.conversion_tree.heading(col, text=col)
+            self.conversion_tree.column(col, width=200)
+        self.conversion_tree.grid(row=3, column=0, columnspan=2, sticky=tk.W+tk.E, pady=2)
+        
+        self.conversion_progress = ttk.Progressbar(conversion_frame, mode='determinate', maximum=100)
+        self.conversion_progress.grid(row=4, column=0, columnspan=2, sticky=tk.W+tk.E, pady=2)
+        
+        ttk.Button(conversion_frame, text="Cancel Conversion", command=self.cancel_conversion).grid(row=5, column=0, columnspan=2, pady=5)
         
         conversion_frame.columnconfigure(1, weight=1)
+        
+        # Conversions run one at a time on a background worker thread
+        self.conversion_jobs = {}
+        self.conversion_job_counter = 0
+        self.conversion_queue = queue.Queue()
+        self.conversion_events = queue.Queue()
+        self.conversion_thread = threading.Thread(target=self.conversion_worker, daemon=True)
+        self.conversion_thread.start()
+        self.root.after(100, self.monitor_conversion_events)
     
     def create_log_section(self):
         """Create log section."""
@@ -311,8 +397,12 @@ class OPCUALoggerGUI:
             ttk.Radiobutton(filter_frame, text=filter_type, variable=self.log_filter_var, 
                            value=filter_type, command=self.filter_logs).pack(side=tk.LEFT, padx=2)
         
-        # Store all logs for filtering
-        self.all_logs = []
+        # Store recent logs for filtering: a bounded ring buffer plus a
+        # per-level index so filtering never re-classifies message text
+        self.log_seq = 0
+        self.all_logs = deque(maxlen=self.log_buffer_size)
+        self.log_index = {level: deque(maxlen=self.log_buffer_size)
+                          for level in LOG_FILTER_LEVELS.values()}
         
         # Log display
         log_frame = ttk.LabelFrame(self.log_frame, text="Logger Output", padding=10)
@@ -321,6 +411,42 @@ class OPCUALoggerGUI:
         self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, height=20)
         self.log_text.pack(fill=tk.BOTH, expand=True)
     
+    def create_live_values_section(self):
+        """Create live tag values section."""
+        control_frame = ttk.Frame(self.live_frame)
+        control_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.show_sparklines_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(control_frame, text="Show sparklines", variable=self.show_sparklines_var,
+                        command=self.reset_live_values).pack(side=tk.LEFT, padx=5)
+        
+        self.metrics_var = tk.StringVar(value="Logger not running")
+        ttk.Label(control_frame, textvariable=self.metrics_var).pack(side=tk.RIGHT, padx=5)
+        
+        live_frame = ttk.LabelFrame(self.live_frame, text="Current Tag Values", padding=10)
+        live_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        columns = ('Value', 'Timestamp', 'Status', 'Rate (/s)', 'Trend')
+        self.live_tree = ttk.Treeview(live_frame, columns=columns, show='tree headings', height=20)
+        self.live_tree.heading('#0', text='Tag')
+        self.live_tree.column('#0', width=250)
+        for col in columns:
+            self.live_tree.heading(col, text=col)
+            self.live_tree.column(col, width=150)
+        self.live_tree.column('Value', width=300)
+        
+        live_scroll_y = ttk.Scrollbar(live_frame, orient=tk.VERTICAL, command=self.live_tree.yview)
+        self.live_tree.configure(yscrollcommand=live_scroll_y.set)
+        
+        self.live_tree.grid(row=0, column=0, sticky=tk.NSEW)
+        live_scroll_y.grid(row=0, column=1, sticky=tk.NS)
+        live_frame.grid_columnconfigure(0, weight=1)
+        live_frame.grid_rowconfigure(0, weight=1)
+        
+        # Latest row per tag as streamed from the logger process
+        self.live_rows: Dict[str, Dict[str, Any]] = {}
+        self.load_live_tags()
+    
     def browse_certificate(self):
         """Browse for certificate file."""
         filename = filedialog.askopenfilename(
@@ -388,15 +514,27 @@ class OPCUALoggerGUI:
         
         # Add tags from config
         for tag in self.config.get('tags', []):
-            self.tags_tree.insert('', tk.END, values=(tag['name'], tag['node_id']))
+            self.tags_tree.insert('', tk.END, values=(tag['name'], tag.get('browse_path') or tag['node_id']))
+        
+        if hasattr(self, 'live_tree'):
+            self.load_live_tags()
+    
+    @staticmethod
+    def _address_key(address: str) -> str:
+        """Tell a NodeId ("ns=2;s=Speed") from a browse path ("Objects/Line1/Speed", "0:Objects/2:A=B")."""
+        try:
+            ua.NodeId.from_string(address)
+        except (ua.UaStringParsingError, ValueError):
+            return 'browse_path'
+        return 'node_id'
     
     def add_tag(self):
         """Add a new tag."""
         dialog = TagDialog(self.root, "Add Tag")
         if dialog.result:
-            name, node_id = dialog.result
-            self.config['tags'].append({'name': name, 'node_id': node_id})
-            self.tags_tree.insert('', tk.END, values=(name, node_id))
+            name, address = dialog.result
+            self.config['tags'].append({'name': name, self._address_key(address): address})
+            self.tags_tree.insert('', tk.END, values=(name, address))
             self.save_config()
     
     def edit_tag(self):
@@ -411,14 +549,16 @@ class OPCUALoggerGUI:
         dialog = TagDialog(self.root, "Edit Tag", values[0], values[1])
         
         if dialog.result:
-            name, node_id = dialog.result
+            name, address = dialog.result
             # Update treeview
-            self.tags_tree.item(item, values=(name, node_id))
+            self.tags_tree.item(item, values=(name, address))
             # Update config
             for tag in self.config['tags']:
                 if tag['name'] == values[0]:
                     tag['name'] = name
-                    tag['node_id'] = node_id
+                    tag.pop('node_id', None)
+                    tag.pop('browse_path', None)
+                    tag[self._address_key(address)] = address
                     break
             self.save_config()
     
@@ -438,6 +578,82 @@ class OPCUALoggerGUI:
             self.config['tags'] = [tag for tag in self.config['tags'] if tag['name'] != values[0]]
             self.save_config()
     
+    def load_catalog(self, refresh: bool = False):
+        """Load the server catalog (from cache when valid) on a background thread."""
+        self.catalog_status_var.set("Browsing server..." if refresh else "Loading catalog...")
+        
+        def worker():
+            try:
+                import asyncio
+                from opcua_browser import load_catalog_for_config
+                self.catalog_result.put(asyncio.run(load_catalog_for_config(self.config_file, refresh)))
+            except Exception as e:
+                self.catalog_result.put(e)
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(100, self.check_catalog_result)
+    
+    def check_catalog_result(self):
+        """Show the catalog once the background load has finished."""
+        try:
+            result = self.catalog_result.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self.check_catalog_result)
+            return
+        
+        if isinstance(result, Exception):
+            self.catalog_status_var.set("Catalog not loaded")
+            messagebox.showerror("Error", f"Error loading server catalog: {result}")
+            return
+        
+        self.catalog = result
+        self.search_catalog()
+    
+    def search_catalog(self):
+        """Show catalog entries matching the search text."""
+        if self.catalog is None:
+            return
+        
+        limit = 500
+        results = self.catalog.search(self.catalog_search_var.get(), limit)
+        self.catalog_tree.delete(*self.catalog_tree.get_children())
+        for node in results:
+            self.catalog_tree.insert('', tk.END, values=(node['browse_path'], node['node_id'], node['data_type']))
+        
+        shown = f"first {limit}" if len(results) >= limit else str(len(results))
+        self.catalog_status_var.set(f"{len(self.catalog)} variables in catalog, showing {shown}")
+    
+    def add_catalog_tags(self):
+        """Add the selected catalog entries as tags."""
+        selection = self.catalog_tree.selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select catalog entries to add")
+            return
+        
+        existing_names = {tag['name'] for tag in self.config['tags']}
+        existing_nodes = {tag.get('node_id') for tag in self.config['tags']}
+        added = 0
+        for item in selection:
+            browse_path, node_id, _ = self.catalog_tree.item(item, 'values')
+            if node_id in existing_nodes:
+                continue
+            
+            # Tag name from the browse path without the Objects root and namespace prefixes
+            segments = [segment.split(':', 1)[-1] for segment in browse_path.split('/')[1:]]
+            base_name = '_'.join(segments).replace('.', '_').replace(' ', '_') or node_id
+            name, suffix = base_name, 2
+            while name in existing_names:
+                name, suffix = f"{base_name}_{suffix}", suffix + 1
+            
+            self.config['tags'].append({'name': name, 'node_id': node_id})
+            existing_names.add(name)
+            existing_nodes.add(node_id)
+            added += 1
+        
+        self.load_tags()
+        self.save_config()
+        messagebox.showinfo("Success", f"Added {added} tags")
+    
     def import_tags_csv(self):
         """Import tags from CSV file."""
         filename = filedialog.askopenfilename(
@@ -448,23 +664,31 @@ class OPCUALoggerGUI:
         if filename:
             try:
                 df = pd.read_csv(filename)
-                if 'name' not in df.columns or 'node_id' not in df.columns:
-                    messagebox.showerror("Error", "CSV must have 'name' and 'node_id' columns")
+                if 'name' not in df.columns or ('node_id' not in df.columns and 'browse_path' not in df.columns):
+                    messagebox.showerror("Error", "CSV must have 'name' and 'node_id' or 'browse_path' columns")
                     return
                 
                 # Clear existing tags
                 self.config['tags'] = []
                 
-                # Add tags from CSV
+                # Add tags from CSV (a browse path takes precedence over a NodeId)
+                skipped = 0
                 for _, row in df.iterrows():
-                    self.config['tags'].append({
-                        'name': row['name'],
-                        'node_id': row['node_id']
-                    })
+                    browse_path = row.get('browse_path')
+                    node_id = row.get('node_id')
+                    if isinstance(browse_path, str) and browse_path.strip():
+                        self.config['tags'].append({'name': row['name'], 'browse_path': browse_path.strip()})
+                    elif isinstance(node_id, str) and node_id.strip():
+                        self.config['tags'].append({'name': row['name'], 'node_id': node_id.strip()})
+                    else:
+                        skipped += 1
                 
                 self.load_tags()
                 self.save_config()
-                messagebox.showinfo("Success", f"Imported {len(df)} tags from CSV")
+                message = f"Imported {len(self.config['tags'])} tags from CSV"
+                if skipped:
+                    message += f" ({skipped} rows without node_id or browse_path skipped)"
+                messagebox.showinfo("Success", message)
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Error importing CSV: {e}")
@@ -529,7 +753,7 @@ class OPCUALoggerGUI:
             messagebox.showerror("Error", f"Error generating certificate: {e}")
     
     def convert_json_to_csv(self):
-        """Convert JSONL to CSV using the JSONLToCSVConverter class."""
+        """Queue a JSONL to CSV conversion on the background worker."""
         jsonl_path = self.json_file_var.get()
         csv_path = self.csv_file_var.get()
 
@@ -537,106 +761,161 @@ class OPCUALoggerGUI:
             messagebox.showwarning("Warning", "Please select both input JSONL file and output CSV file.")
             return
 
+        if not os.path.exists(jsonl_path):
+            messagebox.showerror("Error", f"File not found:\n{jsonl_path}")
+            return
+
+        self.conversion_job_counter += 1
+        job_id = str(self.conversion_job_counter)
+        self.conversion_jobs[job_id] = {
+            'jsonl_path': jsonl_path,
+            'csv_path': csv_path,
+            'cancel_event': threading.Event(),
+        }
+        self.conversion_tree.insert('', tk.END, iid=job_id, values=(jsonl_path, csv_path, 'Queued'))
+        self.conversion_queue.put(job_id)
+
+    def inspect_json_file(self):
+        """Open the selected JSONL file in the data file viewer."""
+        jsonl_path = self.json_file_var.get()
+        if not os.path.exists(jsonl_path):
+            messagebox.showerror("Error", f"File not found:\n{jsonl_path}")
+            return
+        DataFileViewer(self.root, jsonl_path)
+
+    def cancel_conversion(self):
+        """Cancel the selected conversion jobs, or all unfinished ones if none is selected."""
+        job_ids = self.conversion_tree.selection() or tuple(self.conversion_jobs)
+        for job_id in job_ids:
+            job = self.conversion_jobs.get(job_id)
+            if job:
+                job['cancel_event'].set()
+                self.conversion_tree.set(job_id, 'Status', 'Cancelling...')
+
+    def conversion_worker(self):
+        """Run queued conversions one after another (background thread)."""
+        while True:
+            job_id = self.conversion_queue.get()
+            job = self.conversion_jobs[job_id]
+            cancel_event = job['cancel_event']
+
+            if cancel_event.is_set():
+                self.conversion_events.put((job_id, 'cancelled', None))
+                continue
+
+            def report_progress(bytes_read, total_bytes):
+                percent = 100.0 * bytes_read / total_bytes if total_bytes else 100.0
+                self.conversion_events.put((job_id, 'progress', percent))
+
+            try:
+                self.conversion_events.put((job_id, 'progress', 0.0))
+                converter = JSONLToCSVConverter(self.config['logging']['timestamp_format'])
+                if not converter.load_jsonl(job['jsonl_path'], report_progress, cancel_event):
+                    status = 'cancelled' if cancel_event.is_set() else 'load_failed'
+                    self.conversion_events.put((job_id, status, None))
+                    continue
+
+                self.conversion_events.put((job_id, 'writing', None))
+                if not converter.convert_to_csv(job['csv_path'], format_type="old_format",
+                                                cancel_event=cancel_event):
+                    status = 'cancelled' if cancel_event.is_set() else 'write_failed'
+                    self.conversion_events.put((job_id, status, None))
+                    continue
+
+                if converter.events:
+                    events_path = os.path.splitext(job['csv_path'])[0] + "_events.csv"
+                    if not converter.convert_events_to_csv(events_path):
+                        self.conversion_events.put((job_id, 'write_failed', None))
+                        continue
+
+                self.conversion_events.put((job_id, 'done', converter.get_data_summary()))
+            except Exception as e:
+                self.conversion_events.put((job_id, 'error', str(e)))
+
+    def monitor_conversion_events(self):
+        """Apply conversion progress and results from the worker thread."""
         try:
-            if not os.path.exists(jsonl_path):
-                messagebox.showerror("Error", f"File not found:\n{jsonl_path}")
-                return
+            while True:
+                job_id, status, payload = self.conversion_events.get_nowait()
+                self.handle_conversion_event(job_id, status, payload)
+        except queue.Empty:
+            pass
 
-            # Use the JSONLToCSVConverter class
-            converter = JSONLToCSVConverter()
-            
-            # Load and convert data
-            if converter.load_jsonl(jsonl_path):
-                if converter.convert_to_csv(csv_path, format_type="old_format"):
-                    # Get summary for feedback
-                    summary = converter.get_data_summary()
-                    tag_count = len(summary)
-                    total_rows = sum(count for count in summary.values()) * 2  # value + timestamp rows
-                    
-                    success_msg = (
-                        f"Successfully converted\n"
-                        f"  {jsonl_path}\n"
-                        f"to\n"
-                        f"  {csv_path}\n"
-                        f"({tag_count} tags, {total_rows} rows)"
-                    )
-                    
-                    self.log_text.insert(tk.END,
-                        "[%s] %s\n" % (
-                            time.strftime('%Y-%m-%d %H:%M:%S'),
-                            success_msg.replace('\n', ' — ')
-                        )
-                    )
-                    self.log_text.see(tk.END)
-                    
-                    messagebox.showinfo("Conversion Finished", success_msg)
-                else:
-                    messagebox.showerror("Error", "Failed to convert data to CSV")
-            else:
-                messagebox.showerror("Error", "Failed to load JSONL file")
+        self.root.after(100, self.monitor_conversion_events)
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Conversion failed:\n{str(e)}")
-            self.log_text.insert(tk.END,
-                f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Error during conversion: {str(e)}\n")
-            self.log_text.see(tk.END)
+    def handle_conversion_event(self, job_id, status, payload):
+        """Update the job list, progress bar and log for one worker event."""
+        job = self.conversion_jobs.get(job_id)
+        if job is None:
+            return
+        jsonl_path, csv_path = job['jsonl_path'], job['csv_path']
+
+        if status == 'progress':
+            self.conversion_progress['value'] = payload
+            if not job['cancel_event'].is_set():
+                self.conversion_tree.set(job_id, 'Status', f"Loading {payload:.0f}%")
+            return
+        if status == 'writing':
+            self.conversion_tree.set(job_id, 'Status', 'Writing CSV...')
+            return
+
+        # Final states
+        del self.conversion_jobs[job_id]
+        self.conversion_progress['value'] = 0
+
+        if status == 'done':
+            tag_count = len(payload)
+            total_rows = sum(count for count in payload.values()) * 2  # value + timestamp rows
+
+            success_msg = (
+                f"Successfully converted\n"
+                f"  {jsonl_path}\n"
+                f"to\n"
+                f"  {csv_path}\n"
+                f"({tag_count} tags, {total_rows} rows)"
+            )
+            self.conversion_tree.set(job_id, 'Status', 'Done')
+            self.add_log_entry(success_msg.replace('\n', ' — '))
+            messagebox.showinfo("Conversion Finished", success_msg)
+        elif status == 'cancelled':
+            self.conversion_tree.set(job_id, 'Status', 'Cancelled')
+            self.add_log_entry(f"Conversion of {jsonl_path} cancelled")
+        elif status == 'load_failed':
+            self.conversion_tree.set(job_id, 'Status', 'Failed')
+            messagebox.showerror("Error", "Failed to load JSONL file")
+        elif status == 'write_failed':
+            self.conversion_tree.set(job_id, 'Status', 'Failed')
+            messagebox.showerror("Error", "Failed to convert data to CSV")
+        else:
+            self.conversion_tree.set(job_id, 'Status', 'Failed')
+            messagebox.showerror("Error", f"Conversion failed:\n{payload}")
+            self.add_log_entry(f"Error during conversion: {payload}")
 
     def start_logger(self):
-        """Start the OPC UA logger inside this process."""
+        """Start the OPC UA logger as a child process."""
         if not self.config.get('tags'):
             messagebox.showwarning("Warning", "No tags configured. Please add tags before starting the logger.")
             return
 
+        if self.logger_process and self.logger_process.poll() is None:
+            messagebox.showwarning("Warning", "Logger is already running.")
+            return
+
         try:
             # Save current configuration
             self.save_configuration()
 
-            # Start logger in a thread
-            import asyncio
-            from opcua_logger import OPCUALogger
-
-            def run_logger():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                # Create logger instance
-                logger = OPCUALogger(self.config_file)
-                self.opcua_logger_instance = logger  # Save reference to stop later
-
-                # Add QueueHandler
-                qhandler = QueueHandler(self.log_queue)
-                qhandler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-                logger.logger.addHandler(qhandler)
-                logger.logger.setLevel(logging.INFO)
-
-                try:
-                    loop.run_until_complete(logger.run())
-                except ValueError as e:
-                    # Configuration errors
-                    error_msg = f"Configuration error: {e}"
-                    if "Certificate" in str(e) or "certificate" in str(e):
-                        error_msg += "\n\nPlease check certificate paths in Configuration tab."
-                    if "security policy" in str(e):
-                        error_msg += "\n\nPlease select a valid security policy in Configuration tab."
-                    self.log_queue.put(error_msg)
-                except FileNotFoundError as e:
-                    # Certificate files not found
-                    error_msg = f"Certificate file error: {e}\n\nPlease generate certificates in Actions tab or update paths in Configuration tab."
-                    self.log_queue.put(error_msg)
-                except Exception as e:
-                    # Other errors
-                    error_str = str(e).lower()
-                    if any(keyword in error_str for keyword in ['security', 'certificate', 'policy', 'badsecuritychecksfailed']):
-                        error_msg = f"Security error: {e}\n\nPossible causes:\n1. Server doesn't support the selected security policy\n2. Certificate files are invalid or expired\n3. Username/password authentication failed"
-                        self.log_queue.put(error_msg)
-                    else:
-                        self.log_queue.put(f"Logger error: {e}")
-                finally:
-                    loop.close()
-
-            self.logger_thread = threading.Thread(target=run_logger, daemon=True)
-            self.logger_thread.start()
+            # Logs, metrics and live values come back as frames on the child's stdout
+            self.logger_process = subprocess.Popen(
+                [sys.executable, LOGGER_SCRIPT, '--config', os.path.abspath(self.config_file), '--ipc'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+            threading.Thread(target=self.read_logger_output, args=(self.logger_process,), daemon=True).start()
 
             # Update UI
+            self.live_rows = {}
+            self.load_live_tags()
             self.start_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.NORMAL)
             self.add_log_entry("Logger started...")
@@ -644,111 +923,261 @@ class OPCUALoggerGUI:
         except Exception as e:
             messagebox.showerror("Error", f"Error starting logger: {e}")
 
-
     def stop_logger(self):
-        """Stop the OPC UA logger cleanly."""
+        """Ask the logger process to stop cleanly."""
         try:
-            if hasattr(self, 'opcua_logger_instance'):
-                # Signal the async logger to stop
-                if hasattr(self.opcua_logger_instance, 'stop_event'):
-                    self.opcua_logger_instance.stop_event.set()
-                    self.add_log_entry("Logger stopping...")
-                else:
-                    self.add_log_entry("Stop event not found, cannot fully stop")
+            process = self.logger_process
+            if process and process.poll() is None:
+                self._send_stop_frame(process)
+                self.add_log_entry("Logger stopping...")
+                self.root.after(int(LOGGER_STOP_TIMEOUT * 1000), self._terminate_logger, process)
             else:
                 self.add_log_entry("Logger not running")
 
             # Update UI
-            self.start_button.config(state=tk.NORMAL)
             self.stop_button.config(state=tk.DISABLED)
-            self.log_text.see(tk.END)
 
         except Exception as e:
             messagebox.showerror("Error", f"Error stopping logger: {e}")
-    
-    def read_logger_output(self):
-        """Read logger output and add to queue."""
-        if self.logger_process:
-            for line in iter(self.logger_process.stdout.readline, ''):
-                if line:
-                    self.log_queue.put(line.strip())
-    
+
+    @staticmethod
+    def _send_stop_frame(process):
+        """Send the stop frame and close the logger's stdin."""
+        try:
+            process.stdin.write(encode_frame(FRAME_STOP, None))
+            process.stdin.close()
+        except OSError:
+            # Pipe already closed; the process is exiting anyway
+            pass
+
+    def _terminate_logger(self, process):
+        """Terminate a logger process that did not stop in time."""
+        if process.poll() is None:
+            process.terminate()
+            self.add_log_entry("Logger did not stop in time and was terminated")
+
+    def on_close(self):
+        """Stop the logger process and close the window."""
+        process = self.logger_process
+        if process and process.poll() is None:
+            self._send_stop_frame(process)
+            try:
+                process.wait(timeout=LOGGER_STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                process.terminate()
+        self.root.destroy()
+
+    @staticmethod
+    def format_logger_error(error_type: str, message: str) -> str:
+        """Build a user facing message for a fatal logger error."""
+        if error_type == 'ValueError':
+            # Configuration errors
+            error_msg = f"Configuration error: {message}"
+            if "Certificate" in message or "certificate" in message:
+                error_msg += "\n\nPlease check certificate paths in Configuration tab."
+            if "security policy" in message:
+                error_msg += "\n\nPlease select a valid security policy in Configuration tab."
+            return error_msg
+        if error_type == 'FileNotFoundError':
+            # Certificate files not found
+            return f"Certificate file error: {message}\n\nPlease generate certificates in Actions tab or update paths in Configuration tab."
+        # Other errors
+        error_str = message.lower()
+        if any(keyword in error_str for keyword in ['security', 'certificate', 'policy', 'badsecuritychecksfailed']):
+            return f"Security error: {message}\n\nPossible causes:\n1. Server doesn't support the selected security policy\n2. Certificate files are invalid or expired\n3. Username/password authentication failed"
+        return f"Logger error: {message}"
+
+    def read_logger_output(self, process):
+        """Read frames from the logger process and route them to the UI queues (thread)."""
+        while True:
+            try:
+                frame = read_frame(process.stdout)
+            except (OSError, ValueError) as e:
+                self.log_queue.put(f"Error reading logger output: {e}")
+                break
+            if frame is None:
+                break
+
+            frame_type, payload = frame
+            if frame_type == FRAME_LOG:
+                self.log_queue.put(payload)
+            elif frame_type == FRAME_LIVE:
+                self.live_queue.put(payload)
+            elif frame_type == FRAME_METRICS:
+                self.logger_metrics = payload
+            elif frame_type == FRAME_ERROR:
+                self.log_queue.put(self.format_logger_error(payload['type'], payload['message']))
+
+        self.log_queue.put(f"Logger process exited (code {process.wait()})")
+
     def monitor_log_queue(self):
-        """Monitor log queue and update display."""
+        """Monitor log queue and update display in one batch per tick."""
+        messages = []
         try:
-            while True:
-                line = self.log_queue.get_nowait()
-                self.add_log_entry(line)
+            # Bounded drain: never do more than one buffer's worth per tick
+            while len(messages) < self.log_buffer_size:
+                messages.append(self.log_queue.get_nowait())
         except queue.Empty:
             pass
         
+        if messages:
+            self.add_log_entries(messages)
+        
+        # Re-enable start once the logger process is gone
+        if self.logger_process and self.logger_process.poll() is not None:
+            self.logger_process = None
+            self.logger_metrics = {}
+            self.metrics_var.set("Logger not running")
+            self.start_button.config(state=tk.NORMAL)
+            self.stop_button.config(state=tk.DISABLED)
+        
         # Schedule next check
         self.root.after(100, self.monitor_log_queue)
     
+    def load_live_tags(self):
+        """Show one (empty) live row per configured tag."""
+        self.live_tree.delete(*self.live_tree.get_children())
+        # Forget removed tags, so a redraw doesn't bring their rows back
+        names = {tag['name'] for tag in self.config.get('tags', [])}
+        self.live_rows = {name: row for name, row in self.live_rows.items() if name in names}
+        for tag in self.config.get('tags', []):
+            if not self.live_tree.exists(tag['name']):
+                self.live_tree.insert('', tk.END, iid=tag['name'], text=tag['name'],
+                                      values=('', '', '', '', ''))
+    
+    def reset_live_values(self):
+        """Redraw every live row from the latest values."""
+        self.apply_live_rows(self.live_rows)
+    
+    def refresh_live_values(self):
+        """Apply the rows that changed since the last refresh."""
+        changed: Dict[str, Dict[str, Any]] = {}
+        try:
+            while True:
+                changed.update(self.live_queue.get_nowait())
+        except queue.Empty:
+            pass
+        
+        if changed:
+            self.live_rows.update(changed)
+            self.apply_live_rows(changed)
+        
+        metrics = self.logger_metrics
+        if metrics:
+            self.metrics_var.set(f"Packets/sec: {metrics.get('packets_per_sec', 0)}  "
+                                 f"Pending: {metrics.get('pending', 0)}")
+        
+        self.root.after(self.live_refresh_ms, self.refresh_live_values)
+    
+    def apply_live_rows(self, rows: Dict[str, Dict[str, Any]]):
+        """Update only the given tag rows in the live values table."""
+        show_sparklines = self.show_sparklines_var.get()
+        for tag_name, row in rows.items():
+            values = (
+                self._format_live_value(row['value']),
+                row['timestamp'],
+                row['status'],
+                f"{row['rate']:.1f}",
+                self._sparkline(row['history']) if show_sparklines else '',
+            )
+            if self.live_tree.exists(tag_name):
+                self.live_tree.item(tag_name, values=values)
+            else:
+                self.live_tree.insert('', tk.END, iid=tag_name, text=tag_name, values=values)
+    
+    @staticmethod
+    def _format_live_value(value: Any, max_length: int = 80) -> str:
+        """Format a tag value for a table cell."""
+        text = str(value)
+        if len(text) > max_length:
+            text = text[:max_length - 3] + '...'
+        return text
+    
+    @staticmethod
+    def _sparkline(history) -> str:
+        """Draw recent numeric values as a unicode sparkline."""
+        if len(history) < 2:
+            return ''
+        low, high = min(history), max(history)
+        span = (high - low) or 1
+        scale = len(SPARKLINE_CHARS) - 1
+        return ''.join(SPARKLINE_CHARS[int((v - low) / span * scale)] for v in history)
+    
     def clear_logs(self):
         """Clear log display and stored logs."""
         self.log_text.delete(1.0, tk.END)
-        self.all_logs = []
+        self.all_logs.clear()
+        for entries in self.log_index.values():
+            entries.clear()
     
     def filter_logs(self):
         """Filter logs based on selected filter."""
         filter_type = self.log_filter_var.get()
+        source = self.all_logs if filter_type == "All" else self.log_index[LOG_FILTER_LEVELS[filter_type]]
         
-        # Clear display
-        self.log_text.delete(1.0, tk.END)
+        # Per-level indexes may hold entries already evicted from the main buffer
+        oldest_seq = self.all_logs[0][0] if self.all_logs else self.log_seq + 1
         
-        # Re-add filtered logs
-        for log_entry in self.all_logs:
-            should_show = False
-            
-            if filter_type == "All":
-                should_show = True
-            elif filter_type == "Info" and log_entry['level'] in ['INFO']:
-                should_show = True
-            elif filter_type == "Warning" and log_entry['level'] in ['WARNING']:
-                should_show = True
-            elif filter_type == "Error" and log_entry['level'] in ['ERROR']:
-                should_show = True
-            elif filter_type == "Other" and log_entry['level'] not in ['INFO', 'WARNING', 'ERROR']:
-                should_show = True
-            
-            if should_show:
-                self.log_text.insert(tk.END, log_entry['text'])
+        # Only the newest entries fit in the visible window
+        texts = []
+        for seq, _, text in islice(reversed(source), self.log_visible_lines):
+            if seq < oldest_seq:
+                break
+            texts.append(text)
+        texts.reverse()
         
-        self.log_text.see(tk.END)
+        self.log_text.delete(1.0, tk.END)
+        self._append_log_text(texts)
+    
+    @staticmethod
+    def _classify_log_level(message: str) -> str:
+        """Classify a log message into INFO, WARNING, ERROR or OTHER."""
+        lowered = message.lower()
+        if 'error' in lowered or 'exception' in lowered or 'failed' in lowered:
+            return 'ERROR'
+        elif 'warning' in lowered or 'warn' in lowered:
+            return 'WARNING'
+        elif 'info' in lowered:
+            return 'INFO'
+        return 'OTHER'
+    
+    def add_log_entries(self, messages: List[str]):
+        """Store a batch of log messages and show the matching ones with a single insert."""
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        current_filter = self.log_filter_var.get()
+        wanted_level = LOG_FILTER_LEVELS.get(current_filter)
+        
+        # Messages older than the ring buffer can hold would be evicted immediately
+        texts = []
+        for message in messages[-self.log_buffer_size:]:
+            level = self._classify_log_level(message)
+            self.log_seq += 1
+            log_entry = (self.log_seq, level, f"[{timestamp}] {message}\n")
+            self.all_logs.append(log_entry)
+            self.log_index[level].append(log_entry)
+            if current_filter == "All" or level == wanted_level:
+                texts.append(log_entry[2])
+        
+        self._append_log_text(texts[-self.log_visible_lines:])
     
     def add_log_entry(self, message, level="INFO"):
         """Add a log entry with level classification."""
-        import time
-        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        self.add_log_entries([message])
+    
+    def _append_log_text(self, texts: List[str]):
+        """Insert log lines at the end and trim the oldest beyond the visible cap."""
+        if not texts:
+            return
         
-        # Classify log level
-        if 'error' in message.lower() or 'exception' in message.lower() or 'failed' in message.lower():
-            level = 'ERROR'
-        elif 'warning' in message.lower() or 'warn' in message.lower():
-            level = 'WARNING'
-        elif 'info' in message.lower():
-            level = 'INFO'
-        else:
-            level = 'OTHER'
+        self.log_text.insert(tk.END, ''.join(texts))
         
-        # Store log entry
-        log_entry = {
-            'timestamp': timestamp,
-            'level': level,
-            'text': f"[{timestamp}] {message}\n"
-        }
-        self.all_logs.append(log_entry)
+        # The text always ends with a newline, so the last line is empty
+        line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+        excess = line_count - self.log_visible_lines
+        if excess > 0:
+            self.log_text.delete('1.0', f'{excess + 1}.0')
         
-        # Show if matches current filter
-        current_filter = self.log_filter_var.get()
-        if current_filter == "All" or \
-           (current_filter == "Info" and level == 'INFO') or \
-           (current_filter == "Warning" and level == 'WARNING') or \
-           (current_filter == "Error" and level == 'ERROR') or \
-           (current_filter == "Other" and level == 'OTHER'):
-            self.log_text.insert(tk.END, log_entry['text'])
-            self.log_text.see(tk.END)
+        self.log_text.see(tk.END)
 
 
 class TagDialog:
@@ -775,7 +1204,7 @@ class TagDialog:
         self.name_var = tk.StringVar(value=name)
         ttk.Entry(frame, textvariable=self.name_var, width=40).grid(row=0, column=1, sticky=tk.W+tk.E, pady=5)
         
-        ttk.Label(frame, text="Node ID:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        ttk.Label(frame, text="Node ID / Path:").grid(row=1, column=0, sticky=tk.W, pady=5)
         self.node_id_var = tk.StringVar(value=node_id)
         ttk.Entry(frame, textvariable=self.node_id_var, width=40).grid(row=1, column=1, sticky=tk.W+tk.E, pady=5)
         
@@ -799,7 +1228,7 @@ class TagDialog:
         node_id = self.node_id_var.get().strip()
         
         if not name or not node_id:
-            messagebox.showwarning("Warning", "Please enter both name and node ID")
+            messagebox.showwarning("Warning", "Please enter both name and node ID or browse path")
             return
         
         self.result = (name, node_id)
@@ -810,9 +1239,139 @@ class TagDialog:
         self.dialog.destroy()
 
 
+class DataFileViewer:
+    """Pages through a JSONL data file using its line index, without reading the whole file."""
+
+    def __init__(self, parent, path):
+        self.path = path
+        self.reader: Optional[JsonlReader] = None
+        self.open_result = queue.Queue()
+        self.shown = []  # line numbers of the rows on the current page
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"Data File - {os.path.basename(path)}")
+        self.window.geometry("900x550")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        controls = ttk.Frame(self.window, padding=5)
+        controls.pack(fill=tk.X)
+        ttk.Label(controls, text="Tag:").pack(side=tk.LEFT)
+        self.tag_var = tk.StringVar()
+        ttk.Entry(controls, textvariable=self.tag_var, width=20).pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Label(controls, text="Time:").pack(side=tk.LEFT)
+        self.time_var = tk.StringVar()
+        ttk.Entry(controls, textvariable=self.time_var, width=22).pack(side=tk.LEFT, padx=2)
+        ttk.Button(controls, text="Go", command=self.go_to_time).pack(side=tk.LEFT, padx=(0, 10))
+        for text, command in (("First", self.first_page), ("Previous", self.previous_page),
+                              ("Next", self.next_page), ("Last", self.last_page), ("Refresh", self.refresh)):
+            ttk.Button(controls, text=text, command=command).pack(side=tk.LEFT, padx=2)
+
+        columns = ('Line', 'Timestamp', 'Tag / Event', 'Value')
+        tree_frame = ttk.Frame(self.window)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5)
+        self.tree = ttk.Treeview(tree_frame, columns=columns, show='headings')
+        for col, width in zip(columns, (80, 180, 180, 420)):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=width)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.status_var = tk.StringVar(value="Indexing file...")
+        ttk.Label(self.window, textvariable=self.status_var, padding=5).pack(fill=tk.X)
+
+        # Indexing a large file for the first time takes a while; later opens only index new lines
+        threading.Thread(target=self.open_reader, daemon=True).start()
+        self.window.after(100, self.check_open_result)
+
+    def open_reader(self):
+        try:
+            self.open_result.put(JsonlReader(self.path))
+        except Exception as e:
+            self.open_result.put(e)
+
+    def check_open_result(self):
+        try:
+            result = self.open_result.get_nowait()
+        except queue.Empty:
+            self.window.after(100, self.check_open_result)
+            return
+        if isinstance(result, Exception):
+            self.status_var.set(f"Failed to open file: {result}")
+            return
+        if not self.window.winfo_exists():
+            result.close()
+            return
+        self.reader = result
+        self.last_page()
+
+    def _tag(self) -> Optional[str]:
+        return self.tag_var.get().strip() or None
+
+    def show(self, rows):
+        """Show (line number, record) rows."""
+        self.tree.delete(*self.tree.get_children())
+        for index, record in rows:
+            if 'tag' in record:
+                name, value = record['tag'], record.get('value')
+            elif 'event' in record:
+                name, value = f"event {record['event']}", record.get('fields')
+            elif 'schema' in record:
+                name, value = f"schema {record['schema']}", record.get('fields')
+            else:
+                name, value = "", record
+            self.tree.insert('', tk.END, values=(index + 1, record.get('timestamp', ''), name,
+                                                 OPCUALoggerGUI._format_live_value(value, 200)))
+        self.shown = [index for index, _ in rows]
+        if self.shown:
+            self.status_var.set(f"Lines {self.shown[0] + 1:,}-{self.shown[-1] + 1:,} of {len(self.reader):,}")
+        else:
+            self.status_var.set(f"No matching records ({len(self.reader):,} lines)")
+
+    def show_from(self, start: int):
+        if self.reader is not None:
+            self.show(list(islice(self.reader.records(start, tag=self._tag()), VIEWER_PAGE_SIZE)))
+
+    def first_page(self):
+        self.show_from(0)
+
+    def next_page(self):
+        if self.shown:
+            self.show_from(self.shown[-1] + 1)
+
+    def previous_page(self):
+        if self.reader is not None and self.shown:
+            rows = self.reader.tail(VIEWER_PAGE_SIZE, self._tag(), before=self.shown[0])
+            if rows:
+                self.show(rows)
+
+    def last_page(self):
+        if self.reader is not None:
+            self.show(self.reader.tail(VIEWER_PAGE_SIZE, self._tag()))
+
+    def go_to_time(self):
+        """Show the records from the given timestamp on (binary search over the index)."""
+        timestamp = self.time_var.get().strip()
+        if self.reader is not None and timestamp:
+            self.show_from(self.reader.find_time(timestamp))
+
+    def refresh(self):
+        """Index lines appended by a running logger and show the end of the file."""
+        if self.reader is not None:
+            self.reader.refresh()
+            self.last_page()
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+        self.window.destroy()
+
+
 def main():
     root = tk.Tk()
     app = OPCUALoggerGUI(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
 
 
@@ -0,0 +1,183 @@
+"""
+Partitioned JSONL archives: one file per tag group (or tag) and time window.
+
+A `partitioned` output writes under a root directory instead of one global
+data file, e.g. with keys [group, day, hour]:
+
+    archive/_partitions.json
+    archive/Line1/2026-10-19/13.jsonl
+    archive/Line1/2026-10-19/14.jsonl
+    archive/Utilities/2026-10-19/13.jsonl
+
+Partition keys, in path order:
+    group   the tag's `group` from the tag config ("default" if unset; events go to "events")
+    tag     the tag name (events: the event source name)
+    day     UTC date of the sample, YYYY-MM-DD
+    hour    UTC hour of the sample, HH (YYYY-MM-DDTHH without a day key)
+
+The last key names the file, the others name directories. Every partition
+is an ordinary JSONL data file (tag ids, deltas and event schemas restart
+per file). The manifest _partitions.json lists each partition with its
+time window and the tags and event sources it holds, so readers
+(PartitionIndex) open only the partitions of the tags and times asked for.
+"""
+
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+MANIFEST_NAME = "_partitions.json"
+BLOB_DIR_NAME = "_blobs"
+PARTITION_KEYS = ("group", "tag", "day", "hour")
+DEFAULT_GROUP = "default"
+EVENTS_GROUP = "events"
+
+_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9._-]')
+
+
+def record_time(timestamp: Any, timestamp_format: str = "unix") -> float:
+    """
+    Get the unix time of a record timestamp.
+
+    Args:
+        timestamp: UNIX seconds (number or string) or a formatted local time
+        timestamp_format: strftime format of formatted timestamps that aren't ISO 8601
+
+    Returns:
+        float: Seconds since the epoch
+    """
+    try:
+        return float(timestamp)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except ValueError:
+        return datetime.strptime(timestamp, timestamp_format).timestamp()
+
+
+def _path_part(name: str) -> str:
+    """Make a tag or group name safe to use as a file or directory name."""
+    return _UNSAFE_CHARS.sub('_', name) or '_'
+
+
+class PartitionLayout:
+    """Maps records to partition paths."""
+
+    def __init__(self, keys: Optional[List[str]] = None):
+        """
+        Args:
+            keys: Partition keys in path order (default: group, day, hour)
+        """
+        self.keys = list(keys or ["group", "day", "hour"])
+        unknown = [key for key in self.keys if key not in PARTITION_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown partition keys: {unknown} (use {', '.join(PARTITION_KEYS)})")
+        # Length of a time window in seconds, None if files aren't split by time
+        self.window = 3600 if "hour" in self.keys else 86400 if "day" in self.keys else None
+
+    def window_start(self, ts: float) -> Optional[int]:
+        if self.window is None:
+            return None
+        return int(ts // self.window) * self.window
+
+    def path(self, group: str, name: str, window_start: Optional[int]) -> str:
+        """
+        Get the relative path of a partition.
+
+        Args:
+            group: Tag group
+            name: Tag or event source name
+            window_start: Start of the time window (see window_start())
+
+        Returns:
+            str: Path relative to the archive root, with '/' separators
+        """
+        parts = []
+        for key in self.keys:
+            if key == "group":
+                parts.append(_path_part(group))
+            elif key == "tag":
+                parts.append(_path_part(name))
+            elif key == "day":
+                parts.append(time.strftime("%Y-%m-%d", time.gmtime(window_start)))
+            else:
+                hour_format = "%H" if "day" in self.keys else "%Y-%m-%dT%H"
+                parts.append(time.strftime(hour_format, time.gmtime(window_start)))
+        return '/'.join(parts) + '.jsonl'
+
+
+def tag_groups(config: Dict[str, Any]) -> Dict[str, str]:
+    """Get the configured `group` of every tag (tags without one are in DEFAULT_GROUP)."""
+    return {tag['name']: str(tag.get('group', DEFAULT_GROUP)) for tag in config.get('tags') or []}
+
+
+def load_manifest(root: str) -> Dict[str, Any]:
+    """Read the manifest of an archive (empty if there is none)."""
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+    manifest.setdefault("partitions", {})
+    return manifest
+
+
+def save_manifest(root: str, manifest: Dict[str, Any]) -> None:
+    """Write the manifest of an archive atomically."""
+    path = os.path.join(root, MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_partitioned(path: str) -> bool:
+    """Check whether a path is the root of a partitioned archive."""
+    return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+
+class PartitionIndex:
+    """Selects the partitions of an archive by tag and time range."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.partitions: Dict[str, Dict[str, Any]] = load_manifest(root)["partitions"]
+
+    def tags(self) -> List[str]:
+        """Get all tags in the archive."""
+        return sorted({tag for entry in self.partitions.values() for tag in entry.get("tags", [])})
+
+    def select(self, tags: Optional[List[str]] = None, start: Optional[float] = None,
+               end: Optional[float] = None, events: bool = True) -> List[str]:
+        """
+        Get the partition files that can hold matching records.
+
+        Args:
+            tags: Tag names (default: all tags)
+            start: Unix time; partitions whose window ends before it are skipped
+            end: Unix time (exclusive); partitions whose window starts at or after it are skipped
+            events: Without tags, also select partitions that only hold events
+
+        Returns:
+            list: Absolute file paths, ordered by time window
+        """
+        wanted = set(tags) if tags is not None else None
+        selected: List[Tuple[float, str]] = []
+        for relative_path, entry in self.partitions.items():
+            window_start = entry.get("start")
+            window_end = entry.get("end")
+            if start is not None and window_end is not None and window_end <= start:
+                continue
+            if end is not None and window_start is not None and window_start >= end:
+                continue
+            if wanted is not None:
+                if not wanted.intersection(entry.get("tags", [])):
+                    continue
+            elif not entry.get("tags") and not (events and entry.get("events")):
+                continue
+            selected.append((window_start or 0, relative_path))
+        return [os.path.join(self.root, *relative_path.split('/')) for _, relative_path in sorted(selected)]
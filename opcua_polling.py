@@ -0,0 +1,191 @@
+"""
+Polling acquisition for OPC UA servers with poor subscription support.
+
+PollingSubscription reads all registered nodes with batched Read requests
+on a fixed, drift-free schedule. Each cycle is split into chunks sized to
+the server's MaxNodesPerRead limit, with several chunks in flight at once.
+Unchanged values are suppressed and the changed ones of a cycle are
+delivered together to the handler's datachange_notifications() (or one by
+one to datachange_notification()), so the logger treats polled values
+exactly like subscription notifications.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from asyncua import ua
+from asyncua.common.subscription import DataChangeNotif
+
+from opcua_browser import chunked, read_operation_limit
+
+# Read errors that mean the node will never be readable
+INVALID_NODE_STATUS = (
+    ua.StatusCodes.BadNodeIdUnknown,
+    ua.StatusCodes.BadNodeIdInvalid,
+    ua.StatusCodes.BadAttributeIdInvalid,
+)
+
+
+class PollingSubscription:
+    """
+    Subscription replacement that polls nodes with batched Read requests.
+
+    Implements the parts of the asyncua Subscription interface the logger
+    uses (subscribe_data_change, unsubscribe, modify_monitored_item, delete).
+    """
+
+    def __init__(self, client, handler, interval_ms: float = 1000.0, max_concurrency: int = 4,
+                 max_nodes_per_read: Optional[int] = None):
+        """
+        Args:
+            client: Connected asyncua Client
+            handler: Object with a datachange_notifications([(node, val, data)]) or
+                datachange_notification(node, val, data) method
+            interval_ms: Poll cycle period in milliseconds
+            max_concurrency: Maximum number of Read requests in flight
+            max_nodes_per_read: Nodes per Read request (default: server's MaxNodesPerRead)
+        """
+        self.client = client
+        self.handler = handler
+        self.interval = interval_ms / 1000.0
+        self.max_concurrency = max_concurrency
+        self.max_nodes_per_read = max_nodes_per_read
+        self.logger = logging.getLogger(__name__)
+
+        self._nodes: Dict[int, Any] = {}               # handle -> Node
+        self._last: Dict[int, tuple] = {}              # handle -> (value, status) last delivered
+        self._next_handle = 1
+        self._task: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, Any] = {"poll_cycle_ms": 0.0, "poll_overruns": 0}
+
+    async def _chunk_size(self) -> int:
+        """Get the number of nodes per Read request."""
+        if self.max_nodes_per_read is None:
+            self.max_nodes_per_read = await read_operation_limit(
+                self.client, ua.ObjectIds.Server_ServerCapabilities_OperationLimits_MaxNodesPerRead, 1000)
+        return self.max_nodes_per_read
+
+    async def _read(self, handles: List[int]) -> List[ua.DataValue]:
+        """Read the Value attribute of many nodes with concurrent chunked Read requests."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def read_chunk(chunk):
+            params = ua.ReadParameters()
+            params.TimestampsToReturn = ua.TimestampsToReturn.Both
+            for handle in chunk:
+                rv = ua.ReadValueId()
+                rv.NodeId = self._nodes[handle].nodeid
+                rv.AttributeId = ua.AttributeIds.Value
+                params.NodesToRead.append(rv)
+            async with semaphore:
+                return await self.client.uaclient.read(params)
+
+        results = await asyncio.gather(*(read_chunk(chunk)
+                                         for chunk in chunked(handles, await self._chunk_size())))
+        return [value for chunk_values in results for value in chunk_values]
+
+    def _deliver(self, handles: List[int], values: List[ua.DataValue]) -> None:
+        """Pass changed values to the handler as one batch, suppressing repeats."""
+        changes = []
+        for handle, data_value in zip(handles, values):
+            node = self._nodes.get(handle)
+            if node is None:
+                # Unsubscribed while the read was in flight
+                continue
+            key = (data_value.Value.Value if data_value.Value is not None else None, data_value.StatusCode.value)
+            if self._last.get(handle) == key:
+                continue
+            self._last[handle] = key
+            notification = ua.MonitoredItemNotification()
+            notification.ClientHandle = handle
+            notification.Value = data_value
+            changes.append((node, key[0], DataChangeNotif(None, notification)))
+
+        if hasattr(self.handler, 'datachange_notifications'):
+            self.handler.datachange_notifications(changes)
+        else:
+            for change in changes:
+                self.handler.datachange_notification(*change)
+
+    async def subscribe_data_change(self, nodes, queuesize: int = 0,
+                                    sampling_interval: float = 0.0) -> List[Union[int, ua.StatusCode]]:
+        """
+        Register nodes for polling and deliver their current values.
+
+        Per-node sampling_interval and queuesize are accepted for interface
+        compatibility; all nodes are read every cycle.
+
+        Returns:
+            list: A handle per node, or the StatusCode of nodes that cannot be read
+        """
+        if not isinstance(nodes, (list, tuple)):
+            nodes = [nodes]
+        handles = []
+        for node in nodes:
+            self._nodes[self._next_handle] = node
+            handles.append(self._next_handle)
+            self._next_handle += 1
+
+        values = await self._read(handles)
+        results: List[Union[int, ua.StatusCode]] = []
+        for handle, data_value in zip(handles, values):
+            if data_value.StatusCode.value in INVALID_NODE_STATUS:
+                del self._nodes[handle]
+                results.append(data_value.StatusCode)
+            else:
+                results.append(handle)
+        self._deliver(handles, values)
+        return results
+
+    async def unsubscribe(self, handle: Union[int, List[int]]) -> None:
+        """Stop polling one or more handles."""
+        for h in handle if isinstance(handle, list) else [handle]:
+            self._nodes.pop(h, None)
+            self._last.pop(h, None)
+
+    async def modify_monitored_item(self, handle: int, new_samp_time: float, new_queuesize: int = 0) -> list:
+        """Accepted for interface compatibility; the poll interval applies to every node."""
+        return []
+
+    def start(self) -> None:
+        """Start the poll loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def delete(self) -> None:
+        """Stop the poll loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def poll_once(self) -> None:
+        """Read every registered node once and deliver the changed values."""
+        handles = list(self._nodes)
+        if handles:
+            self._deliver(handles, await self._read(handles))
+
+    async def _poll_loop(self) -> None:
+        """Poll on a fixed schedule; overrunning cycles skip missed slots instead of drifting."""
+        loop = asyncio.get_running_loop()
+        next_cycle = loop.time()
+        while True:
+            started = time.perf_counter()
+            try:
+                await self.poll_once()
+            except Exception as e:
+                self.logger.warning(f"Error polling values: {e}")
+            self.metrics["poll_cycle_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+            next_cycle += self.interval
+            now = loop.time()
+            if now > next_cycle:
+                missed = int((now - next_cycle) // self.interval) + 1
+                self.metrics["poll_overruns"] += missed
+                next_cycle += missed * self.interval
+            await asyncio.sleep(next_cycle - now)
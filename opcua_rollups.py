@@ -0,0 +1,117 @@
+"""
+Incremental rollup aggregates per tag.
+
+RollupAggregator keeps, for every tag and window (1 s, 1 min, 1 h by default),
+the running min/max/sum/count/last of the current bucket. A bucket is
+finished when a sample for a later bucket arrives or when its end time has
+passed, and finished buckets are written to the rollups table of a
+TimeSeriesStore by a RollupSink on its own worker thread. Long-range queries
+then read a few pre-aggregated rows instead of every raw sample.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from opcua_sinks import Sink
+from opcua_timeseries import TimeSeriesStore
+
+DEFAULT_WINDOWS = [1, 60, 3600]
+
+# (tag, window seconds, bucket start ns, min, max, sum, count, last)
+RollupRow = Tuple[str, int, int, float, float, float, int, float]
+
+
+class RollupAggregator:
+    """Per-tag rolling aggregate state for a set of windows."""
+
+    def __init__(self, windows: Optional[List[int]] = None):
+        """
+        Args:
+            windows: Window lengths in whole seconds
+        """
+        self.windows = [(int(window), int(window) * 1_000_000_000) for window in windows or DEFAULT_WINDOWS]
+        # (tag, window) -> [bucket start ns, min, max, sum, count, last]
+        self._state: Dict[Tuple[str, int], list] = {}
+        self._finished: List[RollupRow] = []
+
+    def add(self, tag: str, ts_ns: int, value: Any) -> None:
+        """Add one sample; non-numeric values are ignored."""
+        if isinstance(value, bool):
+            value = int(value)
+        elif not isinstance(value, (int, float)):
+            return
+
+        for window, window_ns in self.windows:
+            bucket = ts_ns - ts_ns % window_ns
+            key = (tag, window)
+            state = self._state.get(key)
+            if state is None or bucket > state[0]:
+                if state is not None:
+                    self._finished.append((tag, window) + tuple(state))
+                self._state[key] = [bucket, value, value, value, 1, value]
+            else:
+                # Same bucket (or a late sample, counted in the current bucket)
+                if value < state[1]:
+                    state[1] = value
+                if value > state[2]:
+                    state[2] = value
+                state[3] += value
+                state[4] += 1
+                state[5] = value
+
+    def close_expired(self, now_ns: int) -> None:
+        """Finish buckets whose window has ended, so tags that stopped changing still get their rows."""
+        for (tag, window), state in list(self._state.items()):
+            if state[0] + window * 1_000_000_000 <= now_ns:
+                self._finished.append((tag, window) + tuple(state))
+                del self._state[(tag, window)]
+
+    def finish_all(self) -> None:
+        """Finish every open bucket (on shutdown; partial buckets are merged when written again)."""
+        for (tag, window), state in self._state.items():
+            self._finished.append((tag, window) + tuple(state))
+        self._state.clear()
+
+    def forget(self, tag: str) -> None:
+        """Drop the open buckets of a removed tag."""
+        for key in [key for key in self._state if key[0] == tag]:
+            del self._state[key]
+
+    def collect(self) -> List[RollupRow]:
+        """Take the finished buckets."""
+        finished, self._finished = self._finished, []
+        return finished
+
+
+class RollupSink(Sink):
+    """Writes finished rollup buckets to the rollups table of a TimeSeriesStore."""
+
+    def __init__(self, path: str, name: Optional[str] = None):
+        super().__init__(name or f"rollups:{path}")
+        self.path = path
+        self.store: Optional[TimeSeriesStore] = None
+
+    def open(self) -> None:
+        if self.store is None:
+            self.store = TimeSeriesStore(self.path)
+
+    def write_batch(self, records: List[RollupRow]) -> None:
+        self.store.write_rollups(records)
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+
+def rollup_store_path(config: Dict[str, Any]) -> str:
+    """
+    Get the database for rollups: rollups.path, else the sqlite output's
+    database, else <data_file>.rollups.db.
+    """
+    rollup_config = config.get('rollups') or {}
+    if rollup_config.get('path'):
+        return rollup_config['path']
+    for output in config.get('outputs') or []:
+        if output.get('type') == 'sqlite':
+            return output['path']
+    return config['logging']['data_file'] + '.rollups.db'
@@ -0,0 +1,744 @@
+"""
+Output sinks for the OPC UA logger.
+
+Every flush hands one batch of records (the dicts written as JSONL lines) to
+a SinkFanout, which queues it for each configured sink. Each sink runs on
+its own thread with its own bounded queue and retries failed batches with
+exponential backoff, so a slow or unreachable sink never stalls the logger
+or the other sinks.
+
+Configured with the `outputs` section, e.g.:
+
+    outputs:
+      - type: jsonl            # default when `outputs` is missing
+        path: opcua_data.jsonl
+        tag_ids: true          # optional: integer tag ids (see opcua_format.py)
+        blob_threshold: 65536  # optional: larger values go to a blob store (see opcua_blobs.py)
+        fsync_critical: true   # optional: fsync after each critical-lane batch
+        checksums: true        # optional: CRC32 block line after each batch (see opcua_integrity.py)
+      - type: partitioned      # <root>/<group>/<YYYY-MM-DD>/<HH>.jsonl (see opcua_partitions.py)
+        root: archive
+        keys: [group, day, hour]
+      - type: sqlite
+        path: opcua_data.db
+      - type: tcp
+        host: 127.0.0.1
+        port: 9000
+      - type: mqtt
+        host: 127.0.0.1
+        port: 1883
+        topic_prefix: opcua
+
+Batches travel in one of two lanes. Bulk batches are queued in order;
+critical batches (tags with `priority: critical`) go ahead of every queued
+bulk batch and are never dropped while bulk batches remain, so they reach
+the outputs within milliseconds through the same writer threads.
+"""
+
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from opcua_blobs import BlobExtractor, BlobStore, blob_dir_for
+from opcua_format import DeltaEncoder, TagIdEncoder, delta_settings, json_default, read_tag_ids
+from opcua_integrity import block_line
+from opcua_partitions import (BLOB_DIR_NAME, DEFAULT_GROUP, EVENTS_GROUP, PartitionLayout, load_manifest,
+                              record_time, save_manifest, tag_groups)
+from opcua_timeseries import TimeSeriesStore
+
+Record = Dict[str, Any]
+
+LANE_BULK = "bulk"
+LANE_CRITICAL = "critical"
+
+
+def encode_record(record: Record) -> str:
+    """Encode one record as a compact JSON line (without newline)."""
+    return json.dumps(record, ensure_ascii=False, default=json_default)
+
+
+class Sink:
+    """Base class for output sinks. Methods are only called from the sink's worker thread."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def open(self) -> None:
+        """Open files or connections (called before the first batch and after failures)."""
+
+    def write_batch(self, records: List[Record]) -> None:
+        """Write a batch of records. Raise on failure; the batch is retried."""
+        raise NotImplementedError
+
+    def sync(self) -> None:
+        """Make written records durable if the sink is configured to (called after critical batches)."""
+
+    def close(self) -> None:
+        """Release files or connections."""
+
+    def reload(self, config: Dict[str, Any]) -> None:
+        """Apply the settings of a reloaded configuration that can change at runtime (see SinkWorker.reload)."""
+
+
+class JsonlFileSink(Sink):
+    """
+    Appends records to a JSON Lines file (one open and write per batch).
+
+    With tag_ids, data records refer to tags by integer ids defined in
+    dictionary lines of the same file. Tags in delta_tags are written as
+    keyframes and element-level deltas (see opcua_format.py). With
+    blob_threshold, larger strings and byte strings are stored in a blob
+    store next to the file and referenced (see opcua_blobs.py). With
+    fsync_critical, critical-lane batches are fsynced before they count as
+    written. With checksums, every batch is followed by a block line with
+    its CRC32 (see opcua_integrity.py).
+    """
+
+    def __init__(self, path: str, name: Optional[str] = None, tag_ids: bool = False,
+                 delta_tags: Optional[Dict[str, Tuple[int, float]]] = None, blob_threshold: Optional[int] = None,
+                 fsync_critical: bool = False, blob_dir: Optional[str] = None, checksums: bool = False):
+        super().__init__(name or f"jsonl:{path}")
+        self.path = path
+        self.tag_ids = tag_ids
+        self.fsync_critical = fsync_critical
+        self.checksums = checksums
+        self.delta_tags = delta_tags or {}
+        self._blobs = BlobExtractor(BlobStore(blob_dir or blob_dir_for(path)), blob_threshold) \
+            if blob_threshold else None
+        self._tag_id_encoder: Optional[TagIdEncoder] = None
+        self._delta_encoder: Optional[DeltaEncoder] = None
+        self._size = 0  # file size after our last write
+
+    def open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+    def reload(self, config: Dict[str, Any]) -> None:
+        delta_tags = delta_settings(config)
+        if delta_tags == self.delta_tags:
+            return
+        self.delta_tags = delta_tags
+        if self._delta_encoder is not None:
+            # Restart with keyframes: the old state of a tag that stopped being a delta tag
+            # and is one again no longer matches the last value in the file
+            self._delta_encoder = DeltaEncoder(delta_tags)
+
+    def _check_file(self) -> None:
+        """Start the per-file encoder state over if the file is new, replaced or truncated."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if self._delta_encoder is None or size < self._size:
+            # Continue the dictionary of an existing file; deltas restart with keyframes
+            self._tag_id_encoder = TagIdEncoder(read_tag_ids(self.path)) if self.tag_ids else None
+            self._delta_encoder = DeltaEncoder(self.delta_tags)
+
+    def write_batch(self, records: List[Record]) -> None:
+        if self.tag_ids or self.delta_tags:
+            self._check_file()
+        try:
+            self._write(records)
+        except Exception:
+            # The encoders already count this batch's new tag ids and keyframes as written;
+            # start over from what is in the file so a retry writes them again
+            self._tag_id_encoder = None
+            self._delta_encoder = None
+            raise
+
+    def _write(self, records: List[Record]) -> None:
+        if self.delta_tags:
+            records = self._delta_encoder.encode(records)
+        if self._blobs is not None:
+            records = self._blobs.encode(records)
+        if self.tag_ids:
+            records = self._tag_id_encoder.encode(records)
+        payload = ''.join(encode_record(record) + '\n' for record in records).encode('utf-8')
+        if self.checksums:
+            payload += block_line(payload, len(records))
+        with open(self.path, 'ab') as f:
+            if f.tell() != self._size and not self._ends_with_newline(f.tell()):
+                # Terminate a torn last line (crash mid-write) so it doesn't swallow the first record
+                payload = b'\n' + payload
+            f.write(payload)
+            self._size = f.tell()
+
+    def _ends_with_newline(self, size: int) -> bool:
+        if size == 0:
+            return True
+        with open(self.path, 'rb') as f:
+            f.seek(size - 1)
+            return f.read(1) == b'\n'
+
+    def sync(self) -> None:
+        if self.fsync_critical:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                os.fsync(f.fileno())
+
+
+class PartitionedJsonlSink(Sink):
+    """
+    Writes records to a partitioned archive (see opcua_partitions.py).
+
+    Each partition is written by its own JsonlFileSink, so tag ids, deltas
+    and blobs (one store for the archive) work as in single files. Event
+    schema lines are repeated in every partition that gets events of the
+    source. The manifest is rewritten when a partition or a tag is added.
+    """
+
+    # Partition writers kept with their tag id and delta state; others are reopened when needed
+    MAX_OPEN_PARTITIONS = 256
+
+    def __init__(self, root: str, keys: Optional[List[str]] = None, groups: Optional[Dict[str, str]] = None,
+                 timestamp_format: str = "unix", name: Optional[str] = None, tag_ids: bool = False,
+                 delta_tags: Optional[Dict[str, Tuple[int, float]]] = None, blob_threshold: Optional[int] = None,
+                 fsync_critical: bool = False, checksums: bool = False):
+        super().__init__(name or f"partitioned:{root}")
+        self.root = root
+        self.layout = PartitionLayout(keys)
+        self.groups = groups or {}
+        self.timestamp_format = timestamp_format
+        self.tag_ids = tag_ids
+        self.delta_tags = delta_tags or {}
+        self.blob_threshold = blob_threshold
+        self.fsync_critical = fsync_critical
+        self.checksums = checksums
+        self._writers: OrderedDict = OrderedDict()   # relative path -> JsonlFileSink
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._schemas: Dict[str, Record] = {}        # event source -> schema record
+        self._written: List[str] = []                # partitions of the last batch
+        self._retry: Tuple[Optional[List[Record]], set] = (None, set())  # failed batch, partitions done
+
+    def open(self) -> None:
+        if self._manifest is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._manifest = load_manifest(self.root)
+            self._manifest["keys"] = self.layout.keys
+
+    def reload(self, config: Dict[str, Any]) -> None:
+        self.groups = tag_groups(config)
+        self.delta_tags = delta_settings(config)
+        for writer in self._writers.values():
+            writer.reload(config)
+
+    def _writer(self, relative_path: str) -> JsonlFileSink:
+        writer = self._writers.pop(relative_path, None)
+        if writer is None:
+            writer = JsonlFileSink(os.path.join(self.root, *relative_path.split('/')), tag_ids=self.tag_ids,
+                                   delta_tags=self.delta_tags, blob_threshold=self.blob_threshold,
+                                   fsync_critical=self.fsync_critical,
+                                   blob_dir=os.path.join(self.root, BLOB_DIR_NAME), checksums=self.checksums)
+            writer.open()
+        self._writers[relative_path] = writer
+        if len(self._writers) > self.MAX_OPEN_PARTITIONS:
+            self._writers.popitem(last=False)
+        return writer
+
+    def write_batch(self, records: List[Record]) -> None:
+        manifest = self._manifest["partitions"]
+        window = self.layout.window
+        window_starts: Dict[Any, Optional[int]] = {}  # timestamp -> window start; batches share timestamps
+        batches: Dict[str, List[Record]] = {}
+        added: Dict[str, tuple] = {}  # relative path -> (group, window start, new tags, new event sources)
+        for record in records:
+            if "schema" in record:
+                self._schemas[record["schema"]] = record
+                continue
+            is_event = "event" in record
+            name = record["event"] if is_event else record["tag"]
+            group = EVENTS_GROUP if is_event else self.groups.get(name, DEFAULT_GROUP)
+            timestamp = record["timestamp"]
+            window_start = window_starts.get(timestamp)
+            if window_start is None and window is not None:
+                window_start = window_starts[timestamp] = \
+                    self.layout.window_start(record_time(timestamp, self.timestamp_format))
+            path = self.layout.path(group, name, window_start)
+
+            batch = batches.get(path)
+            if batch is None:
+                batch = batches[path] = []
+                added[path] = (group, window_start, set(), set())
+            entry = manifest.get(path, {})
+            _, _, new_tags, new_events = added[path]
+            if is_event:
+                if name not in new_events and name not in entry.get("events", ()):
+                    new_events.add(name)
+                    if name in self._schemas:
+                        batch.append(self._schemas[name])
+            elif name not in new_tags and name not in entry.get("tags", ()):
+                new_tags.add(name)
+            batch.append(record)
+
+        # A retried batch skips the partitions it has already written
+        failed, done = self._retry
+        if failed is not records:
+            done = set()
+        self._retry = (records, done)
+        changed = False
+        for path, batch in batches.items():
+            if path not in done:
+                self._writer(path).write_batch(batch)
+                done.add(path)
+            group, window_start, new_tags, new_events = added[path]
+            if new_tags or new_events:
+                entry = manifest.setdefault(path, {
+                    "group": group, "start": window_start,
+                    "end": None if window_start is None else window_start + window, "tags": [], "events": []})
+                entry["tags"].extend(sorted(new_tags))
+                entry["events"].extend(sorted(new_events))
+                changed = True
+        self._retry = (None, set())
+        self._written = list(batches)
+        if changed:
+            save_manifest(self.root, self._manifest)
+
+    def sync(self) -> None:
+        for path in self._written:
+            if path in self._writers:
+                self._writers[path].sync()
+
+
+class SQLiteSink(Sink):
+    """Stores records in a TimeSeriesStore (WAL mode, one transaction and executemany per batch)."""
+
+    def __init__(self, path: str, timestamp_format: str = "unix", name: Optional[str] = None):
+        super().__init__(name or f"sqlite:{path}")
+        self.path = path
+        self.timestamp_format = timestamp_format
+        self.store: Optional[TimeSeriesStore] = None
+
+    def open(self) -> None:
+        if self.store is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self.store = TimeSeriesStore(self.path, self.timestamp_format)
+
+    def write_batch(self, records: List[Record]) -> None:
+        self.store.write(records)
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+
+class TcpSink(Sink):
+    """Streams records as newline-delimited JSON over a TCP connection."""
+
+    def __init__(self, host: str, port: int, timeout: float = 10.0, name: Optional[str] = None):
+        super().__init__(name or f"tcp:{host}:{port}")
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock: Optional[socket.socket] = None
+
+    def open(self) -> None:
+        if self.sock is None:
+            self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+
+    def write_batch(self, records: List[Record]) -> None:
+        data = ''.join(encode_record(record) + '\n' for record in records).encode('utf-8')
+        try:
+            self.sock.sendall(data)
+        except OSError:
+            # Reconnect on the retry
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            finally:
+                self.sock = None
+
+
+class MqttSink(Sink):
+    """
+    Publishes records to an MQTT 3.1.1 broker (QoS 0, no client library needed).
+
+    Data records go to <topic_prefix>/<tag>, events to <topic_prefix>/<source>
+    and event schemas, retained, to <topic_prefix>/_schema/<source>.
+    """
+
+    def __init__(self, host: str, port: int = 1883, topic_prefix: str = "opcua", client_id: str = "opcua-logger",
+                 username: Optional[str] = None, password: Optional[str] = None, timeout: float = 10.0,
+                 name: Optional[str] = None):
+        super().__init__(name or f"mqtt:{host}:{port}")
+        self.host = host
+        self.port = port
+        self.topic_prefix = topic_prefix.rstrip('/')
+        self.client_id = client_id
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.sock: Optional[socket.socket] = None
+
+    @staticmethod
+    def _remaining_length(length: int) -> bytes:
+        encoded = bytearray()
+        while True:
+            byte, length = length % 128, length // 128
+            encoded.append(byte | (0x80 if length else 0))
+            if not length:
+                return bytes(encoded)
+
+    @staticmethod
+    def _string(value: str) -> bytes:
+        data = value.encode('utf-8')
+        return struct.pack('!H', len(data)) + data
+
+    def _packet(self, header: int, body: bytes) -> bytes:
+        return bytes([header]) + self._remaining_length(len(body)) + body
+
+    def open(self) -> None:
+        if self.sock is not None:
+            return
+        flags = 0x02  # clean session
+        payload = self._string(self.client_id)
+        if self.username:
+            flags |= 0x80
+            payload += self._string(self.username)
+            if self.password:
+                flags |= 0x40
+                payload += self._string(self.password)
+        # Keep alive 0: the broker never drops an idle connection
+        body = self._string("MQTT") + bytes([4, flags]) + struct.pack('!H', 0) + payload
+
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        try:
+            sock.sendall(self._packet(0x10, body))
+            connack = sock.recv(4)
+            if len(connack) < 4 or connack[0] != 0x20 or connack[3] != 0:
+                raise ConnectionError(f"MQTT connection refused: {connack!r}")
+        except Exception:
+            sock.close()
+            raise
+        self.sock = sock
+
+    def _topic(self, record: Record) -> str:
+        if "tag" in record:
+            return f"{self.topic_prefix}/{record['tag']}"
+        if "schema" in record:
+            return f"{self.topic_prefix}/_schema/{record['schema']}"
+        return f"{self.topic_prefix}/{record.get('event', '_')}"
+
+    def write_batch(self, records: List[Record]) -> None:
+        packets = []
+        for record in records:
+            retain = 0x01 if "schema" in record else 0x00
+            body = self._string(self._topic(record)) + encode_record(record).encode('utf-8')
+            packets.append(self._packet(0x30 | retain, body))
+        try:
+            self.sock.sendall(b''.join(packets))
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self.sock is not None:
+            try:
+                self.sock.sendall(b'\xe0\x00')  # DISCONNECT
+            except OSError:
+                pass
+            self.sock.close()
+            self.sock = None
+
+
+class SinkWorker:
+    """
+    Feeds one sink from a bounded batch queue on its own thread, retrying with backoff.
+
+    All sink calls happen on that thread: reload() only queues the new
+    configuration. close() stops the thread and closes the sink; a later
+    submit() starts the thread again (the sink reopens before its next batch).
+    """
+
+    # Seconds between warnings about batches dropped from a full queue
+    DROP_WARNING_INTERVAL = 10.0
+
+    def __init__(self, sink: Sink, max_batches: int = 1000, initial_backoff: float = 0.5,
+                 max_backoff: float = 30.0):
+        self.sink = sink
+        self.max_batches = max_batches
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.logger = logging.getLogger(__name__)
+
+        self._batches: deque = deque()  # (records, lane, receive time); critical batches first
+        self._config: Optional[Dict[str, Any]] = None  # reloaded configuration not yet passed to the sink
+        self._critical_queued = 0
+        self._dropped_since_warning = 0  # records
+        self._drop_warning_time = 0.0
+        self._cond = threading.Condition()
+        self._busy = False
+        # busy_seconds: total write time; batch_seconds/batch_records: moving averages per batch;
+        # lanes: batches and receive-to-written latency (seconds) per lane
+        self.metrics: Dict[str, Any] = {"written": 0, "dropped": 0, "errors": 0, "queued": 0, "last_error": None,
+                                        "busy_seconds": 0.0, "batch_seconds": 0.0, "batch_records": 0.0,
+                                        "lanes": {lane: {"batches": 0, "latency_last": 0.0, "latency_avg": 0.0,
+                                                         "latency_max": 0.0}
+                                                  for lane in (LANE_CRITICAL, LANE_BULK)}}
+
+        self._stop = threading.Event()
+        self._stopped = True   # close() was called
+        self._running = False  # the thread hasn't exited yet
+        self._thread: Optional[threading.Thread] = None
+        self._start()
+
+    def _start(self) -> None:
+        """Start the thread, or keep a closing one running (called with the lock held)."""
+        self._stop.clear()
+        self._stopped = False
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=f"sink {self.sink.name}", daemon=True)
+            self._thread.start()
+
+    def submit(self, records: List[Record], lane: str = LANE_BULK, received: Optional[float] = None) -> None:
+        """
+        Queue a batch without blocking; the oldest bulk batch is dropped when the queue is full.
+
+        Args:
+            records: Batch to write
+            lane: LANE_CRITICAL batches are queued ahead of all bulk batches
+            received: Unix time the oldest data of the batch was received (for latency metrics)
+        """
+        with self._cond:
+            if self._stopped:
+                self._start()
+            if len(self._batches) >= self.max_batches:
+                if self._critical_queued < len(self._batches):
+                    dropped = self._batches[self._critical_queued]
+                    del self._batches[self._critical_queued]
+                else:
+                    dropped = self._batches.popleft()
+                    self._critical_queued -= 1
+                self.metrics["dropped"] += len(dropped[0])
+                self._warn_dropped(len(dropped[0]))
+            if lane == LANE_CRITICAL:
+                self._batches.insert(self._critical_queued, (records, lane, received))
+                self._critical_queued += 1
+            else:
+                self._batches.append((records, lane, received))
+            self.metrics["queued"] = len(self._batches)
+            self._cond.notify()
+
+    def reload(self, config: Dict[str, Any]) -> None:
+        """Queue a reloaded configuration; the worker thread passes it to the sink before its next batch."""
+        with self._cond:
+            self._config = config
+            self._cond.notify()
+
+    def _apply_config(self) -> None:
+        """Pass a configuration queued by reload() to the sink."""
+        with self._cond:
+            config, self._config = self._config, None
+        if config is not None:
+            try:
+                self.sink.reload(config)
+            except Exception as e:
+                self.logger.warning(f"Reloading output {self.sink.name} failed: {e}")
+
+    def _warn_dropped(self, records: int) -> None:
+        """Log dropped records, at most once per DROP_WARNING_INTERVAL."""
+        self._dropped_since_warning += records
+        now = time.monotonic()
+        if now - self._drop_warning_time >= self.DROP_WARNING_INTERVAL:
+            self.logger.warning(f"Output {self.sink.name} is falling behind: dropped {self._dropped_since_warning} "
+                                f"records from its full queue ({self.metrics['dropped']} in total)")
+            self._dropped_since_warning = 0
+            self._drop_warning_time = now
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued batch has been written. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._batches and not self._busy, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        Write the queued batches, stop the thread and close the sink.
+
+        Args:
+            timeout: Maximum seconds to wait for the queue to drain and the thread to stop
+
+        Returns:
+            bool: False if batches were left queued or the thread didn't stop in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = self.drain(timeout)
+        with self._cond:
+            self._stopped = True
+            self._stop.set()
+            self._cond.notify_all()
+        # A thread that is between retries stops right away; give it a moment even after a drain timeout
+        self._thread.join(None if deadline is None else max(1.0, deadline - time.monotonic()))
+        return done and not self._thread.is_alive()
+
+    def _requeue(self, records: List[Record], lane: str, received: Optional[float]) -> None:
+        """Put an unwritten batch back at the front of its lane."""
+        if lane == LANE_CRITICAL:
+            self._batches.appendleft((records, lane, received))
+            self._critical_queued += 1
+        else:
+            self._batches.insert(self._critical_queued, (records, lane, received))
+        self.metrics["queued"] = len(self._batches)
+
+    def _run(self) -> None:
+        while True:
+            self._serve()
+            # Closed on this thread like every other sink call (SQLite connections are per thread)
+            try:
+                self.sink.close()
+            except Exception as e:
+                self.logger.warning(f"Closing output {self.sink.name} failed: {e}")
+            with self._cond:
+                if self._stopped:
+                    self._running = False
+                    return
+
+    def _serve(self) -> None:
+        """Write queued batches until close() is called."""
+        backoff = self.initial_backoff
+        while True:
+            self._apply_config()
+            with self._cond:
+                self._cond.wait_for(lambda: self._batches or self._config is not None or self._stop.is_set())
+                if self._stop.is_set():
+                    break
+                if not self._batches:
+                    continue  # only a configuration to apply
+                records, lane, received = self._batches.popleft()
+                if lane == LANE_CRITICAL:
+                    self._critical_queued -= 1
+                self._busy = True
+                self.metrics["queued"] = len(self._batches)
+
+            # Retry the batch until it is written; new batches keep queueing meanwhile
+            while True:
+                self._apply_config()
+                try:
+                    started = time.perf_counter()
+                    self.sink.open()
+                    self.sink.write_batch(records)
+                    if lane == LANE_CRITICAL:
+                        self.sink.sync()
+                    elapsed = time.perf_counter() - started
+                    self.metrics["written"] += len(records)
+                    self.metrics["busy_seconds"] += elapsed
+                    self.metrics["batch_seconds"] += 0.3 * (elapsed - self.metrics["batch_seconds"])
+                    self.metrics["batch_records"] += 0.3 * (len(records) - self.metrics["batch_records"])
+                    if received is not None:
+                        self._record_latency(lane, time.time() - received)
+                    backoff = self.initial_backoff
+                    break
+                except Exception as e:
+                    self.metrics["errors"] += 1
+                    self.metrics["last_error"] = str(e)
+                    self.logger.warning(f"Output {self.sink.name} failed, retrying in {backoff:.1f}s: {e}")
+                    if self._stop.wait(backoff):
+                        # Closing: keep the batch for a restart instead of retrying
+                        with self._cond:
+                            self._requeue(records, lane, received)
+                        break
+                    backoff = min(backoff * 2, self.max_backoff)
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _record_latency(self, lane: str, latency: float) -> None:
+        stats = self.metrics["lanes"][lane]
+        stats["batches"] += 1
+        stats["latency_last"] = latency
+        stats["latency_avg"] = latency if stats["batches"] == 1 else \
+            stats["latency_avg"] + 0.3 * (latency - stats["latency_avg"])
+        stats["latency_max"] = max(stats["latency_max"], latency)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get a copy of the metrics."""
+        metrics = dict(self.metrics)
+        metrics["lanes"] = {lane: dict(stats) for lane, stats in self.metrics["lanes"].items()}
+        return metrics
+
+
+class SinkFanout:
+    """Hands every batch to all sinks, each through its own SinkWorker."""
+
+    def __init__(self, sinks: List[Sink], max_batches: int = 1000):
+        self.workers = [SinkWorker(sink, max_batches) for sink in sinks]
+
+    def submit(self, records: List[Record], lane: str = LANE_BULK, received: Optional[float] = None) -> None:
+        if records:
+            for worker in self.workers:
+                worker.submit(records, lane, received)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all sinks have written their queued batches. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = True
+        for worker in self.workers:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done = worker.drain(remaining) and done
+        return done
+
+    def close(self, timeout: Optional[float] = 10.0) -> bool:
+        """Write the queued batches and close all sinks. Returns False if some sink didn't finish in time."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = True
+        for worker in self.workers:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done = worker.close(remaining) and done
+        return done
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {worker.sink.name: worker.get_metrics() for worker in self.workers}
+
+    def reload(self, config: Dict[str, Any]) -> None:
+        """Pass a reloaded configuration to every sink (on its worker thread)."""
+        for worker in self.workers:
+            worker.reload(config)
+
+
+def build_sinks(config: Dict[str, Any]) -> List[Sink]:
+    """
+    Create the sinks of the `outputs` config section.
+
+    Without an `outputs` section the logger writes JSONL to logging.data_file.
+
+    Returns:
+        list: Configured sinks
+    """
+    outputs = config.get('outputs') or [{'type': 'jsonl', 'path': config['logging']['data_file']}]
+    sinks: List[Sink] = []
+    for output in outputs:
+        output = dict(output)
+        sink_type = output.pop('type', 'jsonl')
+        if sink_type == 'jsonl':
+            sinks.append(JsonlFileSink(output.get('path', config['logging']['data_file']), output.get('name'),
+                                       output.get('tag_ids', False), delta_settings(config),
+                                       output.get('blob_threshold'), output.get('fsync_critical', False),
+                                       checksums=output.get('checksums', False)))
+        elif sink_type == 'partitioned':
+            sinks.append(PartitionedJsonlSink(output['root'], output.get('keys'), tag_groups(config),
+                                              config['logging'].get('timestamp_format', 'unix'), output.get('name'),
+                                              output.get('tag_ids', False), delta_settings(config),
+                                              output.get('blob_threshold'), output.get('fsync_critical', False),
+                                              output.get('checksums', False)))
+        elif sink_type == 'sqlite':
+            sinks.append(SQLiteSink(output['path'], config['logging'].get('timestamp_format', 'unix'),
+                                    output.get('name')))
+        elif sink_type == 'tcp':
+            sinks.append(TcpSink(output['host'], int(output['port']), output.get('timeout', 10.0), output.get('name')))
+        elif sink_type == 'mqtt':
+            sinks.append(MqttSink(output['host'], int(output.get('port', 1883)),
+                                  output.get('topic_prefix', 'opcua'), output.get('client_id', 'opcua-logger'),
+                                  output.get('username'), output.get('password'), output.get('timeout', 10.0),
+                                  output.get('name')))
+        else:
+            raise ValueError(f"Unknown output type: {sink_type}")
+    return sinks
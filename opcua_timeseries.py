@@ -0,0 +1,407 @@
+"""
+SQLite time-series store for logged tag values.
+
+Samples are stored compactly: an integer tag id (names live in a separate
+table), an int64 nanosecond UNIX timestamp and typed value columns (integer,
+real, text, or JSON for arrays/structures). The database runs in WAL mode so
+queries can read while the logger writes, and a (tag_id, ts) index serves
+latest-value, range and downsampled queries without scanning.
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from opcua_format import json_default
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tags (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS samples (
+    tag_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    v_int INTEGER,
+    v_real REAL,
+    v_text TEXT,
+    v_json TEXT
+);
+CREATE INDEX IF NOT EXISTS samples_tag_ts ON samples (tag_id, ts);
+CREATE TABLE IF NOT EXISTS events (source TEXT NOT NULL, ts INTEGER NOT NULL, fields TEXT);
+CREATE INDEX IF NOT EXISTS events_source_ts ON events (source, ts);
+CREATE TABLE IF NOT EXISTS event_schemas (source TEXT PRIMARY KEY, fields TEXT);
+CREATE TABLE IF NOT EXISTS rollups (
+    tag_id INTEGER NOT NULL,
+    window INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    min REAL,
+    max REAL,
+    sum REAL,
+    count INTEGER,
+    last REAL,
+    PRIMARY KEY (tag_id, window, ts)
+) WITHOUT ROWID;
+"""
+
+# Value of the first non-NULL typed column
+VALUE_COLUMNS = "v_int, v_real, v_text, v_json"
+NUMERIC_VALUE = "COALESCE(v_real, v_int)"
+
+
+def parse_timestamp_ns(timestamp: Any, timestamp_format: str = "unix") -> int:
+    """
+    Convert a logged timestamp to int64 nanoseconds since the UNIX epoch.
+
+    Args:
+        timestamp: Timestamp as logged (UNIX seconds, or a string in timestamp_format)
+        timestamp_format: The logger's timestamp_format ("unix" or a strftime format, local time)
+
+    Returns:
+        int: Nanoseconds since the epoch
+    """
+    if isinstance(timestamp, (int, float)) or timestamp_format == 'unix':
+        return int(float(timestamp) * 1_000_000_000)
+    return int(datetime.strptime(timestamp, timestamp_format).timestamp() * 1_000_000_000)
+
+
+def encode_value(value: Any) -> Tuple[Optional[int], Optional[float], Optional[str], Optional[str]]:
+    """Split a value into the (v_int, v_real, v_text, v_json) columns."""
+    if isinstance(value, bool) or isinstance(value, int) and -2**63 <= value < 2**63:
+        return int(value), None, None, None
+    if isinstance(value, float):
+        return None, value, None, None
+    if isinstance(value, str):
+        return None, None, value, None
+    if value is None:
+        return None, None, None, None
+    return None, None, None, json.dumps(value, ensure_ascii=False, default=json_default)
+
+
+def decode_value(v_int: Optional[int], v_real: Optional[float], v_text: Optional[str], v_json: Optional[str]) -> Any:
+    """Rebuild a value from its typed columns."""
+    if v_int is not None:
+        return v_int
+    if v_real is not None:
+        return v_real
+    if v_text is not None:
+        return v_text
+    if v_json is not None:
+        return json.loads(v_json)
+    return None
+
+
+class TimeSeriesStore:
+    """Compact, indexed SQLite storage for tag samples and events."""
+
+    def __init__(self, path: str, timestamp_format: str = "unix"):
+        """
+        Args:
+            path: SQLite database file
+            timestamp_format: Format of the timestamps in written records
+        """
+        self.path = path
+        self.timestamp_format = timestamp_format
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._tag_ids: Dict[str, int] = {}
+        self._load_tag_ids()
+
+    def _load_tag_ids(self) -> None:
+        self._tag_ids = {name: tag_id for tag_id, name in self.connection.execute("SELECT id, name FROM tags")}
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def tag_id(self, name: str, create: bool = True) -> Optional[int]:
+        """Get the integer id of a tag, creating it if needed (or None if create is False)."""
+        tag_id = self._tag_ids.get(name)
+        if tag_id is None:
+            row = self.connection.execute("SELECT id FROM tags WHERE name = ?", (name,)).fetchone()
+            if row is None and create:
+                row = (self.connection.execute("INSERT INTO tags (name) VALUES (?)", (name,)).lastrowid,)
+            if row is not None:
+                tag_id = self._tag_ids[name] = row[0]
+        return tag_id
+
+    def tags(self) -> List[str]:
+        """Get the names of all stored tags."""
+        return [name for (name,) in self.connection.execute("SELECT name FROM tags ORDER BY name")]
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _transaction(self):
+        """One write transaction; the tag id cache is reloaded if it rolls back."""
+        try:
+            with self.connection:
+                yield
+        except Exception:
+            # Tags created in the rolled back transaction are gone again
+            self._load_tag_ids()
+            raise
+
+    def write(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Store a batch of logger records in one transaction.
+
+        Args:
+            records: Data records ({"tag", "timestamp", "value"}), event records
+                ({"event", "timestamp", "fields"}) and event schema records
+
+        Returns:
+            int: Number of samples stored
+        """
+        samples, events, schemas = [], [], []
+        fmt = self.timestamp_format
+        with self._transaction():
+            for record in records:
+                if "tag" in record:
+                    samples.append((self.tag_id(record["tag"]), parse_timestamp_ns(record["timestamp"], fmt))
+                                   + encode_value(record["value"]))
+                elif "event" in record:
+                    events.append((record["event"], parse_timestamp_ns(record["timestamp"], fmt),
+                                   json.dumps(record["fields"], ensure_ascii=False, default=json_default)))
+                elif "schema" in record:
+                    schemas.append((record["schema"], json.dumps(record["fields"])))
+            self.connection.executemany("INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?)", samples)
+            self.connection.executemany("INSERT INTO events VALUES (?, ?, ?)", events)
+            self.connection.executemany("INSERT OR REPLACE INTO event_schemas VALUES (?, ?)", schemas)
+        return len(samples)
+
+    def write_samples(self, samples: Iterable[Tuple[str, int, Any]]) -> int:
+        """
+        Store (tag, timestamp ns, value) samples in one transaction.
+
+        Returns:
+            int: Number of samples stored
+        """
+        with self._transaction():
+            rows = [(self.tag_id(tag), ts) + encode_value(value) for tag, ts, value in samples]
+            self.connection.executemany("INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def write_rollups(self, rows: Iterable[Tuple[str, int, int, float, float, float, int, float]]) -> int:
+        """
+        Store finished rollup buckets in one transaction.
+
+        A bucket that already exists (e.g. written partially before a restart)
+        is merged with the new one instead of replaced.
+
+        Args:
+            rows: (tag, window seconds, bucket start ns, min, max, sum, count, last) tuples
+
+        Returns:
+            int: Number of buckets stored
+        """
+        with self._transaction():
+            data = [(self.tag_id(row[0]),) + tuple(row[1:]) for row in rows]
+            self.connection.executemany(
+                "INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (tag_id, window, ts) DO UPDATE SET "
+                "min = MIN(min, excluded.min), max = MAX(max, excluded.max), sum = sum + excluded.sum, "
+                "count = count + excluded.count, last = excluded.last", data)
+        return len(data)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def latest(self, tags: Optional[List[str]] = None) -> Dict[str, Tuple[int, Any]]:
+        """
+        Get the newest sample of each tag.
+
+        Args:
+            tags: Tag names (default: all tags)
+
+        Returns:
+            dict: Tag name -> (timestamp ns, value)
+        """
+        result = {}
+        for name in tags if tags is not None else self.tags():
+            tag_id = self.tag_id(name, create=False)
+            if tag_id is None:
+                continue
+            row = self.connection.execute(
+                f"SELECT ts, {VALUE_COLUMNS} FROM samples WHERE tag_id = ? ORDER BY ts DESC LIMIT 1",
+                (tag_id,)).fetchone()
+            if row is not None:
+                result[name] = (row[0], decode_value(*row[1:]))
+        return result
+
+    def range(self, tag: str, start_ns: int, end_ns: int, limit: Optional[int] = None) -> List[Tuple[int, Any]]:
+        """
+        Get the samples of a tag with start_ns <= timestamp < end_ns, oldest first.
+
+        Returns:
+            list: (timestamp ns, value) tuples
+        """
+        tag_id = self.tag_id(tag, create=False)
+        if tag_id is None:
+            return []
+        rows = self.connection.execute(
+            f"SELECT ts, {VALUE_COLUMNS} FROM samples WHERE tag_id = ? AND ts >= ? AND ts < ? "
+            f"ORDER BY ts LIMIT ?", (tag_id, start_ns, end_ns, -1 if limit is None else limit))
+        return [(row[0], decode_value(*row[1:])) for row in rows]
+
+    def rollups(self, tag: str, window: int, start_ns: int, end_ns: int) -> List[Dict[str, Any]]:
+        """
+        Get the pre-aggregated buckets of a tag for one rollup window.
+
+        Args:
+            tag: Tag name
+            window: Rollup window in seconds
+            start_ns: Range start (inclusive)
+            end_ns: Range end (exclusive)
+
+        Returns:
+            list: Dicts with bucket start ts, min, max, avg, last and count, oldest first
+        """
+        tag_id = self.tag_id(tag, create=False)
+        if tag_id is None:
+            return []
+        rows = self.connection.execute(
+            "SELECT ts, min, max, sum, count, last FROM rollups "
+            "WHERE tag_id = ? AND window = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (tag_id, window, start_ns, end_ns))
+        return [{"ts": ts, "min": vmin, "max": vmax, "avg": total / count if count else None,
+                 "last": last, "count": count}
+                for ts, vmin, vmax, total, count, last in rows]
+
+    def _rollup_window(self, tag_id: int, bucket_ns: int, start_ns: int, end_ns: int) -> Optional[int]:
+        """Get the largest rollup window that divides bucket_ns and has rollups in the range."""
+        windows = [window for (window,) in self.connection.execute(
+            "SELECT DISTINCT window FROM rollups WHERE tag_id = ?", (tag_id,))]
+        for window in sorted(windows, reverse=True):
+            if bucket_ns % (window * 1_000_000_000):
+                continue
+            found = self.connection.execute(
+                "SELECT 1 FROM rollups WHERE tag_id = ? AND window = ? AND ts >= ? AND ts < ? LIMIT 1",
+                (tag_id, window, start_ns, end_ns)).fetchone()
+            if found is not None:
+                return window
+        return None
+
+    def downsample(self, tag: str, start_ns: int, end_ns: int, bucket_ns: int,
+                   use_rollups: bool = True) -> List[Dict[str, Any]]:
+        """
+        Aggregate the numeric samples of a tag into fixed time buckets.
+
+        Buckets are aligned to multiples of bucket_ns and the range is widened
+        to whole buckets. When rollups of a window that divides bucket_ns
+        exist in the range, buckets are computed from them; windows without a
+        rollup row (before rollups were enabled, the current window, gaps)
+        are aggregated from the raw samples.
+
+        Args:
+            tag: Tag name
+            start_ns: Range start (inclusive)
+            end_ns: Range end (exclusive)
+            bucket_ns: Bucket width in nanoseconds
+            use_rollups: Read pre-aggregated rollups when possible
+
+        Returns:
+            list: Dicts with bucket start ts, min, max, avg and count, oldest first
+        """
+        tag_id = self.tag_id(tag, create=False)
+        if tag_id is None:
+            return []
+        start_ns -= start_ns % bucket_ns
+        end_ns += -end_ns % bucket_ns
+
+        window = self._rollup_window(tag_id, bucket_ns, start_ns, end_ns) if use_rollups else None
+        if window is not None:
+            return self._downsample_rollups(tag_id, window, start_ns, end_ns, bucket_ns)
+
+        rows = self.connection.execute(
+            f"SELECT (ts / ?) * ? AS bucket, MIN({NUMERIC_VALUE}), MAX({NUMERIC_VALUE}), "
+            f"AVG({NUMERIC_VALUE}), COUNT(*) FROM samples "
+            f"WHERE tag_id = ? AND ts >= ? AND ts < ? GROUP BY bucket ORDER BY bucket",
+            (bucket_ns, bucket_ns, tag_id, start_ns, end_ns))
+        return [{"ts": bucket, "min": vmin, "max": vmax, "avg": avg, "count": count}
+                for bucket, vmin, vmax, avg, count in rows]
+
+    def _aggregate_ranges(self, tag_id: int, ranges: List[Tuple[int, int]], group: str, group_args: tuple = ()):
+        """
+        Aggregate the numeric samples in several time ranges with one statement.
+
+        Each range is an index range scan on (tag_id, ts). Rows are
+        (group, min, max, sum, count); group is an SQL expression over s.ts
+        and g.value (the [start, end] pair of the range).
+        """
+        return self.connection.execute(
+            f"SELECT {group} AS grp, MIN({NUMERIC_VALUE}), MAX({NUMERIC_VALUE}), "
+            f"SUM({NUMERIC_VALUE}), COUNT({NUMERIC_VALUE}) FROM json_each(?) AS g CROSS JOIN samples AS s "
+            f"WHERE s.tag_id = ? AND s.ts >= json_extract(g.value, '$[0]') "
+            f"AND s.ts < json_extract(g.value, '$[1]') GROUP BY grp",
+            group_args + (json.dumps(ranges), tag_id))
+
+    def _downsample_rollups(self, tag_id: int, window: int, start_ns: int, end_ns: int,
+                            bucket_ns: int) -> List[Dict[str, Any]]:
+        """Aggregate buckets from one rollup window, reading raw samples where it has no complete rows."""
+        window_ns = window * 1_000_000_000
+        rows = self.connection.execute(
+            "SELECT ts, min, max, sum, count FROM rollups WHERE tag_id = ? AND window = ? AND ts >= ? AND ts < ? "
+            "ORDER BY ts", (tag_id, window, start_ns, end_ns)).fetchall()
+
+        # The first and last window of each run of rollup rows may be partial (rollups
+        # enabled or stopped mid-window); only use them if they count every raw sample
+        edges = [ts for i, (ts, *_) in enumerate(rows)
+                 if i == 0 or rows[i - 1][0] + window_ns != ts
+                 or i == len(rows) - 1 or rows[i + 1][0] != ts + window_ns]
+        raw_counts = {ts: count for ts, _, _, _, count in self._aggregate_ranges(
+            tag_id, [(ts, ts + window_ns) for ts in edges], "json_extract(g.value, '$[0]')")}
+        edges = set(edges)
+
+        # bucket start -> [min, max, sum, count]
+        buckets: Dict[int, list] = {}
+
+        def merge(bucket: int, vmin: float, vmax: float, total: float, count: int) -> None:
+            state = buckets.get(bucket)
+            if state is None:
+                buckets[bucket] = [vmin, vmax, total, count]
+            else:
+                state[0] = min(state[0], vmin)
+                state[1] = max(state[1], vmax)
+                state[2] += total
+                state[3] += count
+
+        gaps: List[Tuple[int, int]] = []
+        covered = start_ns
+        for ts, vmin, vmax, total, count in rows:
+            if ts in edges and raw_counts.get(ts, 0) != count:
+                continue
+            if ts > covered:
+                gaps.append((covered, ts))
+            covered = ts + window_ns
+            if count:
+                merge(ts - ts % bucket_ns, vmin, vmax, total, count)
+        if covered < end_ns:
+            gaps.append((covered, end_ns))
+
+        if gaps:
+            for bucket, vmin, vmax, total, count in self._aggregate_ranges(
+                    tag_id, gaps, "(s.ts / ?) * ?", (bucket_ns, bucket_ns)):
+                if count:
+                    merge(bucket, vmin, vmax, total, count)
+
+        return [{"ts": bucket, "min": vmin, "max": vmax, "avg": total / count, "count": count}
+                for bucket, (vmin, vmax, total, count) in sorted(buckets.items())]
+
+    def events(self, source: str, start_ns: int, end_ns: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the events of a source in a time range, as dicts keyed by the source's field names."""
+        schema = self.connection.execute("SELECT fields FROM event_schemas WHERE source = ?", (source,)).fetchone()
+        names = json.loads(schema[0]) if schema else []
+        rows = self.connection.execute(
+            "SELECT ts, fields FROM events WHERE source = ? AND ts >= ? AND ts < ? ORDER BY ts LIMIT ?",
+            (source, start_ns, end_ns, -1 if limit is None else limit))
+        result = []
+        for ts, fields in rows:
+            values = json.loads(fields)
+            event = dict(zip(names, values)) if len(names) == len(values) else {"fields": values}
+            event["ts"] = ts
+            result.append(event)
+        return result
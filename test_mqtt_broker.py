@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Minimal local MQTT 3.1.1 stand-in broker for testing the mqtt output.
+
+It accepts CONNECT (optionally checking username and password), answers
+with CONNACK, decodes every PUBLISH and prints its topic and JSON payload.
+Nothing is forwarded to subscribers; the point is to see exactly what the
+logger sends.
+
+    python test_mqtt_broker.py --port 1883
+    python test_mqtt_broker.py --check      # publish sample records through MqttSink and compare
+"""
+
+import argparse
+import asyncio
+import json
+import struct
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+CONNECT, CONNACK, PUBLISH, PINGREQ, PINGRESP, DISCONNECT = 1, 2, 3, 12, 13, 14
+
+
+class StandInBroker:
+    """Collects the messages published to it."""
+
+    def __init__(self, username: Optional[str] = None, password: Optional[str] = None, verbose: bool = True):
+        self.username = username
+        self.password = password
+        self.verbose = verbose
+        self.messages: List[Dict[str, Any]] = []  # topic, retain, payload (decoded JSON)
+        self.errors: List[str] = []
+        self.clients: List[str] = []              # client ids of accepted connections
+        self.disconnects = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 1883) -> int:
+        """Start listening. Returns the port (useful with port 0)."""
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    @staticmethod
+    async def _read_packet(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+        """Read one control packet: (first header byte, body)."""
+        header = (await reader.readexactly(1))[0]
+        length, multiplier = 0, 1
+        for _ in range(4):
+            byte = (await reader.readexactly(1))[0]
+            length += (byte & 0x7F) * multiplier
+            if not byte & 0x80:
+                break
+            multiplier *= 128
+        else:
+            raise ValueError("Malformed remaining length")
+        return header, await reader.readexactly(length)
+
+    @staticmethod
+    def _string(body: bytes, offset: int) -> Tuple[str, int]:
+        (length,) = struct.unpack_from('!H', body, offset)
+        start = offset + 2
+        return body[start:start + length].decode('utf-8'), start + length
+
+    def _connect(self, body: bytes) -> int:
+        """Check a CONNECT packet. Returns the CONNACK return code."""
+        protocol, offset = self._string(body, 0)
+        level, flags = body[offset], body[offset + 1]
+        if protocol != "MQTT" or level != 4:
+            self.errors.append(f"Unexpected protocol {protocol!r} level {level}")
+            return 1
+        offset += 4  # level, flags, keep alive
+        client_id, offset = self._string(body, offset)
+        username = password = None
+        if flags & 0x80:
+            username, offset = self._string(body, offset)
+        if flags & 0x40:
+            password, offset = self._string(body, offset)
+        if offset != len(body):
+            self.errors.append(f"CONNECT has {len(body) - offset} unexpected trailing bytes")
+        if self.username is not None and (username, password) != (self.username, self.password):
+            return 4  # bad user name or password
+        self.clients.append(client_id)
+        return 0
+
+    def _publish(self, header: int, body: bytes) -> None:
+        topic, offset = self._string(body, 0)
+        if (header >> 1) & 0x03:
+            offset += 2  # packet id (QoS 1 and 2)
+        try:
+            payload = json.loads(body[offset:].decode('utf-8'))
+        except ValueError as e:
+            self.errors.append(f"{topic}: payload is not JSON: {e}")
+            return
+        self.messages.append({"topic": topic, "retain": bool(header & 0x01), "payload": payload})
+        if self.verbose:
+            print(f"{topic}{' (retained)' if header & 0x01 else ''}\t{json.dumps(payload, ensure_ascii=False)}")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connected = False
+        try:
+            while True:
+                header, body = await self._read_packet(reader)
+                packet_type = header >> 4
+                if packet_type == CONNECT:
+                    code = self._connect(body)
+                    writer.write(bytes([CONNACK << 4, 2, 0, code]))
+                    await writer.drain()
+                    if code:
+                        break
+                    connected = True
+                elif not connected:
+                    self.errors.append(f"Packet type {packet_type} before CONNECT")
+                    break
+                elif packet_type == PUBLISH:
+                    self._publish(header, body)
+                elif packet_type == PINGREQ:
+                    writer.write(bytes([PINGRESP << 4, 0]))
+                    await writer.drain()
+                elif packet_type == DISCONNECT:
+                    self.disconnects += 1
+                    break
+                else:
+                    self.errors.append(f"Unexpected packet type {packet_type}")
+        except asyncio.IncompleteReadError:
+            pass  # connection closed
+        except ValueError as e:
+            self.errors.append(str(e))
+        finally:
+            writer.close()
+
+
+def _sample_records() -> List[Dict[str, Any]]:
+    """Records covering the packet sizes and value kinds the logger publishes."""
+    return [
+        {"schema": "Alarms", "fields": ["EventType", "SourceName", "Severity", "Message"]},
+        {"event": "Alarms", "timestamp": "1757312000.05", "fields": ["i=2915", "Line1", 700, "Übertemperatur"]},
+        {"tag": "Temperature", "timestamp": "1757312000.1", "value": 21.5},
+        {"tag": "Running", "timestamp": "1757312000.1", "value": True},
+        {"tag": "Recipe", "timestamp": "1757312000.1", "value": "Größe 3"},
+        {"tag": "Frame", "timestamp": "1757312000.1", "value": bytes(range(256)) * 4},
+        # Remaining lengths of one, two and three bytes
+        {"tag": "Short", "timestamp": "1757312000.2", "value": [1.0] * 10},
+        {"tag": "Medium", "timestamp": "1757312000.2", "value": [0.25] * 1000},
+        {"tag": "Spectrum", "timestamp": "1757312000.2", "value": [0.125] * 40000},
+    ]
+
+
+async def check() -> bool:
+    """Publish sample records through MqttSink and compare what the stand-in decodes."""
+    from opcua_sinks import MqttSink, encode_record
+
+    broker = StandInBroker("logger", "secret", verbose=False)
+    port = await broker.start(port=0)
+    records = _sample_records()
+    sink = MqttSink("127.0.0.1", port, topic_prefix="plant/opcua/", username="logger", password="secret")
+
+    def publish():
+        sink.open()
+        sink.write_batch(records[:3])
+        sink.write_batch(records[3:])
+        sink.close()
+
+    await asyncio.to_thread(publish)
+    for _ in range(100):
+        if broker.disconnects:
+            break
+        await asyncio.sleep(0.05)
+    await broker.stop()
+
+    failures = list(broker.errors)
+    if broker.clients != ["opcua-logger"]:
+        failures.append(f"Expected one connection of opcua-logger, got {broker.clients}")
+    if not broker.disconnects:
+        failures.append("No DISCONNECT received")
+    if len(broker.messages) != len(records):
+        failures.append(f"Expected {len(records)} messages, got {len(broker.messages)}")
+    for record, message in zip(records, broker.messages):
+        name = record.get("tag") or record.get("event") or record.get("schema")
+        topic = f"plant/opcua/{'_schema/' if 'schema' in record else ''}{name}"
+        if message["topic"] != topic:
+            failures.append(f"Expected topic {topic}, got {message['topic']}")
+        if message["retain"] != ("schema" in record):
+            failures.append(f"{topic}: wrong retain flag")
+        if message["payload"] != json.loads(encode_record(record)):
+            failures.append(f"{topic}: payload differs from the record")
+
+    # Wrong credentials must be refused
+    broker = StandInBroker("logger", "other", verbose=False)
+    port = await broker.start(port=0)
+    try:
+        await asyncio.to_thread(MqttSink("127.0.0.1", port, username="logger", password="secret").open)
+        failures.append("Connection with wrong credentials was accepted")
+    except ConnectionError:
+        pass
+    finally:
+        await broker.stop()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"OK: {len(records)} records published and decoded")
+    return not failures
+
+
+async def serve(host: str, port: int, username: Optional[str], password: Optional[str]) -> None:
+    broker = StandInBroker(username, password)
+    await broker.start(host, port)
+    print(f"MQTT stand-in broker listening on {host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await broker.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local MQTT 3.1.1 stand-in broker for the mqtt output")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=1883, help="Port to listen on")
+    parser.add_argument("--username", help="Require this user name")
+    parser.add_argument("--password", help="Require this password (with --username)")
+    parser.add_argument("--check", action="store_true",
+                        help="Publish sample records through MqttSink and check what arrives, then exit")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if asyncio.run(check()) else 1)
+    try:
+        asyncio.run(serve(args.host, args.port, args.username, args.password))
+    except KeyboardInterrupt:
+        print("\nBroker stopped")
+
+
+if __name__ == "__main__":
+    main()